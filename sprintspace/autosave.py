@@ -0,0 +1,60 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Write-behind buffer for page autosaves.
+
+With `"sprintspace_write_behind": 1` in site_config.json, autosaves update the
+page's blocks in a redis hash instead of the database. The buffer is written to
+the database by the per-minute job, when the editor leaves the page, or before
+any direct save of the page, so many autosaves become one database write.
+
+An entry holds the page's blocks, the database content_version they build on
+(`base_version`), a `revision` counting the autosaves buffered since and the
+`user` who made the last of them, whom the flush saves the page for.
+"""
+
+import frappe
+from frappe.utils import now
+
+AUTOSAVE_CACHE_KEY = "sprintspace_page_autosave"
+LOCK_TIMEOUT = 30
+
+
+def is_write_behind_enabled():
+    return bool(frappe.conf.get("sprintspace_write_behind"))
+
+
+def get_autosave(page):
+    """Return the buffered autosave of a page, or None"""
+    return frappe.cache.hget(AUTOSAVE_CACHE_KEY, page)
+
+
+def set_autosave(page, base_version, revision, blocks):
+    frappe.cache.hset(AUTOSAVE_CACHE_KEY, page, {
+        "base_version": base_version,
+        "revision": revision,
+        "blocks": blocks,
+        "user": frappe.session.user,
+        "updated": now()
+    })
+
+
+def clear_autosave(page):
+    frappe.cache.hdel(AUTOSAVE_CACHE_KEY, page)
+
+
+def get_autosaved_pages():
+    """Names of all pages with a buffered autosave"""
+    return [
+        key.decode() if isinstance(key, bytes) else key
+        for key in frappe.cache.hkeys(AUTOSAVE_CACHE_KEY)
+    ]
+
+
+def autosave_lock(page):
+    """Lock serialising buffer updates and flushes of one page"""
+    return frappe.cache.lock(
+        frappe.cache.make_key(f"sprintspace_autosave_lock:{page}"),
+        timeout=LOCK_TIMEOUT,
+        blocking_timeout=LOCK_TIMEOUT
+    )
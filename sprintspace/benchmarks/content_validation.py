@@ -0,0 +1,62 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Per-save CPU cost of content validation on large pages.
+
+Run with `python -m sprintspace.benchmarks.content_validation` from the bench's
+apps directory (needs frappe importable, not a site).
+
+"Before" is the old save path: one `json.loads` in validate to check the
+syntax. "After" is `parse_and_validate`: one parse (orjson when installed) plus
+the block schema check, which the old path did not do.
+"""
+
+import json
+import random
+import timeit
+
+from sprintspace import validation
+
+
+def make_page(block_count):
+    blocks = []
+    for index in range(block_count):
+        kind = index % 4
+        if kind == 0:
+            blocks.append({"id": f"h{index}", "type": "header", "data": {"text": f"Section {index}", "level": 2}})
+        elif kind == 1:
+            blocks.append({"id": f"p{index}", "type": "paragraph", "data": {
+                "text": " ".join(random.choice(["<b>bold</b>", "plain", "text", "&amp;"]) for _ in range(40))
+            }})
+        elif kind == 2:
+            blocks.append({"id": f"l{index}", "type": "list", "data": {
+                "style": "unordered", "items": [f"item {n}" for n in range(8)]
+            }})
+        else:
+            blocks.append({"id": f"c{index}", "type": "checklist", "data": {
+                "items": [{"text": f"todo {n}", "checked": bool(n % 2)} for n in range(5)]
+            }})
+    return json.dumps({"time": 0, "blocks": blocks, "version": "2.30.7"})
+
+
+def before(text):
+    return json.loads(text)["blocks"]
+
+
+def after(text):
+    return validation.parse_and_validate(text)["blocks"]
+
+
+def main(block_counts=(100, 1000, 5000), repeat=5):
+    parser = "orjson" if validation.orjson else "json"
+    print(f"Parser: {parser}")
+    for block_count in block_counts:
+        text = make_page(block_count)
+        number = max(1, 2000 // block_count)
+        for label, fn in (("before", before), ("after", after)):
+            best = min(timeit.repeat(lambda: fn(text), number=number, repeat=repeat)) / number
+            print(f"{block_count:>6} blocks ({len(text) / 1024:>7.0f} KiB)  {label:<6} {best * 1000:8.2f} ms/save")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Latency, query count and payload size of every whitelisted endpoint.
+
+Run against a scratch site with `bench --site <site> sprintspace-benchmark`.
+Synthetic workspaces, pages and (with ERPNext installed) projects with tasks are
+generated first and removed afterwards unless `--keep-data` is given. Calls run
+as Administrator, one after the other, each followed by a commit as at the end
+of a request.
+
+The result is JSON, one entry per endpoint:
+
+    {"method": ..., "calls": ..., "p50_ms": ..., "p99_ms": ..., "mean_ms": ...,
+     "queries": ..., "payload_bytes": ...}
+
+where `queries` and `payload_bytes` are medians over the calls.
+"""
+
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import add_days, today
+
+from sprintspace.benchmarks.content_validation import make_page
+from sprintspace.ordering import keys_between
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import get_page_content
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import get_page_blocks
+from sprintspace.task_import import insert_tasks
+from sprintspace.transfer import EXPORT_FORMAT, import_workspace
+
+WORKSPACE_PREFIX = "Benchmark Workspace"
+PROJECT_PREFIX = "SprintSpace Benchmark"
+TASK_STATUSES = ["Open", "Working", "Pending Review", "Overdue", "Completed", "Cancelled"]
+
+PAGE_MODULE = "sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page"
+WORKSPACE_MODULE = "sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace"
+PROJECT_MODULE = "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project"
+
+
+def generate_data(workspaces=2, pages=200, blocks=50, projects=1, tasks=2000):
+    """Create synthetic workspaces, pages and projects; returns what was created"""
+    data = {"workspaces": [], "pages": [], "projects": [], "tasks": []}
+
+    for index in range(workspaces):
+        workspace = import_workspace(_workspace_lines(index, pages, blocks), f"{WORKSPACE_PREFIX} {frappe.generate_hash(length=6)}")
+        data["workspaces"].append(workspace)
+        data["pages"] += frappe.get_all("SprintSpace Page", filters={"workspace": workspace}, pluck="name", order_by="order_key asc")
+
+    if frappe.db.exists("DocType", "Project") and frappe.db.exists("DocType", "Task"):
+        for _index in range(projects):
+            project = frappe.get_doc({
+                "doctype": "Project",
+                "project_name": f"{PROJECT_PREFIX} {frappe.generate_hash(length=6)}"
+            }).insert()
+            data["projects"].append(project.name)
+            data["tasks"] += _insert_tasks(project.name, tasks)
+
+    frappe.db.commit()
+    return data
+
+
+def _workspace_lines(index, pages, blocks):
+    yield json.dumps({"type": "workspace", "format": EXPORT_FORMAT, "title": f"{WORKSPACE_PREFIX} {index}"})
+    for page, order_key in enumerate(keys_between(None, None, pages)):
+        content = json.loads(make_page(blocks))
+        yield json.dumps({
+            "type": "page",
+            "title": f"Page {page}",
+            "page_order": page + 1,
+            "order_key": order_key,
+            "blocks": content["blocks"]
+        })
+
+
+def _insert_tasks(project, count):
+    return insert_tasks(project, [
+        {"subject": f"Task {index}", "status": TASK_STATUSES[index % len(TASK_STATUSES)],
+         "exp_end_date": add_days(today(), random.randint(-30, 30))}
+        for index in range(count)
+    ])
+
+
+def delete_data(data):
+    """Remove what `generate_data` created"""
+    pages = frappe.get_all("SprintSpace Page", filters={"workspace": ("in", data["workspaces"])}, pluck="name")
+    if pages:
+        frappe.db.delete("SprintSpace Page Block", {"page": ("in", pages)})
+        frappe.db.delete("SprintSpace Page Version", {"page": ("in", pages)})
+        frappe.db.delete("SprintSpace Page", {"name": ("in", pages)})
+    for workspace in data["workspaces"]:
+        frappe.delete_doc("SprintSpace Workspace", workspace, force=True)
+    if data["projects"]:
+        frappe.db.delete("Task", {"project": ("in", data["projects"])})
+        for project in data["projects"]:
+            frappe.delete_doc("Project", project, force=True)
+    frappe.db.commit()
+
+
+def get_cases(data):
+    """(method, arguments factory) for every endpoint; factories get the call number"""
+    pages, workspaces = data["pages"], data["workspaces"]
+
+    def page():
+        return random.choice(pages)
+
+    def workspace():
+        return random.choice(workspaces)
+
+    def operations(page_name):
+        blocks = get_page_blocks(page_name)
+        return json.dumps([{
+            "op": "update",
+            "id": random.choice(blocks)["id"],
+            "block": {"type": "paragraph", "data": {"text": f"Edited {time.time()}"}}
+        }]) if blocks else "[]"
+
+    def content_version(page_name):
+        return frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+
+    def page_content(page_name):
+        return json.loads(get_page_content(page_name)["content_json"])
+
+    def new_workspace(_call):
+        # Workspaces are named by title; keep track so they are removed afterwards
+        title = f"{WORKSPACE_PREFIX} {frappe.generate_hash(length=8)}"
+        workspaces.append(title)
+        return {"title": title}
+
+    def with_page(build):
+        def factory(_call):
+            page_name = page()
+            return build(page_name)
+        return factory
+
+    cases = [
+        (f"{WORKSPACE_MODULE}.get_user_workspaces", lambda _call: {}),
+        (f"{WORKSPACE_MODULE}.create_workspace", new_workspace),
+        (f"{PAGE_MODULE}.get_workspace_pages", lambda _call: {"workspace": workspace()}),
+        (f"{PAGE_MODULE}.get_workspace_page_tree", lambda _call: {"workspace": workspace()}),
+        (f"{PAGE_MODULE}.get_page_content", lambda _call: {"page_name": page()}),
+        (f"{PAGE_MODULE}.get_page_content", lambda _call: {"page_name": page(), "block_limit": 20}),
+        (f"{PAGE_MODULE}.get_page_block_window", with_page(lambda page_name: {
+            "page_name": page_name, "after": random.choice(get_page_blocks(page_name) or [{"id": None}])["id"], "limit": 20
+        })),
+        (f"{PAGE_MODULE}.get_page_outline", lambda _call: {"page_name": page()}),
+        (f"{PAGE_MODULE}.get_page_summaries", lambda _call: {"workspace": workspace()}),
+        (f"{PAGE_MODULE}.create_page", lambda _call: {"workspace": workspace(), "title": f"New page {_call}"}),
+        (f"{PAGE_MODULE}.update_page_content", with_page(lambda page_name: {
+            "page_name": page_name,
+            "content_json": json.dumps(page_content(page_name)),
+            "base_version": content_version(page_name)
+        })),
+        (f"{PAGE_MODULE}.apply_page_operations", with_page(lambda page_name: {
+            "page_name": page_name, "operations": operations(page_name), "base_version": content_version(page_name)
+        })),
+        (f"{PAGE_MODULE}.autosave_page", with_page(lambda page_name: {
+            "page_name": page_name, "operations": operations(page_name), "base_version": content_version(page_name)
+        })),
+        (f"{PAGE_MODULE}.flush_page", lambda _call: {"page_name": page()}),
+        (f"{PAGE_MODULE}.update_page_title", lambda _call: {"page_name": page(), "title": f"Renamed {_call}"}),
+        (f"{PAGE_MODULE}.move_page", lambda _call: {"page_name": page(), "previous_page": page()}),
+        (f"{PAGE_MODULE}.reorder_pages", lambda _call: _reorder_args(workspace())),
+        (f"{PAGE_MODULE}.delete_page", lambda _call: {"page_name": pages.pop()}),
+    ]
+
+    if data["projects"]:
+        def project():
+            return random.choice(data["projects"])
+
+        def task():
+            return random.choice(data["tasks"])
+
+        cases += [
+            (f"{PROJECT_MODULE}.get_tasks_for_project", lambda _call: {"project_name": project()}),
+            (f"{PROJECT_MODULE}.get_kanban_board", lambda _call: {"project_name": project()}),
+            (f"{PROJECT_MODULE}.get_kanban_changes", lambda _call: {
+                "project_name": project(), "after_modified": frappe.utils.add_to_date(None, minutes=-5)
+            }),
+            (f"{PROJECT_MODULE}.get_kanban_column", lambda _call: {
+                "project_name": project(), "status": random.choice(TASK_STATUSES)
+            }),
+            (f"{PROJECT_MODULE}.get_project_stats", lambda _call: {"project_name": project()}),
+            (f"{PROJECT_MODULE}.update_task_status", lambda _call: {
+                "task_name": task(), "new_status": random.choice(TASK_STATUSES[:3])
+            }),
+            (f"{PROJECT_MODULE}.update_task_statuses", lambda _call: {"updates": json.dumps([
+                {"task": task(), "status": random.choice(TASK_STATUSES[:3])} for _ in range(20)
+            ])}),
+            (f"{PROJECT_MODULE}.create_sample_tasks", lambda _call: {"project_name": project()}),
+            ("sprintspace.task_import.import_tasks", lambda _call: {"project_name": project(), "rows": json.dumps([
+                {"subject": f"Imported {_call}.{index}", "status": random.choice(TASK_STATUSES)} for index in range(100)
+            ])}),
+        ]
+
+    return cases
+
+
+def _reorder_args(workspace):
+    names = frappe.get_all("SprintSpace Page", filters={"workspace": workspace, "is_archived": 0}, pluck="name")
+    random.shuffle(names)
+    return {"workspace": workspace, "page_orders": json.dumps([
+        {"name": name, "order": order} for order, name in enumerate(names, 1)
+    ])}
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements run inside the block; yields a one-item list"""
+    counter = [0]
+    sql = frappe.db.sql
+
+    def counting_sql(*args, **kwargs):
+        counter[0] += 1
+        return sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    try:
+        yield counter
+    finally:
+        del frappe.db.sql
+
+
+def run_case(method, get_args, calls):
+    function = frappe.get_attr(method)
+    timings, queries, payloads = [], [], []
+
+    for call in range(calls):
+        args = get_args(call)
+        with count_queries() as counter:
+            start = time.perf_counter()
+            result = function(**args)
+            frappe.db.commit()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(counter[0])
+        payloads.append(len(frappe.as_json(result, indent=None)))
+
+    timings.sort()
+    return {
+        "method": method,
+        "calls": calls,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "queries": statistics.median(queries),
+        "payload_bytes": statistics.median(payloads)
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted values"""
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    return values[int(index)]
+
+
+def run(workspaces=2, pages=200, blocks=50, projects=1, tasks=2000, calls=50, only=None, keep_data=False):
+    """Generate data, benchmark the endpoints and return the results
+
+    `only` limits the run to methods whose path contains the given text.
+    """
+    frappe.set_user("Administrator")
+    data = generate_data(workspaces, pages, blocks, projects, tasks)
+    try:
+        results = [
+            run_case(method, get_args, calls)
+            for method, get_args in get_cases(data)
+            if not only or only in method
+        ]
+    finally:
+        if not keep_data:
+            delete_data(data)
+
+    return {
+        "parameters": {
+            "workspaces": workspaces, "pages": pages, "blocks": blocks,
+            "projects": len(data["projects"]), "tasks": tasks if data["projects"] else 0, "calls": calls
+        },
+        "results": results
+    }
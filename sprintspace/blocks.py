@@ -0,0 +1,179 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Helpers for working with the block list of an Editor.js document."""
+
+import hashlib
+import json
+
+import frappe
+
+from sprintspace.ordering import longest_increasing
+
+
+def ensure_block_ids(blocks):
+    """Give every block a stable id, replacing missing or duplicate ones"""
+    seen = set()
+    for block in blocks:
+        if not block.get("id") or block["id"] in seen:
+            block["id"] = frappe.generate_hash(length=10)
+        seen.add(block["id"])
+    return blocks
+
+
+def get_block_hash(block):
+    """Return a hash of a block's type and data, used to detect changed blocks"""
+    payload = json.dumps([block.get("type"), block.get("data") or {}], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def apply_operations(blocks, operations):
+    """Apply block-level operations, keyed by block id, to a list of blocks.
+
+    Supported operations:
+
+        {"op": "insert", "block": {...}, "after": <block id or None>}
+        {"op": "update", "id": <block id>, "block": {"type": ..., "data": {...}}}
+        {"op": "delete", "id": <block id>}
+        {"op": "move", "id": <block id>, "after": <block id or None>}
+
+    An `after` of None places the block at the top of the page. Returns a new list;
+    the input list is left untouched.
+    """
+    blocks = list(blocks)
+    for operation in operations:
+        op = operation.get("op")
+        if op == "insert":
+            block = dict(operation.get("block") or {})
+            if not block.get("id"):
+                block["id"] = frappe.generate_hash(length=10)
+            elif _find(blocks, block["id"]) is not None:
+                frappe.throw(f"Block {block['id']} already exists.")
+            blocks.insert(_position_after(blocks, operation.get("after")), block)
+        elif op == "update":
+            index = _index_of(blocks, operation.get("id"))
+            block = dict(blocks[index])
+            block.update(operation.get("block") or {})
+            block["id"] = blocks[index]["id"]
+            blocks[index] = block
+        elif op == "delete":
+            blocks.pop(_index_of(blocks, operation.get("id")))
+        elif op == "move":
+            block = blocks.pop(_index_of(blocks, operation.get("id")))
+            blocks.insert(_position_after(blocks, operation.get("after")), block)
+        else:
+            frappe.throw(f"Unknown block operation: {op}")
+    return blocks
+
+
+def diff_operations(old, new):
+    """Return the operations that turn the `old` block list into `new`.
+
+    Blocks of `old` only need their `id` and `content_hash`; blocks of `new` need
+    ids and content. Blocks keeping their relative order are not moved.
+    """
+    new_ids = {block["id"] for block in new}
+    operations = [{"op": "delete", "id": block["id"]} for block in old if block["id"] not in new_ids]
+
+    kept = [block for block in old if block["id"] in new_ids]
+    old_by_id = {block["id"]: block for block in kept}
+    old_index = {block["id"]: index for index, block in enumerate(kept)}
+    in_place = set(longest_increasing([old_index.get(block["id"]) for block in new]))
+
+    previous = None
+    for index, block in enumerate(new):
+        old_block = old_by_id.get(block["id"])
+        if old_block is None:
+            operations.append({"op": "insert", "block": block, "after": previous})
+        else:
+            if index not in in_place:
+                operations.append({"op": "move", "id": block["id"], "after": previous})
+            if get_block_hash(block) != old_block.get("content_hash"):
+                operations.append({
+                    "op": "update",
+                    "id": block["id"],
+                    "block": {"type": block.get("type"), "data": block.get("data") or {}}
+                })
+        previous = block["id"]
+
+    return operations
+
+
+def merge_blocks(base, theirs, ours):
+    """Three-way merge of block lists that both started from `base`.
+
+    Blocks are matched by id. A block changed on one side only takes that change;
+    a block changed on both sides takes `ours`. Deleting a block loses against an
+    edit of it on the other side. Blocks that `ours` inserted or moved are placed
+    after the block they follow in `ours`; everything else keeps the order of
+    `theirs`. Returns the merged list and the ids of conflicting blocks.
+    """
+    base_hashes = {block["id"]: get_block_hash(block) for block in base}
+    their_blocks = {block["id"]: block for block in theirs}
+    our_blocks = {block["id"]: block for block in ours}
+    conflicts = []
+
+    merged = {}
+    for block_id in list(their_blocks) + [block_id for block_id in our_blocks if block_id not in their_blocks]:
+        their_block = their_blocks.get(block_id)
+        our_block = our_blocks.get(block_id)
+        base_hash = base_hashes.get(block_id)
+        their_changed = their_block is not None and get_block_hash(their_block) != base_hash
+        our_changed = our_block is not None and get_block_hash(our_block) != base_hash
+
+        if base_hash is not None and (their_block is None or our_block is None):
+            # Deleted on one side: keep it only if the other side edited it
+            block = our_block if our_changed else their_block if their_changed else None
+            if block is not None:
+                conflicts.append(block_id)
+        elif their_changed and our_changed and get_block_hash(their_block) != get_block_hash(our_block):
+            block = our_block
+            conflicts.append(block_id)
+        else:
+            block = our_block if our_changed else their_block or our_block
+
+        if block is not None:
+            merged[block_id] = block
+
+    # Blocks whose position `ours` decided: new, moved, or revived after their delete
+    base_index = {block["id"]: index for index, block in enumerate(base)}
+    in_place = {
+        ours[index]["id"]
+        for index in longest_increasing([base_index.get(block["id"]) for block in ours])
+    }
+    placed_by_ours = [
+        block["id"] for block in ours
+        if block["id"] in merged and (block["id"] not in in_place or block["id"] not in their_blocks)
+    ]
+
+    order = [block_id for block_id in their_blocks if block_id in merged and block_id not in placed_by_ours]
+    for block_id in placed_by_ours:
+        index = _index_in(ours, block_id)
+        after = next((ours[i]["id"] for i in range(index - 1, -1, -1) if ours[i]["id"] in order), None)
+        order.insert(order.index(after) + 1 if after else 0, block_id)
+
+    return [merged[block_id] for block_id in order], conflicts
+
+
+def _index_in(blocks, block_id):
+    return next(index for index, block in enumerate(blocks) if block["id"] == block_id)
+
+
+def _find(blocks, block_id):
+    for index, block in enumerate(blocks):
+        if block.get("id") == block_id:
+            return index
+    return None
+
+
+def _index_of(blocks, block_id):
+    index = _find(blocks, block_id)
+    if index is None:
+        frappe.throw(f"Block {block_id} not found on this page.")
+    return index
+
+
+def _position_after(blocks, block_id):
+    if not block_id:
+        return 0
+    return _index_of(blocks, block_id) + 1
@@ -0,0 +1,46 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Everything the workspace app needs for its first render, in one payload.
+
+The user's last workspace and page are remembered as user defaults when a page
+is opened (see `get_page_content`), so the app reopens where the user left off.
+"""
+
+import frappe
+
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    BLOCK_WINDOW_SIZE,
+    LAST_PAGE_KEY,
+    LAST_WORKSPACE_KEY,
+    get_page_content,
+    get_page_tree,
+)
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import get_user_workspaces
+
+
+@frappe.whitelist()
+def get_bootstrap():
+    """Return the user's workspaces, the page tree of the last used workspace
+    and the first window of blocks of the last opened page
+
+    Falls back to the first workspace and page when the remembered ones are gone.
+    """
+    workspaces = get_user_workspaces()
+    workspace = get_last_used(LAST_WORKSPACE_KEY, [row.name for row in workspaces])
+
+    tree = get_page_tree(workspace) if workspace else None
+    page = get_last_used(LAST_PAGE_KEY, [row["name"] for row in tree["pages"]]) if tree else None
+
+    return {
+        "workspaces": workspaces,
+        "workspace": workspace,
+        "page_tree": tree,
+        "page": get_page_content(page, BLOCK_WINDOW_SIZE) if page else None
+    }
+
+
+def get_last_used(key, names):
+    last = frappe.defaults.get_user_default(key)
+    return last if last in names else next(iter(names), None)
+
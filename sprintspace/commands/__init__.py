@@ -0,0 +1,168 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("sprintspace-reindex-search")
+@click.option("--workspace", help="Only reindex the pages of this workspace")
+@pass_context
+def reindex_search(context, workspace=None):
+    """Rebuild the page search index from the stored blocks"""
+    from sprintspace.search import rebuild_search_index
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        count = rebuild_search_index(workspace)
+        click.echo(f"Indexed {count} blocks")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-backfill-summaries")
+@click.option("--workspace", help="Only summarize the pages of this workspace")
+@pass_context
+def backfill_summaries(context, workspace=None):
+    """Compute the block statistics and page summaries of stored content"""
+    from sprintspace.summary import backfill_summaries
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        count = backfill_summaries(workspace)
+        click.echo(f"Summarized {count} pages")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-compress-content")
+@click.option("--decompress", is_flag=True, default=False, help="Store all content as plain text again")
+@pass_context
+def compress_content(context, decompress=False):
+    """Rewrite stored page and project content with the configured compression"""
+    from sprintspace.compression import compress_stored_content
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        count = compress_stored_content(decompress=decompress)
+        click.echo(f"Rewrote {count} rows")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-content-report")
+@pass_context
+def content_report(context):
+    """Show how many bytes content compression saves"""
+    from sprintspace.compression import get_compression_report
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        for row in get_compression_report():
+            ratio = row["stored_bytes"] / row["raw_bytes"] if row["raw_bytes"] else 1
+            click.echo(
+                f"{row['doctype']}: {row['compressed_rows']} compressed rows, "
+                f"{row['raw_bytes']} bytes raw, {row['stored_bytes']} stored, "
+                f"{row['saved_bytes']} saved ({ratio:.0%} of raw)"
+            )
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-export-workspace")
+@click.argument("workspace")
+@click.option("--output", required=True, type=click.Path(dir_okay=False), help="NDJSON file to write")
+@pass_context
+def export_workspace(context, workspace, output):
+    """Export a workspace with all its pages as NDJSON"""
+    from sprintspace.transfer import export_workspace
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        with open(output, "w", encoding="utf-8") as out:
+            count = export_workspace(workspace, out)
+        click.echo(f"Exported {count} pages to {output}")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-import-workspace")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--title", help="Title of the new workspace, if not the exported one")
+@pass_context
+def import_workspace(context, path, title=None):
+    """Create a workspace from an NDJSON export"""
+    from sprintspace.transfer import import_workspace
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        frappe.set_user("Administrator")
+        with open(path, encoding="utf-8") as lines:
+            workspace = import_workspace(lines, title)
+        click.echo(f"Imported workspace {workspace}")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-import-tasks")
+@click.argument("project")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@pass_context
+def import_tasks(context, project, path):
+    """Create tasks in a project from a CSV file or a JSON array of rows"""
+    from sprintspace.task_import import parse_task_rows, run_task_import
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        frappe.set_user("Administrator")
+        with open(path, encoding="utf-8") as source:
+            rows = parse_task_rows(source.read())
+
+        def echo_progress(progress):
+            click.echo(f"{progress['processed']}/{progress['total']} rows, {progress['created']} tasks created")
+
+        result = run_task_import(frappe.generate_hash(length=12), project, rows, on_progress=echo_progress)
+        for error in result["errors"]:
+            click.echo(f"Row {error['row']}: {error['error']}")
+        if result["failed"] > len(result["errors"]):
+            click.echo(f"... and {result['failed'] - len(result['errors'])} more invalid rows")
+    finally:
+        frappe.destroy()
+
+
+@click.command("sprintspace-benchmark")
+@click.option("--workspaces", default=2, help="Workspaces to generate")
+@click.option("--pages", default=200, help="Pages per workspace")
+@click.option("--blocks", default=50, help="Blocks per page")
+@click.option("--projects", default=1, help="Projects to generate (needs ERPNext)")
+@click.option("--tasks", default=2000, help="Tasks per project")
+@click.option("--calls", default=50, help="Calls per endpoint")
+@click.option("--only", help="Only benchmark methods whose path contains this text")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the JSON results to this file")
+@click.option("--keep-data", is_flag=True, default=False, help="Keep the generated data")
+@pass_context
+def benchmark(context, output=None, **options):
+    """Benchmark every SprintSpace endpoint on generated data; prints JSON"""
+    from sprintspace.benchmarks.endpoints import run
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        report = frappe.as_json(run(**options))
+        if output:
+            with open(output, "w") as out:
+                out.write(report)
+        click.echo(report)
+    finally:
+        frappe.destroy()
+
+
+commands = [reindex_search, backfill_summaries, compress_content, content_report, export_workspace, import_workspace, import_tasks, benchmark]
@@ -0,0 +1,158 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Optional compression of stored content.
+
+Compression is switched on per site with `"sprintspace_content_compression"` in
+site_config.json, set to "zlib" or "zstd" (the latter needs the `zstandard`
+package). Compressed values are stored as text with a prefix naming the codec, so
+plain and compressed rows can live side by side and `decompress_text` can always
+read both, whatever the current setting.
+"""
+
+import base64
+import json
+import zlib
+
+import frappe
+
+# Smaller values rarely shrink enough to pay for the base64 overhead
+COMPRESS_MIN_BYTES = 256
+BATCH_SIZE = 500
+
+# Stored columns holding content, as (doctype, fieldname)
+CONTENT_FIELDS = (
+    ("SprintSpace Page Block", "block_data"),
+    ("SprintSpace Page", "content_json"),
+    ("Sprintspace Project", "content_json"),
+)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        frappe.throw("Install the zstandard package to use zstd content compression.")
+    return zstandard
+
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "zstd": (
+        lambda data: _zstd().ZstdCompressor().compress(data),
+        lambda data: _zstd().ZstdDecompressor().decompress(data),
+    ),
+}
+
+
+def get_codec():
+    """Name of the codec new content is compressed with, or None"""
+    codec = frappe.conf.get("sprintspace_content_compression")
+    if codec and codec not in CODECS:
+        frappe.throw(f"Unknown content compression: {codec}")
+    return codec
+
+
+def compress_text(text, codec=None):
+    """Compress text for storage with the site's codec, if it saves space"""
+    codec = codec or get_codec()
+    if not codec or not text or len(text) < COMPRESS_MIN_BYTES or is_compressed(text):
+        return text
+
+    compressed = f"{codec}:" + base64.b64encode(CODECS[codec][0](text.encode())).decode()
+    return compressed if len(compressed) < len(text) else text
+
+
+def decompress_text(value):
+    """Return the text of a stored value, compressed or not
+
+    Content sent by clients passes through here too, so a value that only looks
+    compressed is a validation error rather than a codec exception.
+    """
+    if not is_compressed(value):
+        return value
+
+    codec, payload = value.split(":", 1)
+    try:
+        return CODECS[codec][1](base64.b64decode(payload)).decode()
+    except frappe.ValidationError:
+        raise
+    except Exception:
+        frappe.throw(f"Content is not valid {codec} compressed text.")
+
+
+def is_compressed(value):
+    return isinstance(value, str) and value.split(":", 1)[0] in CODECS and ":" in value
+
+
+def compress_stored_content(decompress=False):
+    """Rewrite all stored content with the site's codec, or back to plain text
+
+    Returns the number of rows rewritten.
+    """
+    codec = None if decompress else get_codec()
+    if not decompress and not codec:
+        frappe.throw("Set sprintspace_content_compression in site config first.")
+
+    count = 0
+    for doctype, fieldname in CONTENT_FIELDS:
+        for rows in _iter_rows(doctype, fieldname):
+            for name, value in rows:
+                text = decompress_text(value)
+                stored = text if decompress else compress_text(text, codec)
+                if stored != value:
+                    frappe.db.set_value(doctype, name, fieldname, stored, update_modified=False)
+                    count += 1
+            frappe.db.commit()
+
+    return count
+
+
+def get_compression_report():
+    """Stored and uncompressed size of content, per doctype"""
+    report = []
+    for doctype, fieldname in CONTENT_FIELDS:
+        stored = raw = rows_compressed = 0
+        for rows in _iter_rows(doctype, fieldname):
+            for _name, value in rows:
+                stored += len(value.encode())
+                raw += len(decompress_text(value).encode())
+                rows_compressed += is_compressed(value)
+
+        report.append({
+            "doctype": doctype,
+            "compressed_rows": rows_compressed,
+            "stored_bytes": stored,
+            "raw_bytes": raw,
+            "saved_bytes": raw - stored,
+        })
+    return report
+
+
+def _iter_rows(doctype, fieldname):
+    if not frappe.db.table_exists(doctype):
+        return
+
+    after = ""
+    while True:
+        rows = frappe.db.sql(f"""
+            SELECT name, `{fieldname}`
+            FROM `tab{doctype}`
+            WHERE name > %s AND IFNULL(`{fieldname}`, '') != ''
+            ORDER BY name
+            LIMIT %s
+        """, (after, BATCH_SIZE))
+        if not rows:
+            break
+        yield rows
+        after = rows[-1][0]
+
+
+def dumps(value):
+    """JSON-encode and compress a value for storage"""
+    return compress_text(json.dumps(value))
+
+
+def loads(value, default=None):
+    """Decompress and JSON-decode a stored value"""
+    return json.loads(decompress_text(value)) if value else default
@@ -164,6 +164,23 @@ workspaces = [
 # 	"Event": "frappe.desk.doctype.event.event.has_permission",
 # }
 
+# Workspace owners, members and public workspaces; lists are limited with one SQL condition
+permission_query_conditions = {
+	"SprintSpace Workspace": "sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace.get_permission_query_conditions",
+	"SprintSpace Page": "sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_permission_query_conditions",
+	"SprintSpace Page Block": "sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block.get_permission_query_conditions",
+	"SprintSpace Page Version": "sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version.get_permission_query_conditions",
+	"SprintSpace Archived Page": "sprintspace.sprintspace.doctype.sprintspace_archived_page.sprintspace_archived_page.get_permission_query_conditions",
+}
+
+has_permission = {
+	"SprintSpace Workspace": "sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace.has_permission",
+	"SprintSpace Page": "sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.has_permission",
+	"SprintSpace Page Block": "sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block.has_permission",
+	"SprintSpace Page Version": "sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version.has_permission",
+	"SprintSpace Archived Page": "sprintspace.sprintspace.doctype.sprintspace_archived_page.sprintspace_archived_page.has_permission",
+}
+
 # DocType Class
 # ---------------
 # Override standard doctype classes
@@ -184,6 +201,14 @@ workspaces = [
 # 	}
 # }
 
+doc_events = {
+	"Task": {
+		"on_update": "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.on_task_update",
+		"on_trash": "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.on_task_trash",
+		"after_rename": "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.on_task_rename"
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -205,6 +230,19 @@ workspaces = [
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		"* * * * *": [
+			"sprintspace.tasks.flush_page_autosaves"
+		]
+	},
+	"daily": [
+		"sprintspace.tasks.rebalance_page_order_keys",
+		"sprintspace.sprintspace.doctype.sprintspace_task_tombstone.sprintspace_task_tombstone.prune_task_tombstones",
+		"sprintspace.sprintspace.doctype.sprintspace_archived_page.sprintspace_archived_page.archive_old_pages"
+	],
+}
+
 # Testing
 # -------
 
@@ -238,6 +276,10 @@ workspaces = [
 # before_request = ["sprintspace.utils.before_request"]
 # after_request = ["sprintspace.utils.after_request"]
 
+# Sampled endpoint metrics, see sprintspace.metrics
+before_request = ["sprintspace.metrics.before_request"]
+after_request = ["sprintspace.metrics.after_request"]
+
 # Job Events
 # ----------
 # before_job = ["sprintspace.utils.before_job"]
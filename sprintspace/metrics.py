@@ -0,0 +1,284 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Sampled timing, query and payload metrics of SprintSpace API calls.
+
+Set `"sprintspace_metrics_sample_rate"` in site_config.json to the share of
+calls to measure (0 to 1; off when unset). For a sampled call to a whitelisted
+method of the page, workspace or project modules (TRACKED_MODULES) the request
+hooks record wall time, number and time of database queries, request and
+response bytes, and hits and misses of the app's caches. Sums and latency
+histograms are kept in redis per method and time window, and the last
+METRICS_WINDOWS windows are reported by `get_metrics` and, in Prometheus text
+format, by `get_prometheus_metrics`.
+
+Unsampled calls cost one random number.
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import flt
+from werkzeug.wrappers import Response
+
+METRICS_CACHE_PREFIX = "sprintspace_metrics"
+METRICS_WINDOW_SECONDS = 300
+METRICS_WINDOWS = 12
+
+# Modules whose whitelisted methods are measured; other paths never become a method label
+TRACKED_MODULES = (
+    "sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page",
+    "sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace",
+    "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project",
+)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BUCKET_LABELS = {str(bound) for bound in (*LATENCY_BUCKETS_MS, "+Inf")}
+
+# Sums kept per method, besides the histogram
+SUM_FIELDS = ("calls", "time_ms", "queries", "query_ms", "bytes_in", "bytes_out")
+
+
+def get_sample_rate():
+    return flt(frappe.conf.get("sprintspace_metrics_sample_rate"))
+
+
+def before_request():
+    frappe.local.sprintspace_metrics = None
+
+    sample_rate = get_sample_rate()
+    if not sample_rate or random.random() >= sample_rate:
+        return
+
+    method = get_request_method()
+    if not method or method.rpartition(".")[0] not in TRACKED_MODULES:
+        return
+
+    metrics = frappe.local.sprintspace_metrics = {
+        "method": method,
+        "start": time.perf_counter(),
+        "queries": 0,
+        "query_ms": 0.0,
+        "caches": {}
+    }
+
+    sql = frappe.db.sql
+
+    def timed_sql(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return sql(*args, **kwargs)
+        finally:
+            metrics["queries"] += 1
+            metrics["query_ms"] += (time.perf_counter() - start) * 1000
+
+    frappe.db.sql = timed_sql
+
+
+def after_request(response=None, request=None):
+    metrics = getattr(frappe.local, "sprintspace_metrics", None)
+    if not metrics:
+        return
+
+    frappe.local.sprintspace_metrics = None
+    if frappe.db and "sql" in vars(frappe.db):
+        del frappe.db.sql
+
+    # Checked once the call has run: the path alone could name anything
+    if not is_tracked_method(metrics["method"]):
+        return
+
+    request = request or frappe.request
+    record(metrics["method"], {
+        "calls": 1,
+        "time_ms": (time.perf_counter() - metrics["start"]) * 1000,
+        "queries": metrics["queries"],
+        "query_ms": metrics["query_ms"],
+        "bytes_in": (request.content_length or 0) if request else 0,
+        "bytes_out": (response.calculate_content_length() or 0) if response else 0
+    }, metrics["caches"])
+
+
+def get_request_method():
+    """Dotted path of the whitelisted method a request calls, if any"""
+    path = frappe.request.path if frappe.request else ""
+    if path.startswith("/api/method/"):
+        return path[len("/api/method/"):].strip("/")
+    return frappe.form_dict.get("cmd")
+
+
+def is_tracked_method(method):
+    """Whether `method` is the dotted path of a whitelisted function in TRACKED_MODULES"""
+    module, _, name = method.rpartition(".")
+    if module not in TRACKED_MODULES:
+        return False
+    function = getattr(frappe.get_module(module), name, None)
+    return function is not None and function in frappe.whitelisted
+
+
+def record_cache_access(cache, hit):
+    """Count a hit or miss of one of the app's caches in the sampled call, if any"""
+    metrics = getattr(frappe.local, "sprintspace_metrics", None)
+    if metrics:
+        counts = metrics["caches"].setdefault(cache, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def record(method, values, caches=None):
+    """Add one call's values to the current window, in one redis round trip"""
+    window = int(time.time()) // METRICS_WINDOW_SECONDS
+    key = frappe.cache.make_key(f"{METRICS_CACHE_PREFIX}:{window}")
+
+    pipeline = frappe.cache.pipeline()
+    for field in SUM_FIELDS:
+        pipeline.hincrbyfloat(key, f"{method}|{field}", values[field])
+    pipeline.hincrby(key, f"{method}|le|{get_bucket(values['time_ms'])}", 1)
+    for cache, (hits, misses) in (caches or {}).items():
+        pipeline.hincrby(key, f"{method}|cache|{cache}|hits", hits)
+        pipeline.hincrby(key, f"{method}|cache|{cache}|misses", misses)
+    pipeline.expire(key, METRICS_WINDOW_SECONDS * (METRICS_WINDOWS + 1))
+    pipeline.execute()
+
+
+def get_bucket(time_ms):
+    return next((bound for bound in LATENCY_BUCKETS_MS if time_ms <= bound), "+Inf")
+
+
+def get_totals():
+    """Sum the stored windows: returns ({method: {field: value}}, {cache: {"hits", "misses"}})
+
+    Besides the SUM_FIELDS, a method's totals hold its latency "buckets" and the
+    "caches" it used; the second result adds up the caches over all methods.
+    """
+    window = int(time.time()) // METRICS_WINDOW_SECONDS
+    methods, caches = {}, {}
+
+    # A raw pipeline: the values are plain numbers, not pickled like other cache entries
+    pipeline = frappe.cache.pipeline()
+    for offset in range(METRICS_WINDOWS):
+        pipeline.hgetall(frappe.cache.make_key(f"{METRICS_CACHE_PREFIX}:{window - offset}"))
+
+    for stored in pipeline.execute():
+        for field, value in stored.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            value = float(value)
+            # Split from the right: of all parts only the method could contain a "|"
+            parts = field.rsplit("|", 3)
+            if len(parts) == 4 and parts[1] == "cache" and parts[3] in ("hits", "misses"):
+                method, _, cache, result = parts
+                method_caches = methods.setdefault(method, {}).setdefault("caches", {})
+                for totals in (method_caches.setdefault(cache, {"hits": 0, "misses": 0}),
+                               caches.setdefault(cache, {"hits": 0, "misses": 0})):
+                    totals[result] += int(value)
+                continue
+
+            parts = field.rsplit("|", 2)
+            if len(parts) == 3 and parts[1] == "le" and parts[2] in BUCKET_LABELS:
+                buckets = methods.setdefault(parts[0], {}).setdefault("buckets", {})
+                buckets[parts[2]] = buckets.get(parts[2], 0) + int(value)
+                continue
+
+            method, _, name = field.rpartition("|")
+            if name in SUM_FIELDS:
+                totals = methods.setdefault(method, {})
+                totals[name] = totals.get(name, 0) + value
+
+    return methods, caches
+
+
+def get_percentile(buckets, calls, percent):
+    """Upper bound of the histogram bucket holding the given percentile"""
+    seen = 0
+    for bound in (*LATENCY_BUCKETS_MS, "+Inf"):
+        seen += buckets.get(str(bound), 0)
+        if seen >= calls * percent / 100:
+            return bound
+    return "+Inf"
+
+
+def escape_label(value):
+    """A label value as Prometheus text format requires: backslash, quote and newline escaped"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@frappe.whitelist()
+def get_metrics():
+    """Per-method averages and latency percentiles over the last METRICS_WINDOWS windows"""
+    frappe.only_for("System Manager")
+
+    methods, caches = get_totals()
+    report = []
+    for method, totals in sorted(methods.items()):
+        calls = totals.get("calls") or 0
+        if not calls:
+            continue
+        buckets = totals.get("buckets", {})
+        report.append({
+            "method": method,
+            "sampled_calls": int(calls),
+            "mean_ms": round(totals["time_ms"] / calls, 3),
+            "p50_ms": get_percentile(buckets, calls, 50),
+            "p99_ms": get_percentile(buckets, calls, 99),
+            "mean_queries": round(totals["queries"] / calls, 2),
+            "mean_query_ms": round(totals["query_ms"] / calls, 3),
+            "mean_bytes_in": round(totals["bytes_in"] / calls),
+            "mean_bytes_out": round(totals["bytes_out"] / calls),
+            "caches": totals.get("caches", {})
+        })
+
+    return {
+        "sample_rate": get_sample_rate(),
+        "window_minutes": METRICS_WINDOW_SECONDS * METRICS_WINDOWS // 60,
+        "methods": report,
+        "caches": caches
+    }
+
+
+@frappe.whitelist()
+def get_prometheus_metrics():
+    """The same totals in Prometheus text format, as gauges over the reported windows"""
+    frappe.only_for("System Manager")
+
+    # Per-method cache series add up to the totals, so only those are exported
+    methods, _ = get_totals()
+    lines = []
+
+    def add(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{escape_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value:g}")
+
+    window = f"last {METRICS_WINDOW_SECONDS * METRICS_WINDOWS // 60} minutes, sampled"
+    add("sprintspace_calls", f"Calls per method ({window})", [
+        ({"method": method}, totals.get("calls", 0)) for method, totals in methods.items()
+    ])
+    bucket_samples = []
+    for method, totals in methods.items():
+        cumulative = 0
+        for bound in (*LATENCY_BUCKETS_MS, "+Inf"):
+            cumulative += totals.get("buckets", {}).get(str(bound), 0)
+            bucket_samples.append(({"method": method, "le": bound if bound == "+Inf" else bound / 1000}, cumulative))
+    add("sprintspace_call_duration_seconds_bucket", f"Calls at or under a duration ({window})", bucket_samples)
+    for field, name, scale, help_text in (
+        ("time_ms", "sprintspace_call_duration_seconds_sum", 1000, "Total call time"),
+        ("queries", "sprintspace_db_queries_sum", 1, "Total database queries"),
+        ("query_ms", "sprintspace_db_query_seconds_sum", 1000, "Total database query time"),
+        ("bytes_in", "sprintspace_request_bytes_sum", 1, "Total request body bytes"),
+        ("bytes_out", "sprintspace_response_bytes_sum", 1, "Total response body bytes"),
+    ):
+        add(name, f"{help_text} per method ({window})", [
+            ({"method": method}, totals.get(field, 0) / scale) for method, totals in methods.items()
+        ])
+    add("sprintspace_cache_requests", f"Cache lookups per method, cache and result ({window})", [
+        ({"method": method, "cache": cache, "result": result}, counts[field])
+        for method, totals in methods.items()
+        for cache, counts in totals.get("caches", {}).items()
+        for result, field in (("hit", "hits"), ("miss", "misses"))
+    ])
+
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
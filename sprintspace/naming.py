@@ -0,0 +1,78 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Names for rows written with bulk inserts.
+
+Documents inserted one by one take their name from a naming series; bulk
+inserts reserve a whole range of the same series in one step instead.
+"""
+
+import re
+
+import frappe
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint
+
+# Braced parts of a "format:" autoname, as frappe finds them
+BRACED_PARAMS_PATTERN = re.compile(r"(\{[\w | #]+\})")
+# Stands in for the counter while a format autoname is parsed
+SERIES_PLACEHOLDER = "\0"
+
+
+def reserve_numbers(prefix, count):
+    """Advance the series of `prefix` by `count` at once; returns the numbers taken"""
+    if not frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE name = %s FOR UPDATE", prefix):
+        frappe.db.sql("INSERT INTO `tabSeries` (name, `current`) VALUES (%s, 0)", prefix)
+    frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE name = %s", (count, prefix))
+    last = cint(frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE name = %s", prefix)[0][0])
+    return range(last - count + 1, last + 1)
+
+
+def reserve_names(prefix, count, digits=5):
+    """Take `count` consecutive names from the series of `prefix` at once"""
+    return [f"{prefix}{number:0{digits}d}" for number in reserve_numbers(prefix, count)]
+
+
+def reserve_series_names(naming_series, count):
+    """Like `reserve_names` for a naming series such as "TASK-.YYYY.-.#####"
+
+    The series may leave out the trailing hashes; five digits are used then.
+    """
+    parts = naming_series.split(".")
+    digits = 5
+    if parts[-1] and set(parts[-1]) == {"#"}:
+        digits = len(parts.pop())
+    return reserve_names(parse_naming_series(".".join(parts)), count, digits)
+
+
+def reserve_autonames(doctype, count):
+    """Take `count` consecutive names as the autoname of `doctype` would give them
+
+    The autoname is a naming series such as "PAGE-.#####" or a format such as
+    "format:PAGE-{#####}". Braced parts of a format are parsed one by one with
+    frappe's `parse_naming_series`, as frappe does, so the counter comes from
+    the same series key that documents inserted one by one use.
+    """
+    autoname = frappe.get_meta(doctype).autoname or ""
+    if not autoname.startswith("format:"):
+        if "." not in autoname or ":" in autoname:
+            frappe.throw(f"{doctype} is not named from a series.")
+        return reserve_series_names(autoname, count)
+
+    series = {}
+
+    def take_series(key, digits):
+        series.update(key=key, digits=digits)
+        return SERIES_PLACEHOLDER
+
+    template = BRACED_PARAMS_PATTERN.sub(
+        lambda match: parse_naming_series([match.group()[1:-1]], doctype=doctype, number_generator=take_series),
+        autoname.split(":", 1)[1]
+    )
+    if not series:
+        frappe.throw(f"{doctype} is not named from a series.")
+
+    return [
+        template.replace(SERIES_PLACEHOLDER, f"{number:0{series['digits']}d}")
+        for number in reserve_numbers(series["key"], count)
+    ]
@@ -0,0 +1,137 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Fractional ordering keys.
+
+Keys are base-36 strings that sort the same way in Python and in the database
+(lowercase letters and digits only, never ending in "0"), so a new key can always
+be generated between two neighbours and a move only has to rewrite the item
+that moved.
+"""
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def key_between(before=None, after=None):
+    """Return a key that sorts strictly between `before` and `after`.
+
+    Either side may be None to mean the start or the end of the list.
+    """
+    before = before or ""
+    if after is not None and before >= after:
+        raise ValueError(f"Cannot generate a key between {before!r} and {after!r}")
+
+    key = ""
+    i = 0
+    while True:
+        low = DIGITS.index(before[i]) if i < len(before) else 0
+        high = DIGITS.index(after[i]) if after is not None and i < len(after) else BASE
+        if low == high:
+            key += DIGITS[low]
+            i += 1
+            continue
+
+        middle = (low + high) // 2
+        if middle > low:
+            return key + DIGITS[middle]
+
+        # The digits are adjacent: keep the lower one and look for room further right
+        key += DIGITS[low]
+        i += 1
+        after = None
+
+
+def key_after(key):
+    """Return a short key that sorts after `key`, used when appending"""
+    for i, digit in enumerate(key or ""):
+        if digit != DIGITS[-1]:
+            return key[:i] + DIGITS[DIGITS.index(digit) + 1]
+    return key_between(key, None)
+
+
+def key_before(key):
+    """Return a short key that sorts before `key`, used when prepending"""
+    for i, digit in enumerate(key or ""):
+        if digit > DIGITS[1]:
+            return key[:i] + DIGITS[DIGITS.index(digit) - 1]
+        if digit != DIGITS[0]:
+            # Lowering a "1" would leave a trailing "0"
+            break
+    return key_between(None, key)
+
+
+def keys_between(before, after, count):
+    """Return `count` evenly spread keys between `before` and `after`"""
+    if count <= 0:
+        return []
+
+    # Anchor open-ended ranges on a short key so repeated appends stay short
+    if before and after is None:
+        after = key_after(before)
+        return [*keys_between(before, after, count - 1), after]
+    if after and before is None:
+        before = key_before(after)
+        return [before, *keys_between(before, after, count - 1)]
+
+    middle = key_between(before, after)
+    left = (count - 1) // 2
+    return [*keys_between(before, middle, left), middle, *keys_between(middle, after, count - 1 - left)]
+
+
+def assign_keys(keys):
+    """Make a list of keys strictly increasing while keeping as many as possible.
+
+    `keys` holds the current key of each item in the desired order, or None for
+    items that have no key yet. The longest increasing run of existing keys is
+    kept and every other item gets a new key between its kept neighbours.
+    Returns the new list of keys.
+    """
+    kept = set(longest_increasing(keys))
+    result = list(keys)
+
+    i = 0
+    while i < len(keys):
+        if i in kept:
+            i += 1
+            continue
+
+        start = i
+        while i < len(keys) and i not in kept:
+            i += 1
+
+        before = result[start - 1] if start > 0 else None
+        after = result[i] if i < len(keys) else None
+        result[start:i] = keys_between(before, after, i - start)
+
+    return result
+
+
+def longest_increasing(keys):
+    """Indexes of the longest strictly increasing subsequence of the non-empty keys"""
+    tails = []  # index of the smallest tail key for each subsequence length
+    previous = {}
+    for index, key in enumerate(keys):
+        if key is None:
+            continue
+
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if keys[tails[middle]] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        previous[index] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+
+    sequence = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        sequence.append(index)
+        index = previous[index]
+    return reversed(sequence)
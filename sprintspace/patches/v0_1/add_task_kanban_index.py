@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Index tasks for per-column kanban pages (project, status, newest first)"""
+    if not frappe.db.table_exists("Task"):
+        return
+
+    frappe.db.add_index("Task", ["project", "status", "modified"])
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Index tasks for kanban delta sync (project, changed since a cursor)"""
+    if not frappe.db.table_exists("Task"):
+        return
+
+    frappe.db.add_index("Task", ["project", "modified", "name"])
@@ -0,0 +1,6 @@
+from sprintspace.summary import backfill_summaries
+
+
+def execute():
+    """Compute the summaries of pages stored before summaries were added"""
+    backfill_summaries()
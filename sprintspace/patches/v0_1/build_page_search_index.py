@@ -0,0 +1,6 @@
+from sprintspace.search import rebuild_search_index
+
+
+def execute():
+    """Fill the search text of blocks stored before search was added"""
+    rebuild_search_index()
@@ -0,0 +1,30 @@
+import json
+
+import frappe
+
+from sprintspace.blocks import ensure_block_ids
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import save_page_blocks
+
+
+def execute():
+    """Move the content_json of existing pages into SprintSpace Page Block rows"""
+    pages = frappe.get_all(
+        "SprintSpace Page",
+        filters={"content_json": ("is", "set")},
+        pluck="name"
+    )
+
+    for index, page in enumerate(pages, 1):
+        content_json = frappe.db.get_value("SprintSpace Page", page, "content_json")
+        try:
+            content = json.loads(content_json)
+        except ValueError:
+            # Leave unparseable content in place; it is migrated on its next valid save
+            continue
+
+        blocks = content.get("blocks") if isinstance(content, dict) else None
+        save_page_blocks(page, ensure_block_ids(blocks or []))
+        frappe.db.set_value("SprintSpace Page", page, "content_json", None, update_modified=False)
+
+        if index % 100 == 0:
+            frappe.db.commit()
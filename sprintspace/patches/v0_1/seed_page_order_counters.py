@@ -0,0 +1,13 @@
+import frappe
+
+
+def execute():
+    """Start each workspace's page order counter after its highest page_order"""
+    frappe.db.sql("""
+        UPDATE `tabSprintSpace Workspace` workspace
+        SET page_order_counter = (
+            SELECT COALESCE(MAX(page.page_order), 0)
+            FROM `tabSprintSpace Page` page
+            WHERE page.workspace = workspace.name
+        )
+    """)
@@ -0,0 +1,15 @@
+import frappe
+
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import rebalance_page_order
+
+
+def execute():
+    """Give existing pages order keys that follow their current page_order"""
+    workspaces = frappe.db.sql_list("""
+        SELECT DISTINCT workspace
+        FROM `tabSprintSpace Page`
+        WHERE IFNULL(order_key, '') = ''
+    """)
+
+    for workspace in workspaces:
+        rebalance_page_order(workspace)
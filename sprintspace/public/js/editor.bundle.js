@@ -46,9 +46,18 @@
     projectField: "project",
     statusField: "status",
     statuses: ["Backlog", "To Do", "In Progress", "Review", "Done"],
-    linkMode: "by_title" // "by_title" uses frm.doc.title; "by_name" uses frm.doc.name
+    linkMode: "by_title", // "by_title" uses frm.doc.title; "by_name" uses frm.doc.name
+    pageLength: 20, // cards loaded per column, more are fetched on scroll
+    syncInterval: 30000, // ms between polls for changes made elsewhere, while realtime is down
+    realtimeSyncEvery: 10 // with realtime up, still poll on every n-th interval as a safety net
   };
 
+  const TASK_CHANGE_EVENT = "sprintspace_task_change";
+
+  function realtimeConnected() {
+    return !!(frappe.realtime && frappe.realtime.socket && frappe.realtime.socket.connected);
+  }
+
   // Custom Kanban Tool for Editor.js
   class SprintSpaceKanbanTool {
     static get toolbox() {
@@ -61,6 +70,15 @@
     constructor({data}) {
       this.data = data || {};
       this.wrapper = null;
+      this.projectKey = null;
+      this.counts = {};
+      this.cursors = {};
+      this.syncCursor = null;
+      this.syncTimer = null;
+      this.syncing = false;
+      this.syncTicks = 0;
+      this.pendingMoves = {};
+      this.onTaskChange = this.handleTaskChange.bind(this);
     }
 
     render() {
@@ -91,16 +109,28 @@
 
       try {
         const response = await frappe.call({
-          method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_tasks_for_project",
+          method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_board",
           args: { 
             project_name: projectKey, 
             project_field: kanbanConfig.projectField, 
-            status_field: kanbanConfig.statusField 
+            status_field: kanbanConfig.statusField,
+            page_length: kanbanConfig.pageLength
           }
         });
 
-        const tasksByStatus = response.message || {};
+        const board = response.message || {};
+        this.projectKey = projectKey;
+        this.counts = board.counts || {};
+        this.cursors = {};
+        const tasksByStatus = {};
+        Object.keys(board.columns || {}).forEach(status => {
+          tasksByStatus[status] = board.columns[status].tasks;
+          this.cursors[status] = board.columns[status].cursor;
+        });
         this.renderKanban(tasksByStatus, projectKey);
+        this.syncCursor = board.sync_cursor;
+        this.subscribe();
+        this.startSync();
 
       } catch (error) {
         console.error('Error loading kanban:', error);
@@ -120,23 +150,153 @@
       this.setupDragAndDrop();
       
       // Add button to create sample tasks if no tasks exist
-      if (Object.keys(tasksByStatus).length === 0 || 
-          Object.values(tasksByStatus).every(tasks => tasks.length === 0)) {
+      if (Object.values(this.counts).every(count => !count)) {
         this.addSampleTasksButton(projectKey);
       }
     }
 
+    subscribe() {
+      if (!frappe.realtime) return;
+      frappe.realtime.doc_subscribe("Project", this.projectKey);
+      frappe.realtime.off(TASK_CHANGE_EVENT, this.onTaskChange);
+      frappe.realtime.on(TASK_CHANGE_EVENT, this.onTaskChange);
+    }
+
+    unsubscribe() {
+      if (!frappe.realtime) return;
+      frappe.realtime.off(TASK_CHANGE_EVENT, this.onTaskChange);
+      frappe.realtime.doc_unsubscribe("Project", this.projectKey);
+    }
+
+    startSync() {
+      clearInterval(this.syncTimer);
+      this.syncTimer = setInterval(() => {
+        // Stop once the block has been removed from the page
+        if (!document.body.contains(this.wrapper)) {
+          clearInterval(this.syncTimer);
+          this.unsubscribe();
+          return;
+        }
+        // Pushed changes keep the board current; poll only as a fallback
+        if (realtimeConnected() && ++this.syncTicks % kanbanConfig.realtimeSyncEvery) return;
+        this.syncChanges();
+      }, kanbanConfig.syncInterval);
+    }
+
+    handleTaskChange(message) {
+      if (!message || message.project !== this.projectKey) return;
+
+      if (message.reload) {
+        // Many tasks changed at once, e.g. by a bulk import
+        clearInterval(this.syncTimer);
+        this.loadAndRender();
+        return;
+      }
+
+      if (message.deleted) {
+        this.removeCard(message.deleted);
+        if (message.previous_status) this.adjustCount(message.previous_status, -1);
+      }
+
+      const task = message.task;
+      if (task) {
+        // Our own drag and drop already counted this move
+        if (this.pendingMoves[task.name] === task.status) {
+          delete this.pendingMoves[task.name];
+        } else {
+          if (message.previous_status) this.adjustCount(message.previous_status, -1);
+          this.adjustCount(task.status, 1);
+        }
+        this.placeCard(task);
+      }
+
+      this.updateColumnCounts();
+    }
+
+    adjustCount(status, delta) {
+      this.counts[status] = Math.max((this.counts[status] || 0) + delta, 0);
+    }
+
+    async syncChanges() {
+      if (!this.syncCursor || this.syncing) return;
+
+      this.syncing = true;
+      try {
+        let hasMore = true;
+        while (hasMore) {
+          const response = await frappe.call({
+            method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_changes",
+            args: {
+              project_name: this.projectKey,
+              after_modified: this.syncCursor.modified,
+              after_name: this.syncCursor.name,
+              project_field: kanbanConfig.projectField,
+              status_field: kanbanConfig.statusField
+            }
+          });
+
+          const changes = response.message || {};
+          if (changes.reset) {
+            // Too far behind to catch up from tombstones
+            clearInterval(this.syncTimer);
+            await this.loadAndRender();
+            return;
+          }
+
+          this.applyChanges(changes);
+          this.syncCursor = changes.cursor;
+          hasMore = changes.has_more;
+        }
+      } catch (error) {
+        console.error('Error syncing kanban:', error);
+      } finally {
+        this.syncing = false;
+      }
+    }
+
+    applyChanges(changes) {
+      (changes.deleted || []).forEach(name => this.removeCard(name));
+      (changes.tasks || []).forEach(task => this.placeCard(task));
+
+      if (changes.counts) {
+        this.counts = changes.counts;
+        this.updateColumnCounts();
+      }
+    }
+
+    removeCard(name) {
+      const card = this.wrapper.querySelector(`.kanban-card[data-name="${name}"]`);
+      if (card) card.remove();
+    }
+
+    placeCard(task) {
+      this.removeCard(task.name);
+
+      // Columns are sorted newest first, so a changed task goes to the top
+      const list = this.wrapper.querySelector(`.kanban-col[data-status="${task.status}"] .kanban-list`);
+      if (!list) return;
+      const emptyState = list.querySelector('.empty-state');
+      if (emptyState) emptyState.remove();
+      list.prepend(this.createTaskCard(task));
+    }
+
     createColumn(status, tasks) {
       const column = document.createElement('div');
       column.className = 'kanban-col';
       column.dataset.status = status;
 
       const header = document.createElement('h4');
-      header.textContent = `${status} (${tasks.length})`;
+      header.textContent = `${status} (${this.counts[status] || 0})`;
       column.appendChild(header);
 
       const list = document.createElement('div');
       list.className = 'kanban-list';
+      // Fetch the next page of this column when scrolled near the bottom
+      list.addEventListener('scroll', () => {
+        if (list.scrollTop + list.clientHeight >= list.scrollHeight - 50) {
+          this.loadMoreTasks(status, list);
+        }
+      });
 
       if (tasks.length === 0) {
         const emptyState = document.createElement('div');
@@ -177,6 +337,39 @@
       return card;
     }
 
+    async loadMoreTasks(status, list) {
+      const cursor = this.cursors[status];
+      if (!cursor || list.dataset.loading) return;
+
+      list.dataset.loading = '1';
+      try {
+        const response = await frappe.call({
+          method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_column",
+          args: {
+            project_name: this.projectKey,
+            status: status,
+            after_modified: cursor.modified,
+            after_name: cursor.name,
+            project_field: kanbanConfig.projectField,
+            status_field: kanbanConfig.statusField,
+            page_length: kanbanConfig.pageLength
+          }
+        });
+
+        const page = response.message || {};
+        (page.tasks || []).forEach(task => {
+          if (!list.querySelector(`.kanban-card[data-name="${task.name}"]`)) {
+            list.appendChild(this.createTaskCard(task));
+          }
+        });
+        this.cursors[status] = page.cursor;
+      } catch (error) {
+        console.error('Error loading more tasks:', error);
+      } finally {
+        delete list.dataset.loading;
+      }
+    }
+
     setupDragAndDrop() {
       // Drag start
       this.wrapper.addEventListener('dragstart', (e) => {
@@ -218,6 +411,7 @@
 
         if (column && draggingCard) {
           const newStatus = column.dataset.status;
+          const oldStatus = draggingCard.closest('.kanban-col').dataset.status;
           const taskName = draggingCard.dataset.name;
           const list = column.querySelector('.kanban-list');
 
@@ -229,6 +423,9 @@
 
           // Move the card visually
           list.appendChild(draggingCard);
+          if (oldStatus !== newStatus) {
+            this.pendingMoves[taskName] = newStatus;
+          }
 
           // Update the status in the backend
           try {
@@ -244,11 +441,16 @@
             showSuccess(`Moved ${taskName} → ${newStatus}`);
             
             // Update column headers with new counts
+            if (oldStatus !== newStatus) {
+              this.counts[oldStatus] = Math.max((this.counts[oldStatus] || 0) - 1, 0);
+              this.counts[newStatus] = (this.counts[newStatus] || 0) + 1;
+            }
             this.updateColumnCounts();
 
           } catch (error) {
             console.error('Error updating task status:', error);
             showError('Failed to update task status');
+            delete this.pendingMoves[taskName];
             // Reload the kanban to revert the visual change
             this.loadAndRender();
           }
@@ -262,11 +464,11 @@
     }
 
     updateColumnCounts() {
+      // Columns only hold the loaded cards, so headers show the server-side totals
       this.wrapper.querySelectorAll('.kanban-col').forEach(column => {
         const status = column.dataset.status;
-        const taskCount = column.querySelectorAll('.kanban-card').length;
         const header = column.querySelector('h4');
-        header.textContent = `${status} (${taskCount})`;
+        header.textContent = `${status} (${this.counts[status] || 0})`;
       });
     }
 
@@ -1020,11 +1020,12 @@ SprintSpace.renderKanban = async function(frm) {
     
     try {
         const response = await frappe.call({
-            method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_tasks_for_project",
+            method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_board",
             args: { 
                 project_name: frm.doc.title, 
                 project_field: "project", 
-                status_field: "status" 
+                status_field: "status",
+                page_length: SprintSpace.KANBAN_PAGE_LENGTH
             }
         });
 
@@ -1035,15 +1036,38 @@ SprintSpace.renderKanban = async function(frm) {
     }
 };
 
-SprintSpace.createKanbanHTML = function(tasksByStatus, projectName) {
+// Cards loaded per column; the rest are fetched as the column is scrolled
+SprintSpace.KANBAN_PAGE_LENGTH = 20;
+
+// ms between polls for changes made elsewhere, while realtime is down; with
+// realtime up, every KANBAN_REALTIME_SYNC_EVERY-th poll still runs as a safety net
+SprintSpace.KANBAN_SYNC_INTERVAL = 30000;
+SprintSpace.KANBAN_REALTIME_SYNC_EVERY = 10;
+SprintSpace.TASK_CHANGE_EVENT = "sprintspace_task_change";
+
+// Server-side totals, next-page cursors and sync cursor of the rendered board,
+// plus our own moves whose change events should not be counted twice
+SprintSpace.kanbanState = { project: null, counts: {}, cursors: {}, syncCursor: null, pendingMoves: {} };
+
+SprintSpace.createKanbanHTML = function(board, projectName) {
     const statuses = ["Open", "Working", "Pending Review", "Completed", "Cancelled"];
+    const columns = board.columns || {};
+    SprintSpace.kanbanState = {
+        project: projectName,
+        counts: board.counts || {},
+        cursors: {},
+        syncCursor: board.sync_cursor,
+        pendingMoves: {}
+    };
+
     let html = '<div class="kanban-wrap" data-project="' + projectName + '">';
     
     statuses.forEach(status => {
-        const tasks = tasksByStatus[status] || [];
+        const tasks = (columns[status] && columns[status].tasks) || [];
+        SprintSpace.kanbanState.cursors[status] = columns[status] ? columns[status].cursor : null;
         html += `
             <div class="kanban-col" data-status="${status}">
-                <h4>${status} (${tasks.length})</h4>
+                <h4>${status} (${SprintSpace.kanbanState.counts[status] || 0})</h4>
                 <div class="kanban-list">
         `;
         
@@ -1051,15 +1075,7 @@ SprintSpace.createKanbanHTML = function(tasksByStatus, projectName) {
             html += '<div class="empty-state">No tasks</div>';
         } else {
             tasks.forEach(task => {
-                html += `
-                    <div class="kanban-card" draggable="true" data-name="${task.name}">
-                        <div class="title">${frappe.utils.escape_html(task.subject || task.name)}</div>
-                        <div class="meta">
-                            <span>${task.owner || 'Unassigned'}</span>
-                            <span>${task.exp_end_date ? frappe.datetime.str_to_user(task.exp_end_date) : ''}</span>
-                        </div>
-                    </div>
-                `;
+                html += SprintSpace.createKanbanCardHTML(task);
             });
         }
         
@@ -1067,7 +1083,7 @@ SprintSpace.createKanbanHTML = function(tasksByStatus, projectName) {
     });
     
     // Add sample tasks button if no tasks exist
-    const totalTasks = Object.values(tasksByStatus).reduce((sum, tasks) => sum + tasks.length, 0);
+    const totalTasks = Object.values(SprintSpace.kanbanState.counts).reduce((sum, count) => sum + count, 0);
     if (totalTasks === 0) {
         html += `
             <div style="position: absolute; bottom: 20px; left: 50%; transform: translateX(-50%);">
@@ -1082,6 +1098,181 @@ SprintSpace.createKanbanHTML = function(tasksByStatus, projectName) {
     return html;
 };
 
+SprintSpace.createKanbanCardHTML = function(task) {
+    return `
+        <div class="kanban-card" draggable="true" data-name="${task.name}">
+            <div class="title">${frappe.utils.escape_html(task.subject || task.name)}</div>
+            <div class="meta">
+                <span>${task.owner || 'Unassigned'}</span>
+                <span>${task.exp_end_date ? frappe.datetime.str_to_user(task.exp_end_date) : ''}</span>
+            </div>
+        </div>
+    `;
+};
+
+SprintSpace.loadMoreKanbanTasks = async function(column) {
+    const state = SprintSpace.kanbanState;
+    const status = column.dataset.status;
+    const cursor = state.cursors[status];
+    const list = column.querySelector('.kanban-list');
+    if (!cursor || list.dataset.loading) return;
+
+    list.dataset.loading = '1';
+    try {
+        const response = await frappe.call({
+            method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_column",
+            args: {
+                project_name: state.project,
+                status: status,
+                after_modified: cursor.modified,
+                after_name: cursor.name,
+                project_field: "project",
+                status_field: "status",
+                page_length: SprintSpace.KANBAN_PAGE_LENGTH
+            }
+        });
+
+        const page = response.message || {};
+        (page.tasks || []).forEach(task => {
+            if (!list.querySelector(`.kanban-card[data-name="${task.name}"]`)) {
+                list.insertAdjacentHTML('beforeend', SprintSpace.createKanbanCardHTML(task));
+            }
+        });
+        state.cursors[status] = page.cursor;
+    } catch (error) {
+        console.error('Error loading more tasks:', error);
+    } finally {
+        delete list.dataset.loading;
+    }
+};
+
+SprintSpace.startKanbanSync = function() {
+    const project = SprintSpace.kanbanState.project;
+    if (frappe.realtime) {
+        frappe.realtime.doc_subscribe("Project", project);
+        frappe.realtime.off(SprintSpace.TASK_CHANGE_EVENT, SprintSpace.handleTaskChange);
+        frappe.realtime.on(SprintSpace.TASK_CHANGE_EVENT, SprintSpace.handleTaskChange);
+    }
+
+    let ticks = 0;
+    clearInterval(SprintSpace.kanbanSyncTimer);
+    SprintSpace.kanbanSyncTimer = setInterval(() => {
+        // Stop once the board has been removed from the page
+        if (!document.querySelector('.kanban-wrap')) {
+            clearInterval(SprintSpace.kanbanSyncTimer);
+            if (frappe.realtime) {
+                frappe.realtime.off(SprintSpace.TASK_CHANGE_EVENT, SprintSpace.handleTaskChange);
+                frappe.realtime.doc_unsubscribe("Project", project);
+            }
+            return;
+        }
+        // Pushed changes keep the board current; poll only as a fallback
+        const connected = frappe.realtime && frappe.realtime.socket && frappe.realtime.socket.connected;
+        if (connected && ++ticks % SprintSpace.KANBAN_REALTIME_SYNC_EVERY) return;
+        SprintSpace.syncKanban();
+    }, SprintSpace.KANBAN_SYNC_INTERVAL);
+};
+
+SprintSpace.handleTaskChange = function(message) {
+    const state = SprintSpace.kanbanState;
+    if (!message || message.project !== state.project) return;
+
+    if (message.reload) {
+        // Many tasks changed at once, e.g. by a bulk import
+        clearInterval(SprintSpace.kanbanSyncTimer);
+        cur_frm.refresh();
+        return;
+    }
+
+    const adjust = (status, delta) => {
+        state.counts[status] = Math.max((state.counts[status] || 0) + delta, 0);
+    };
+
+    if (message.deleted) {
+        SprintSpace.applyKanbanChanges({ deleted: [message.deleted] });
+        if (message.previous_status) adjust(message.previous_status, -1);
+    }
+
+    const task = message.task;
+    if (task) {
+        // Our own drag and drop already counted this move
+        if (state.pendingMoves[task.name] === task.status) {
+            delete state.pendingMoves[task.name];
+        } else {
+            if (message.previous_status) adjust(message.previous_status, -1);
+            adjust(task.status, 1);
+        }
+        SprintSpace.applyKanbanChanges({ tasks: [task] });
+    }
+
+    SprintSpace.updateKanbanCounts();
+};
+
+SprintSpace.syncKanban = async function() {
+    const state = SprintSpace.kanbanState;
+    if (!state.syncCursor || state.syncing) return;
+
+    state.syncing = true;
+    try {
+        let hasMore = true;
+        while (hasMore) {
+            const response = await frappe.call({
+                method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_kanban_changes",
+                args: {
+                    project_name: state.project,
+                    after_modified: state.syncCursor.modified,
+                    after_name: state.syncCursor.name,
+                    project_field: "project",
+                    status_field: "status"
+                }
+            });
+
+            const changes = response.message || {};
+            if (changes.reset) {
+                // Too far behind to catch up from tombstones
+                clearInterval(SprintSpace.kanbanSyncTimer);
+                cur_frm.refresh();
+                return;
+            }
+
+            SprintSpace.applyKanbanChanges(changes);
+            state.syncCursor = changes.cursor;
+            hasMore = changes.has_more;
+        }
+    } catch (error) {
+        console.error('Error syncing kanban:', error);
+    } finally {
+        state.syncing = false;
+    }
+};
+
+SprintSpace.applyKanbanChanges = function(changes) {
+    const kanbanWrap = document.querySelector('.kanban-wrap');
+    if (!kanbanWrap) return;
+
+    (changes.deleted || []).forEach(name => {
+        const card = kanbanWrap.querySelector(`.kanban-card[data-name="${name}"]`);
+        if (card) card.remove();
+    });
+
+    // Columns are sorted newest first, so a changed task goes to the top
+    (changes.tasks || []).forEach(task => {
+        const existing = kanbanWrap.querySelector(`.kanban-card[data-name="${task.name}"]`);
+        if (existing) existing.remove();
+
+        const list = kanbanWrap.querySelector(`.kanban-col[data-status="${task.status}"] .kanban-list`);
+        if (!list) return;
+        const emptyState = list.querySelector('.empty-state');
+        if (emptyState) emptyState.remove();
+        list.insertAdjacentHTML('afterbegin', SprintSpace.createKanbanCardHTML(task));
+    });
+
+    if (changes.counts) {
+        SprintSpace.kanbanState.counts = changes.counts;
+        SprintSpace.updateKanbanCounts();
+    }
+};
+
 SprintSpace.createSampleTasks = async function(projectName) {
     try {
         await frappe.call({
@@ -1104,6 +1295,16 @@ SprintSpace.setupKanbanDragDrop = function() {
     const kanbanWrap = document.querySelector('.kanban-wrap');
     if (!kanbanWrap) return;
     
+    // Load the next page of a column when it is scrolled near the bottom
+    // (scroll events don't bubble, so listen in the capture phase)
+    kanbanWrap.addEventListener('scroll', (e) => {
+        const list = e.target;
+        if (!list.classList || !list.classList.contains('kanban-list')) return;
+        if (list.scrollTop + list.clientHeight >= list.scrollHeight - 50) {
+            SprintSpace.loadMoreKanbanTasks(list.closest('.kanban-col'));
+        }
+    }, true);
+    
     // Drag start
     kanbanWrap.addEventListener('dragstart', (e) => {
         if (e.target.classList.contains('kanban-card')) {
@@ -1142,6 +1343,7 @@ SprintSpace.setupKanbanDragDrop = function() {
 
         if (column && draggingCard) {
             const newStatus = column.dataset.status;
+            const oldStatus = draggingCard.closest('.kanban-col').dataset.status;
             const taskName = draggingCard.dataset.name;
             const list = column.querySelector('.kanban-list');
 
@@ -1151,6 +1353,9 @@ SprintSpace.setupKanbanDragDrop = function() {
 
             // Move card visually
             list.appendChild(draggingCard);
+            if (oldStatus !== newStatus) {
+                SprintSpace.kanbanState.pendingMoves[taskName] = newStatus;
+            }
 
             try {
                 await frappe.call({
@@ -1159,10 +1364,16 @@ SprintSpace.setupKanbanDragDrop = function() {
                 });
 
                 frappe.show_alert({message: `Moved ${taskName} → ${newStatus}`, indicator: 'green'});
+                if (oldStatus !== newStatus) {
+                    const counts = SprintSpace.kanbanState.counts;
+                    counts[oldStatus] = Math.max((counts[oldStatus] || 0) - 1, 0);
+                    counts[newStatus] = (counts[newStatus] || 0) + 1;
+                }
                 SprintSpace.updateKanbanCounts();
 
             } catch (error) {
                 frappe.show_alert({message: 'Failed to update task', indicator: 'red'});
+                delete SprintSpace.kanbanState.pendingMoves[taskName];
                 // Reload kanban on error
                 cur_frm.refresh();
             }
@@ -1175,12 +1386,13 @@ SprintSpace.setupKanbanDragDrop = function() {
 };
 
 SprintSpace.updateKanbanCounts = function() {
+    // Columns only hold the loaded cards, so headers show the server-side totals
+    const counts = SprintSpace.kanbanState.counts;
     document.querySelectorAll('.kanban-col').forEach(column => {
         const status = column.dataset.status;
-        const taskCount = column.querySelectorAll('.kanban-card').length;
         const header = column.querySelector('h4');
         if (header) {
-            header.textContent = `${status} (${taskCount})`;
+            header.textContent = `${status} (${counts[status] || 0})`;
         }
     });
 };
@@ -1215,6 +1427,7 @@ SprintSpace.enhanceKanbanBlocks = async function(frm) {
                         // Setup drag and drop
                         setTimeout(() => {
                             SprintSpace.setupKanbanDragDrop();
+                            SprintSpace.startKanbanSync();
                         }, 100);
                     }
                     
@@ -1316,8 +1529,9 @@ frappe.ui.form.on('Sprintspace Project', {
 });
 
 function show_project_stats(frm) {
+    // Counted on the server, so only the totals are sent
     frappe.call({
-        method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_tasks_for_project",
+        method: "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project.get_project_stats",
         args: {
             project_name: frm.doc.title,
             project_field: "project",
@@ -1325,43 +1539,12 @@ function show_project_stats(frm) {
         },
         callback: function(r) {
             if (r.message) {
-                const stats = calculate_project_stats(r.message);
-                display_project_stats(frm, stats);
+                display_project_stats(frm, r.message);
             }
         }
     });
 }
 
-function calculate_project_stats(tasksByStatus) {
-    const stats = {
-        total: 0,
-        completed: 0,
-        in_progress: 0,
-        pending: 0,
-        statuses: {}
-    };
-
-    Object.keys(tasksByStatus).forEach(status => {
-        const count = tasksByStatus[status].length;
-        stats.statuses[status] = count;
-        stats.total += count;
-
-        if (status === 'Completed') {
-            stats.completed += count;
-        } else if (status === 'Working') {
-            stats.in_progress += count;
-        } else if (status === 'Cancelled') {
-            // Don't count cancelled tasks in pending
-        } else {
-            stats.pending += count;
-        }
-    });
-
-    stats.completion_percentage = stats.total > 0 ? Math.round((stats.completed / stats.total) * 100) : 0;
-
-    return stats;
-}
-
 function display_project_stats(frm, stats) {
     // Use the form's sidebar container properly
     const $sidebar = frm.$wrapper.find('.form-sidebar');
@@ -1399,6 +1582,10 @@ function display_project_stats(frm, stats) {
                     <span style="color: #6c757d;">Pending:</span>
                     <strong>${stats.pending}</strong>
                 </div>
+                <div>
+                    <span style="color: #dc3545;">Overdue:</span>
+                    <strong>${stats.overdue}</strong>
+                </div>
             </div>
 
             ${Object.keys(stats.statuses).length > 0 ? `
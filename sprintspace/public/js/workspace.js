@@ -4,9 +4,22 @@ class SprintSpaceWorkspaceApp {
         this.currentWorkspace = null;
         this.currentPage = null;
         this.pages = [];
+        this.pagesVersion = null;
         this.workspaces = [];
         this.editor = null;
         this.autoSaveTimeout = null;
+        this.pageVersion = null;
+        this.pageRevision = null;
+        this.savedBlocks = null;
+        // Long pages arrive in windows of blocks as the user scrolls
+        this.blockWindowSize = 100;
+        this.hasMoreBlocks = false;
+        this.blockCursor = null;
+        this.receivedBlockIds = new Set();
+        this.blockLoading = null;
+        this.saving = false;
+        this.blockObserver = null;
+        this.onPageTreeChange = this.handlePageTreeChange.bind(this);
         this.workspaceEditorState = {
             isShowingCommands: false,
             selectedCommandIndex: 0,
@@ -28,7 +41,47 @@ class SprintSpaceWorkspaceApp {
         await this.loadEditorScripts();
         
         this.setupEventListeners();
-        await this.loadWorkspaces();
+        await this.loadBootstrap();
+    }
+
+    async loadBootstrap() {
+        // Workspaces, page tree and open page in one payload, embedded in the page when possible
+        try {
+            let data = window.sprintspaceBootstrap;
+            window.sprintspaceBootstrap = null;
+            if (!data) {
+                const response = await frappe.call({
+                    method: 'sprintspace.bootstrap.get_bootstrap'
+                });
+                data = response.message || {};
+            }
+            
+            this.workspaces = data.workspaces || [];
+            if (!data.workspace) {
+                this.renderWorkspaceList();
+                this.showEmptyState();
+                return;
+            }
+            
+            this.subscribeToWorkspace(null, data.workspace);
+            this.currentWorkspace = data.workspace;
+            this.renderWorkspaceList();
+            const addPageBtn = document.getElementById('add-page-btn');
+            if (addPageBtn) addPageBtn.style.display = 'block';
+            
+            this.pagesVersion = data.page_tree.version;
+            this.pages = data.page_tree.pages || [];
+            if (data.page) {
+                this.currentPage = data.page.name;
+                this.renderPageContent(data.page);
+            } else if (this.pages.length === 0) {
+                this.showNoPages();
+            }
+            this.renderPageList();
+        } catch (error) {
+            console.error('Error loading bootstrap data, loading step by step:', error);
+            await this.loadWorkspaces();
+        }
     }
 
     setupEventListeners() {
@@ -61,6 +114,11 @@ class SprintSpaceWorkspaceApp {
                 }
             });
         }
+
+        // Write the buffered autosave of the open page when leaving
+        window.addEventListener('beforeunload', () => {
+            if (this.currentPage) this.flushPage(this.currentPage, true);
+        });
     }
 
     // ==================== WORKSPACE MANAGEMENT ====================
@@ -142,7 +200,9 @@ class SprintSpaceWorkspaceApp {
         if (this.currentWorkspace === workspaceName) return;
         
         try {
+            this.subscribeToWorkspace(this.currentWorkspace, workspaceName);
             this.currentWorkspace = workspaceName;
+            this.pagesVersion = null;
             const workspace = this.workspaces.find(w => w.name === workspaceName);
             
             if (workspace) {
@@ -212,17 +272,78 @@ class SprintSpaceWorkspaceApp {
 
     // ==================== PAGE MANAGEMENT ====================
 
+    subscribeToWorkspace(previous, workspaceName) {
+        // Page list changes are pushed to the workspace's room
+        if (!frappe.realtime) return;
+        
+        if (previous) {
+            frappe.realtime.doc_unsubscribe('SprintSpace Workspace', previous);
+        }
+        frappe.realtime.doc_subscribe('SprintSpace Workspace', workspaceName);
+        frappe.realtime.off('sprintspace_page_tree_change', this.onPageTreeChange);
+        frappe.realtime.on('sprintspace_page_tree_change', this.onPageTreeChange);
+    }
+
+    handlePageTreeChange(message) {
+        if (!message || message.workspace !== this.currentWorkspace) return;
+        
+        if (!message.page && !message.deleted) {
+            // Many pages were reordered; fetch the list again
+            this.pagesVersion = null;
+            this.loadPages();
+            return;
+        }
+        
+        if (message.deleted) {
+            this.pages = this.pages.filter(page => page.name !== message.deleted);
+        }
+        
+        if (message.page) {
+            const existing = this.pages.find(page => page.name === message.page.name);
+            if (existing) {
+                Object.assign(existing, message.page);
+            } else {
+                this.pages.push(message.page);
+            }
+            // Same order as the server: order_key, then page_order
+            this.pages.sort((a, b) => {
+                const keyA = a.order_key || '';
+                const keyB = b.order_key || '';
+                if (keyA !== keyB) return keyA < keyB ? -1 : 1;
+                return (a.page_order || 0) - (b.page_order || 0);
+            });
+        }
+        
+        // Our cached list no longer matches the server's version stamp
+        this.pagesVersion = null;
+        this.renderPageList();
+        
+        if (message.deleted && message.deleted === this.currentPage) {
+            this.currentPage = null;
+            if (this.pages.length > 0) {
+                this.selectPage(this.pages[0].name);
+            } else {
+                this.showNoPages();
+            }
+        }
+    }
+
     async loadPages() {
         if (!this.currentWorkspace) return;
         
         try {
             console.log('Loading pages for workspace:', this.currentWorkspace);
             const response = await frappe.call({
-                method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_workspace_pages',
-                args: { workspace: this.currentWorkspace }
+                method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_workspace_page_tree',
+                args: { workspace: this.currentWorkspace, version: this.pagesVersion }
             });
             
-            this.pages = response.message || [];
+            const tree = response.message || {};
+            this.pagesVersion = tree.version || null;
+            // The server only sends the version when our list is still current
+            if (tree.unchanged) return;
+            
+            this.pages = tree.pages || [];
             console.log('Loaded pages:', this.pages);
             this.renderPageList();
             
@@ -297,13 +418,14 @@ class SprintSpaceWorkspaceApp {
             // Save current page before switching
             if (this.currentPage && this.editor) {
                 await this.savePage();
+                this.flushPage(this.currentPage);
             }
             
             this.currentPage = pageName;
             
             const response = await frappe.call({
                 method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_page_content',
-                args: { page_name: pageName }
+                args: { page_name: pageName, block_limit: this.blockWindowSize }
             });
             
             const pageData = response.message;
@@ -344,23 +466,143 @@ class SprintSpaceWorkspaceApp {
     async savePage() {
         if (!this.currentPage || !this.editor) return;
         
+        // Blocks appended while a save is in flight would be missing from savedBlocks
+        if (this.blockLoading) await this.blockLoading;
+        
+        this.saving = true;
         try {
-            const content = this.getEditorContent();
+            let content = this.getEditorContent();
+            let response = null;
             
-            await frappe.call({
-                method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.update_page_content',
-                args: { 
-                    page_name: this.currentPage, 
-                    content_json: JSON.stringify(content)
+            // Send only the changed blocks when we know what the server has
+            if (this.savedBlocks) {
+                const operations = this.diffBlocks(this.savedBlocks, content.blocks);
+                if (operations.length === 0) return;
+                
+                try {
+                    response = await frappe.call({
+                        method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.autosave_page',
+                        args: {
+                            page_name: this.currentPage,
+                            operations: JSON.stringify(operations),
+                            base_version: this.pageVersion,
+                            base_revision: this.pageRevision
+                        }
+                    });
+                    // The buffer moved on; a full save merges with it
+                    if ((response.message || {}).stale) response = null;
+                } catch (error) {
+                    console.warn('Block save failed, falling back to full save:', error);
                 }
-            });
+            }
+            
+            if (!response) {
+                // A full save replaces the whole page, so it needs every block
+                if (this.hasMoreBlocks) {
+                    await this.loadAllBlocks();
+                    content = this.getEditorContent();
+                }
+                response = await frappe.call({
+                    method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.update_page_content',
+                    args: { 
+                        page_name: this.currentPage, 
+                        content_json: JSON.stringify(content),
+                        base_version: this.pageVersion
+                    }
+                });
+            }
+            
+            const result = response.message || {};
+            this.savedBlocks = content.blocks;
+            this.pageVersion = result.content_version || null;
+            this.pageRevision = result.revision || null;
+            
+            if (result.merged) {
+                // Someone else saved in between; show the merged page
+                this.showMergedContent(result);
+            }
             
         } catch (error) {
             console.error('Error saving page:', error);
             this.showError('Failed to save page');
+        } finally {
+            this.saving = false;
         }
     }
 
+    flushPage(pageName, onUnload = false) {
+        const method = 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.flush_page';
+        
+        if (onUnload) {
+            // A beacon still goes out while the page unloads
+            const data = new FormData();
+            data.append('page_name', pageName);
+            data.append('csrf_token', frappe.csrf_token);
+            navigator.sendBeacon(`/api/method/${method}`, data);
+            return;
+        }
+        
+        frappe.call({ method, args: { page_name: pageName } }).catch(error => {
+            console.warn('Could not flush autosave:', error);
+        });
+    }
+
+    showMergedContent(result) {
+        const editorElement = document.getElementById('sprintspace-editor');
+        const merged = JSON.parse(result.content_json);
+        
+        this.savedBlocks = merged.blocks;
+        this.hasMoreBlocks = false;
+        if (editorElement) {
+            editorElement.innerHTML = this.convertBlocksToHTML(merged.blocks);
+        }
+        
+        if (result.conflicts && result.conflicts.length) {
+            this.showToast(`Merged with changes from another editor (${result.conflicts.length} conflicting blocks)`, '#f39c12');
+        } else {
+            this.showSuccess('Merged with changes from another editor');
+        }
+    }
+
+    diffBlocks(previous, current) {
+        // Build insert/update/delete/move operations keyed by block id
+        const operations = [];
+        const previousById = new Map(previous.map(block => [block.id, block]));
+        const currentIds = new Set(current.map(block => block.id));
+        
+        previous.forEach(block => {
+            if (!currentIds.has(block.id)) {
+                operations.push({ op: 'delete', id: block.id });
+            }
+        });
+        
+        // Replay the operations on the remaining order so moves are detected correctly
+        const order = previous.filter(block => currentIds.has(block.id)).map(block => block.id);
+        
+        current.forEach((block, index) => {
+            const after = index > 0 ? current[index - 1].id : null;
+            const old = previousById.get(block.id);
+            
+            if (!old) {
+                operations.push({ op: 'insert', after: after, block: block });
+                order.splice(index, 0, block.id);
+                return;
+            }
+            
+            if (old.type !== block.type || JSON.stringify(old.data) !== JSON.stringify(block.data)) {
+                operations.push({ op: 'update', id: block.id, block: { type: block.type, data: block.data } });
+            }
+            
+            if (order[index] !== block.id) {
+                order.splice(order.indexOf(block.id), 1);
+                order.splice(index, 0, block.id);
+                operations.push({ op: 'move', id: block.id, after: after });
+            }
+        });
+        
+        return operations;
+    }
+
     async deletePage(pageName) {
         if (!confirm('Are you sure you want to delete this page?')) return;
         
@@ -462,11 +704,20 @@ class SprintSpaceWorkspaceApp {
         if (editorElement) {
             // Load content
             let initialContent = '';
+            this.savedBlocks = null;
+            this.pageVersion = pageData.content_version;
+            this.pageRevision = pageData.autosave_revision || null;
+            this.hasMoreBlocks = !!pageData.has_more;
+            this.blockCursor = null;
+            this.receivedBlockIds = new Set();
             if (pageData.content_json) {
                 try {
                     const contentData = JSON.parse(pageData.content_json);
                     if (contentData.blocks) {
                         initialContent = this.convertBlocksToHTML(contentData.blocks);
+                        // Legacy content without block ids is saved in full once to get ids
+                        this.savedBlocks = contentData.blocks.every(block => block.id) ? contentData.blocks : null;
+                        this.trackReceivedBlocks(contentData.blocks);
                     }
                 } catch (error) {
                     console.error('Error parsing content JSON:', error);
@@ -482,9 +733,117 @@ class SprintSpaceWorkspaceApp {
             
             // Initialize the editor functionality
             this.setupPageEditor();
+            this.observeEditorEnd();
+            this.loadOutline(pageData.name);
         }
     }
 
+    // ==================== WINDOWED LOADING ====================
+
+    trackReceivedBlocks(blocks) {
+        blocks.forEach(block => this.receivedBlockIds.add(block.id));
+        if (blocks.length) this.blockCursor = blocks[blocks.length - 1].id;
+    }
+
+    observeEditorEnd() {
+        const sentinel = document.getElementById('sprintspace-editor-end');
+        if (!sentinel || !window.IntersectionObserver) {
+            // Without an observer there is no scroll trigger; load the rest right away
+            if (this.hasMoreBlocks) this.loadAllBlocks();
+            return;
+        }
+        
+        if (!this.blockObserver) {
+            this.blockObserver = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) this.loadMoreBlocks();
+            }, { root: document.getElementById('editor-area'), rootMargin: '800px 0px' });
+        }
+        // Observing again reports the current state, so a short window keeps loading
+        this.blockObserver.unobserve(sentinel);
+        this.blockObserver.observe(sentinel);
+    }
+
+    loadMoreBlocks() {
+        if (!this.hasMoreBlocks) return Promise.resolve();
+        if (!this.blockLoading) {
+            this.blockLoading = (async () => {
+                // A finishing save resets savedBlocks, which would drop blocks appended meanwhile
+                while (this.saving) await new Promise(resolve => setTimeout(resolve, 100));
+                if (this.hasMoreBlocks) await this.fetchBlockWindow();
+            })().finally(() => {
+                this.blockLoading = null;
+            });
+        }
+        return this.blockLoading;
+    }
+
+    async loadAllBlocks() {
+        // Called by savePage itself, so this must not wait for the save like loadMoreBlocks
+        const pageName = this.currentPage;
+        while (this.hasMoreBlocks && pageName === this.currentPage) {
+            await this.fetchBlockWindow();
+        }
+    }
+
+    async fetchBlockWindow() {
+        const pageName = this.currentPage;
+        const response = await frappe.call({
+            method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_page_block_window',
+            args: { page_name: pageName, after: this.blockCursor, limit: this.blockWindowSize }
+        });
+        if (pageName !== this.currentPage || !this.editor) return;
+        
+        const result = response.message || {};
+        const blocks = result.blocks || [];
+        // A window that starts over (its first block was removed) repeats blocks we have
+        const newBlocks = blocks.filter(block => !this.receivedBlockIds.has(block.id));
+        this.trackReceivedBlocks(blocks);
+        this.hasMoreBlocks = !!result.has_more && blocks.length > 0;
+        
+        if (newBlocks.length) {
+            // Edits made meanwhile sit before the unloaded blocks, so these go at the end
+            this.editor.insertAdjacentHTML('beforeend', this.convertBlocksToHTML(newBlocks));
+            if (this.savedBlocks) this.savedBlocks = this.savedBlocks.concat(newBlocks);
+        }
+        if (this.hasMoreBlocks && !this.saving) this.observeEditorEnd();
+    }
+
+    async loadOutline(pageName) {
+        const section = document.getElementById('page-outline-section');
+        const list = document.getElementById('page-outline');
+        if (!section || !list) return;
+        
+        try {
+            const response = await frappe.call({
+                method: 'sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page.get_page_outline',
+                args: { page_name: pageName }
+            });
+            if (pageName !== this.currentPage) return;
+            
+            const headers = response.message || [];
+            section.style.display = headers.length ? 'block' : 'none';
+            list.innerHTML = headers.map(header => `
+                <li class="sidebar-item outline-item" style="padding-left: ${(parseInt(header.level) || 1) * 12}px;"
+                    data-block-id="${frappe.utils.escape_html(header.id)}">${frappe.utils.escape_html(header.text)}</li>
+            `).join('');
+            list.querySelectorAll('.outline-item').forEach(item => {
+                item.addEventListener('click', () => this.revealBlock(item.dataset.blockId));
+            });
+        } catch (error) {
+            console.warn('Could not load page outline:', error);
+        }
+    }
+
+    async revealBlock(blockId) {
+        // Load windows until the block is on the page
+        const find = () => this.editor && this.editor.querySelector(`[data-block-id="${CSS.escape(blockId)}"]`);
+        while (!find() && this.hasMoreBlocks) {
+            await this.loadMoreBlocks();
+        }
+        const element = find();
+        if (element) element.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }
+
     setupPageEditor() {
         const editor = document.getElementById('sprintspace-editor');
         const commandMenu = document.getElementById('sprintspace-command-menu');
@@ -1027,18 +1386,27 @@ class SprintSpaceWorkspaceApp {
         if (!blocks || !Array.isArray(blocks)) return '';
         
         return blocks.map(block => {
+            // Keep the block id on the element so saves can be sent as block operations
+            const id = block.id ? ` data-block-id="${block.id}"` : '';
             switch (block.type) {
                 case 'header':
                     const level = block.data.level || 1;
-                    return `<h${level}>${block.data.text}</h${level}>`;
+                    return `<h${level}${id}>${block.data.text}</h${level}>`;
                 case 'paragraph':
-                    return `<p>${block.data.text}</p>`;
+                    return `<p${id}>${block.data.text}</p>`;
                 case 'list':
                     const listType = block.data.style === 'ordered' ? 'ol' : 'ul';
                     const items = block.data.items.map(item => `<li>${item}</li>`).join('');
-                    return `<${listType}>${items}</${listType}>`;
+                    return `<${listType}${id}>${items}</${listType}>`;
+                case 'checklist':
+                    const checklistItems = (block.data.items || []).map(item =>
+                        `<div class="checklist-item"><input type="checkbox"${item.checked ? ' checked' : ''}> <span>${item.text}</span></div>`
+                    ).join('');
+                    return `<div class="checklist"${id}>${checklistItems}</div>`;
+                case 'delimiter':
+                    return `<hr${id}>`;
                 default:
-                    return `<p>${block.data.text || ''}</p>`;
+                    return `<p${id}>${block.data.text || ''}</p>`;
             }
         }).join('');
     }
@@ -1064,22 +1432,74 @@ class SprintSpaceWorkspaceApp {
     getEditorContent() {
         if (!this.editor) return { blocks: [] };
         
-        const html = this.editor.innerHTML;
+        const blocks = [];
+        const seenIds = new Set();
+        
+        this.editor.childNodes.forEach(node => {
+            if (node.nodeType === Node.TEXT_NODE) {
+                if (!node.textContent.trim()) return;
+                // Wrap stray text so it becomes an addressable block
+                const paragraph = document.createElement('p');
+                node.replaceWith(paragraph);
+                paragraph.appendChild(node);
+                node = paragraph;
+            }
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            
+            // Browsers copy attributes when splitting an element, so ids can repeat
+            let id = node.dataset.blockId;
+            if (!id || seenIds.has(id)) {
+                id = frappe.utils.get_random(10);
+                node.dataset.blockId = id;
+            }
+            seenIds.add(id);
+            
+            blocks.push(Object.assign({ id: id }, this.getBlockFromElement(node)));
+        });
         
         return {
             time: Date.now(),
-            blocks: [
-                {
-                    type: 'paragraph',
-                    data: {
-                        text: html || ''
-                    }
-                }
-            ],
+            blocks: blocks,
             version: '2.30.7'
         };
     }
 
+    getBlockFromElement(element) {
+        const tag = element.tagName.toLowerCase();
+        
+        if (/^h[1-6]$/.test(tag)) {
+            return { type: 'header', data: { text: element.innerHTML, level: parseInt(tag[1]) } };
+        }
+        if (tag === 'ul' || tag === 'ol') {
+            return {
+                type: 'list',
+                data: {
+                    style: tag === 'ol' ? 'ordered' : 'unordered',
+                    items: Array.from(element.querySelectorAll(':scope > li')).map(li => li.innerHTML)
+                }
+            };
+        }
+        if (element.classList.contains('checklist')) {
+            return {
+                type: 'checklist',
+                data: {
+                    items: Array.from(element.querySelectorAll('.checklist-item')).map(item => {
+                        const checkbox = item.querySelector('input[type="checkbox"]');
+                        const text = item.querySelector('span');
+                        return {
+                            text: text ? text.innerHTML : item.textContent.trim(),
+                            checked: !!(checkbox && checkbox.checked)
+                        };
+                    })
+                }
+            };
+        }
+        if (tag === 'hr') {
+            return { type: 'delimiter', data: {} };
+        }
+        return { type: 'paragraph', data: { text: element.innerHTML } };
+    }
+
     // ==================== UI STATES ====================
 
     showEmptyState() {
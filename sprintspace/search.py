@@ -0,0 +1,187 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Full-text search over page content.
+
+The plain text of every block is stored next to it in `SprintSpace Page Block`
+(`search_text`) under a FULLTEXT index, so a page save only re-indexes the blocks
+that changed. Results are ranked per page by adding up the relevance of its
+matching blocks.
+"""
+
+import html
+import re
+
+import frappe
+from frappe.utils import cint, strip_html_tags
+
+from sprintspace.compression import loads
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import has_workspace_access
+
+SEARCH_LIMIT = 20
+SNIPPET_LENGTH = 160
+REINDEX_BATCH_SIZE = 500
+
+# A title match counts for about as much as several matching blocks
+TITLE_MATCH_SCORE = 10
+
+
+def extract_block_text(block):
+    """Return the plain text of an Editor.js block"""
+    data = block.get("data") or {}
+    block_type = block.get("type")
+
+    if block_type in ("header", "paragraph", "quote"):
+        parts = [data.get("text")]
+    elif block_type == "list":
+        parts = _list_item_texts(data.get("items") or [])
+    elif block_type == "checklist":
+        parts = [item.get("text") for item in data.get("items") or [] if isinstance(item, dict)]
+    else:
+        return ""
+
+    text = " ".join(strip_html_tags(part) for part in parts if isinstance(part, str))
+    return re.sub(r"\s+", " ", html.unescape(text)).strip()
+
+
+def _list_item_texts(items):
+    # Nested lists store items as {"content": ..., "items": [...]}
+    texts = []
+    for item in items:
+        if isinstance(item, dict):
+            texts.append(item.get("content"))
+            texts.extend(_list_item_texts(item.get("items") or []))
+        else:
+            texts.append(item)
+    return texts
+
+
+def add_fulltext_index():
+    """Create the FULLTEXT index on block text if it does not exist yet"""
+    if frappe.db.db_type != "mariadb":
+        return
+
+    if not frappe.db.sql("""
+        SHOW INDEX FROM `tabSprintSpace Page Block` WHERE Key_name = 'search_text_fulltext'
+    """):
+        frappe.db.sql_ddl("""
+            ALTER TABLE `tabSprintSpace Page Block` ADD FULLTEXT INDEX search_text_fulltext (search_text)
+        """)
+
+
+@frappe.whitelist()
+def search_pages(workspace, query, limit=SEARCH_LIMIT):
+    """Search the pages of a workspace, best matches first
+
+    Returns a list of `{"name", "title", "score", "snippet"}`.
+    """
+    if not frappe.has_permission("SprintSpace Page", "read") or not has_workspace_access(workspace, "Viewer"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+    terms = _get_terms(query)
+    if not terms:
+        return []
+
+    limit = min(max(cint(limit), 1), 100)
+    # Prefix matching on every term, so results show up while typing
+    against = " ".join(f"+{term}*" for term in terms)
+
+    scores = {}
+    for row in frappe.db.sql("""
+        SELECT block.page, SUM(MATCH(block.search_text) AGAINST (%(against)s IN BOOLEAN MODE)) AS score
+        FROM `tabSprintSpace Page Block` block
+        INNER JOIN `tabSprintSpace Page` page ON page.name = block.page
+        WHERE page.workspace = %(workspace)s
+            AND page.is_archived = 0
+            AND MATCH(block.search_text) AGAINST (%(against)s IN BOOLEAN MODE)
+        GROUP BY block.page
+        ORDER BY score DESC
+        LIMIT %(limit)s
+    """, {"against": against, "workspace": workspace, "limit": limit}, as_dict=True):
+        scores[row.page] = row.score
+
+    title_filters = [["workspace", "=", workspace], ["is_archived", "=", 0]]
+    title_filters += [["title", "like", f"%{term}%"] for term in terms]
+    for page in frappe.get_all("SprintSpace Page", filters=title_filters, pluck="name", limit=limit):
+        scores[page] = scores.get(page, 0) + TITLE_MATCH_SCORE
+
+    pages = sorted(scores, key=scores.get, reverse=True)[:limit]
+    if not pages:
+        return []
+
+    titles = dict(frappe.get_all("SprintSpace Page", filters={"name": ("in", pages)}, fields=["name", "title"], as_list=True))
+    snippets = _get_snippets(pages, against, terms)
+    return [
+        {"name": page, "title": titles.get(page), "score": scores[page], "snippet": snippets.get(page, "")}
+        for page in pages
+    ]
+
+
+def _get_terms(query):
+    # Keep words only; boolean-mode operators in the query would change its meaning
+    return re.findall(r"\w+", (query or "").lower())[:10]
+
+
+def _get_snippets(pages, against, terms):
+    """Text around the first match in the best matching block of each page"""
+    snippets = {}
+    for row in frappe.db.sql("""
+        SELECT page, search_text
+        FROM `tabSprintSpace Page Block`
+        WHERE page IN %(pages)s AND MATCH(search_text) AGAINST (%(against)s IN BOOLEAN MODE)
+        ORDER BY MATCH(search_text) AGAINST (%(against)s IN BOOLEAN MODE) DESC
+    """, {"pages": tuple(pages), "against": against}, as_dict=True):
+        if row.page not in snippets:
+            snippets[row.page] = _make_snippet(row.search_text, terms)
+    return snippets
+
+
+def _make_snippet(text, terms):
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(min(positions, default=0) - SNIPPET_LENGTH // 4, 0)
+    snippet = text[start:start + SNIPPET_LENGTH]
+    if start > 0:
+        snippet = "…" + snippet
+    if start + SNIPPET_LENGTH < len(text):
+        snippet += "…"
+    return snippet
+
+
+def rebuild_search_index(workspace=None):
+    """Recompute the search text of every stored block, optionally of one workspace
+
+    Returns the number of blocks indexed.
+    """
+    add_fulltext_index()
+
+    conditions = ""
+    values = {"batch_size": REINDEX_BATCH_SIZE, "after": ""}
+    if workspace:
+        conditions = "AND page IN (SELECT name FROM `tabSprintSpace Page` WHERE workspace = %(workspace)s)"
+        values["workspace"] = workspace
+
+    count = 0
+    while True:
+        rows = frappe.db.sql(f"""
+            SELECT name, block_type, block_data
+            FROM `tabSprintSpace Page Block`
+            WHERE name > %(after)s {conditions}
+            ORDER BY name
+            LIMIT %(batch_size)s
+        """, values, as_dict=True)
+        if not rows:
+            break
+
+        for row in rows:
+            block = {"type": row.block_type, "data": loads(row.block_data, {})}
+            frappe.db.set_value(
+                "SprintSpace Page Block", row.name, "search_text", extract_block_text(block),
+                update_modified=False
+            )
+
+        count += len(rows)
+        values["after"] = rows[-1].name
+        frappe.db.commit()
+
+    return count
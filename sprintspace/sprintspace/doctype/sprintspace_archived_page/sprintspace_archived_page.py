@@ -0,0 +1,245 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import datetime
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, now
+
+from sprintspace.autosave import clear_autosave
+from sprintspace.compression import dumps, loads
+from sprintspace.ordering import key_after
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    check_workspace_pages_permission,
+    clear_workspace_pages_cache,
+    publish_page_tree_change,
+)
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import (
+    get_page_blocks,
+    save_page_blocks,
+)
+from sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version import (
+    record_page_version,
+)
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import (
+    READ_PERMISSION_TYPES,
+    allocate_page_order,
+    get_accessible_workspaces_query,
+    has_unrestricted_access,
+    has_workspace_access,
+)
+from sprintspace.summary import update_page_summary
+
+# Defaults for the site config keys sprintspace_archive_after_days and
+# sprintspace_purge_archived_after_days (0 keeps cold pages forever)
+ARCHIVE_AFTER_DAYS = 30
+PURGE_AFTER_DAYS = 365
+BATCH_SIZE = 100
+
+# Page columns kept in cold storage, besides name, workspace and blocks
+PAGE_FIELDS = [
+    "title", "page_order", "content_version", "content_json", "created_date", "created_by",
+    "last_edited_date", "last_edited_by", "owner", "creation"
+]
+# Version columns kept in cold storage; the data stays as stored
+VERSION_FIELDS = ["version", "is_snapshot", "data", "owner", "creation"]
+
+
+class SprintSpaceArchivedPage(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("SprintSpace Archived Page", ["workspace"])
+    frappe.db.add_index("SprintSpace Archived Page", ["archived_date"])
+
+
+def get_permission_query_conditions(user=None):
+    """Limit archived page lists to the workspaces the user can read"""
+    user = user or frappe.session.user
+    if has_unrestricted_access(user):
+        return ""
+    return f"`tabSprintSpace Archived Page`.workspace IN ({get_accessible_workspaces_query(user)})"
+
+
+def has_permission(doc, ptype=None, user=None):
+    # Archiving and restoring go through the page endpoints
+    return has_workspace_access(doc.workspace, "Viewer" if ptype in READ_PERMISSION_TYPES else "Admin", user)
+
+
+def archive_old_pages():
+    """Daily: move long-archived pages to cold storage and purge expired ones"""
+    move_pages_to_cold_storage()
+    purge_cold_storage()
+
+
+def move_pages_to_cold_storage(older_than_days=None):
+    """Move pages archived more than `older_than_days` ago out of the page tables
+
+    Each page becomes one compact row holding its fields, blocks and version
+    history; its block and version rows are deleted. Returns the number of
+    pages moved.
+    """
+    if older_than_days is None:
+        older_than_days = cint(frappe.conf.get("sprintspace_archive_after_days", ARCHIVE_AFTER_DAYS))
+    cutoff = add_days(now(), -older_than_days)
+
+    count = 0
+    while True:
+        pages = frappe.db.sql(f"""
+            SELECT name, workspace, IFNULL(archived_date, modified) AS archived_date, {", ".join(PAGE_FIELDS)}
+            FROM `tabSprintSpace Page`
+            WHERE is_archived = 1 AND IFNULL(archived_date, modified) < %(cutoff)s
+            ORDER BY name
+            LIMIT %(batch_size)s
+        """, {"cutoff": cutoff, "batch_size": BATCH_SIZE}, as_dict=True)
+        if not pages:
+            break
+
+        names = [page.name for page in pages]
+        versions = {}
+        for row in frappe.get_all(
+            "SprintSpace Page Version",
+            filters={"page": ("in", names)},
+            fields=["page", *VERSION_FIELDS],
+            order_by="version"
+        ):
+            versions.setdefault(row.page, []).append({fieldname: _plain(row[fieldname]) for fieldname in VERSION_FIELDS})
+
+        timestamp = now()
+        user = frappe.session.user
+        frappe.db.bulk_insert(
+            "SprintSpace Archived Page",
+            fields=["name", "creation", "modified", "owner", "modified_by", "title", "workspace", "archived_date", "data"],
+            values=[
+                (page.name, timestamp, timestamp, user, user, page.title, page.workspace, page.archived_date, dumps({
+                    "page": {fieldname: _plain(page[fieldname]) for fieldname in PAGE_FIELDS},
+                    "blocks": get_page_blocks(page.name),
+                    "versions": versions.get(page.name, [])
+                }))
+                for page in pages
+            ]
+        )
+
+        frappe.db.delete("SprintSpace Page Block", {"page": ("in", names)})
+        frappe.db.delete("SprintSpace Page Version", {"page": ("in", names)})
+        frappe.db.delete("SprintSpace Page", {"name": ("in", names)})
+        for name in names:
+            clear_autosave(name)
+        frappe.db.commit()
+        count += len(pages)
+
+    return count
+
+
+def _plain(value):
+    # Dates are stored as text in the JSON payload
+    return str(value) if isinstance(value, (datetime.date, datetime.timedelta)) else value
+
+
+def purge_cold_storage(older_than_days=None):
+    """Delete cold-stored pages archived more than `older_than_days` ago for good"""
+    if older_than_days is None:
+        older_than_days = cint(frappe.conf.get("sprintspace_purge_archived_after_days", PURGE_AFTER_DAYS))
+    if older_than_days <= 0:
+        return
+
+    frappe.db.delete("SprintSpace Archived Page", {"archived_date": ("<", add_days(now(), -older_than_days))})
+    frappe.db.commit()
+
+
+@frappe.whitelist()
+def get_archived_pages(workspace):
+    """List the archived pages of a workspace, still in the page table or in cold storage"""
+    check_workspace_pages_permission(workspace, "read")
+
+    pages = frappe.get_all(
+        "SprintSpace Page",
+        filters={"workspace": workspace, "is_archived": 1},
+        fields=["name", "title", "archived_date"]
+    )
+    for page in pages:
+        page.in_cold_storage = 0
+
+    cold = frappe.get_all(
+        "SprintSpace Archived Page",
+        filters={"workspace": workspace},
+        fields=["name", "title", "archived_date"]
+    )
+    for page in cold:
+        page.in_cold_storage = 1
+
+    return sorted(pages + cold, key=lambda page: str(page.archived_date or ""), reverse=True)
+
+
+@frappe.whitelist()
+def restore_archived_page(page_name):
+    """Bring back an archived page at the end of its workspace's page list"""
+    if frappe.db.exists("SprintSpace Page", page_name):
+        page = frappe.get_doc("SprintSpace Page", page_name)
+        page.check_permission("write")
+        page.page_order, page.order_key = _place_at_end(page.workspace)
+        page.is_archived = 0
+        page.save()
+        return page_name
+
+    archived = frappe.db.get_value("SprintSpace Archived Page", page_name, ["workspace", "data"], as_dict=True)
+    if not archived:
+        frappe.throw(f"Archived page {page_name} not found.", frappe.DoesNotExistError)
+    check_workspace_pages_permission(archived.workspace, "write")
+
+    data = loads(archived.data, {})
+    fields = data.get("page") or {}
+    page_order, order_key = _place_at_end(archived.workspace)
+    version = cint(fields.get("content_version")) + 1
+    timestamp = now()
+    user = frappe.session.user
+
+    values = dict(fields, content_version=version, page_order=page_order, order_key=order_key, is_archived=0)
+    values.update({"name": page_name, "workspace": archived.workspace, "modified": timestamp, "modified_by": user})
+    values.setdefault("creation", timestamp)
+    values.setdefault("owner", user)
+    frappe.db.bulk_insert("SprintSpace Page", fields=list(values), values=[tuple(values.values())])
+
+    save_page_blocks(page_name, data.get("blocks") or [])
+    update_page_summary(page_name)
+    versions = data.get("versions") or []
+    if versions:
+        frappe.db.bulk_insert(
+            "SprintSpace Page Version",
+            fields=["name", "modified", "modified_by", "page", *VERSION_FIELDS],
+            values=[
+                (frappe.generate_hash(length=10), timestamp, user, page_name,
+                 *(row.get(fieldname) for fieldname in VERSION_FIELDS))
+                for row in versions
+            ]
+        )
+    record_page_version(page_name, version)
+    frappe.db.delete("SprintSpace Archived Page", {"name": page_name})
+
+    clear_workspace_pages_cache(archived.workspace)
+    publish_page_tree_change(archived.workspace, page={
+        "name": page_name, "title": values.get("title"), "order_key": values["order_key"],
+        "page_order": values.get("page_order"), "last_edited_date": values.get("last_edited_date"),
+        "last_edited_by": values.get("last_edited_by")
+    })
+    return page_name
+
+
+def _place_at_end(workspace):
+    """Return the page_order and order_key that put a page last in `workspace`
+
+    Placed like a new page: the workspace lock taken here serialises this with
+    inserts, and the locking read sees the pages they committed.
+    """
+    page_order = allocate_page_order(workspace)
+    last_key = frappe.db.sql("""
+        SELECT order_key
+        FROM `tabSprintSpace Page`
+        WHERE workspace = %s AND is_archived = 0
+        ORDER BY order_key DESC
+        LIMIT 1
+        FOR UPDATE
+    """, workspace)
+    return page_order, key_after(last_key[0][0] if last_key else None)
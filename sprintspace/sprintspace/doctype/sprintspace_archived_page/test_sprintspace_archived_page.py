@@ -0,0 +1,83 @@
+# Copyright (c) 2024, Cursor-Auto and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now
+
+from sprintspace.sprintspace.doctype.sprintspace_archived_page.sprintspace_archived_page import (
+    move_pages_to_cold_storage,
+    purge_cold_storage,
+    restore_archived_page,
+)
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import create_page, delete_page
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import get_page_blocks
+from sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version import (
+    rebuild_page_version,
+)
+
+
+class TestSprintSpaceArchivedPage(FrappeTestCase):
+    def setUp(self):
+        self.workspace = frappe.get_doc({
+            "doctype": "SprintSpace Workspace",
+            "title": "Test Workspace Archive"
+        }).insert()
+        self.page = create_page(self.workspace.name, "Old Page", {
+            "blocks": [{"type": "paragraph", "data": {"text": "Keep me"}}]
+        })
+        delete_page(self.page)
+        # Archived long enough ago to be moved
+        frappe.db.set_value("SprintSpace Page", self.page, "archived_date", add_days(now(), -400))
+
+    def tearDown(self):
+        frappe.db.delete("SprintSpace Archived Page", {"workspace": self.workspace.name})
+        pages = frappe.get_all("SprintSpace Page", filters={"workspace": self.workspace.name}, pluck="name")
+        if pages:
+            frappe.db.delete("SprintSpace Page Block", {"page": ("in", pages)})
+            frappe.db.delete("SprintSpace Page Version", {"page": ("in", pages)})
+        frappe.db.delete("SprintSpace Page", {"workspace": self.workspace.name})
+        self.workspace.delete()
+        frappe.db.commit()
+
+    def test_move_and_restore(self):
+        """Old archived pages leave the page tables and come back with their blocks"""
+        self.assertGreaterEqual(move_pages_to_cold_storage(), 1)
+        self.assertFalse(frappe.db.exists("SprintSpace Page", self.page))
+        self.assertFalse(get_page_blocks(self.page))
+        self.assertTrue(frappe.db.exists("SprintSpace Archived Page", self.page))
+
+        # Created while the page was away; the restored page goes after it
+        other = create_page(self.workspace.name, "New Page")
+        restore_archived_page(self.page)
+        self.assertEqual(frappe.db.get_value("SprintSpace Page", self.page, "is_archived"), 0)
+        restored = frappe.db.get_value("SprintSpace Page", self.page, ["page_order", "order_key"], as_dict=True)
+        newer = frappe.db.get_value("SprintSpace Page", other, ["page_order", "order_key"], as_dict=True)
+        self.assertGreater(restored.page_order, newer.page_order)
+        self.assertGreater(restored.order_key, newer.order_key)
+        self.assertEqual([block["data"]["text"] for block in get_page_blocks(self.page)], ["Keep me"])
+        self.assertFalse(frappe.db.exists("SprintSpace Archived Page", self.page))
+
+    def test_history_survives_cold_storage(self):
+        """Versions recorded before the move can still be rebuilt after a restore"""
+        move_pages_to_cold_storage()
+        self.assertFalse(frappe.db.exists("SprintSpace Page Version", {"page": self.page}))
+
+        restore_archived_page(self.page)
+        first = rebuild_page_version(self.page, 1)
+        self.assertEqual([block["data"]["text"] for block in first["blocks"]], ["Keep me"])
+
+    def test_restore_from_page_table(self):
+        """A page archived recently comes back after the pages created meanwhile"""
+        other = create_page(self.workspace.name, "New Page")
+        restore_archived_page(self.page)
+
+        restored = frappe.db.get_value("SprintSpace Page", self.page, ["is_archived", "order_key"], as_dict=True)
+        self.assertEqual(restored.is_archived, 0)
+        self.assertGreater(restored.order_key, frappe.db.get_value("SprintSpace Page", other, "order_key"))
+
+    def test_purge_removes_expired_pages(self):
+        move_pages_to_cold_storage()
+        purge_cold_storage(older_than_days=365)
+
+        self.assertFalse(frappe.db.exists("SprintSpace Archived Page", self.page))
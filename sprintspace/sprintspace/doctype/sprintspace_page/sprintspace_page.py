@@ -3,79 +3,428 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import now
+from frappe.utils import cint, now
+from functools import partial
 import json
 
+from sprintspace.autosave import (
+    autosave_lock,
+    clear_autosave,
+    get_autosave,
+    is_write_behind_enabled,
+    set_autosave,
+)
+from sprintspace.blocks import apply_operations, diff_operations, ensure_block_ids, merge_blocks
+from sprintspace.compression import decompress_text
+from sprintspace.metrics import record_cache_access
+from sprintspace.ordering import key_after, keys_between
+from sprintspace.search import extract_block_text
+from sprintspace.summary import SUMMARY_FIELDS, get_page_summary
+from sprintspace.validation import get_block_error, parse_and_validate
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import (
+    apply_block_operations,
+    count_page_blocks,
+    delete_page_blocks,
+    get_block_states,
+    get_block_types,
+    get_page_block_range,
+    get_page_blocks,
+    get_page_headers,
+    save_page_blocks,
+)
+from sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version import (
+    delete_page_versions,
+    rebuild_page_version,
+    record_page_version,
+)
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import (
+    READ_PERMISSION_TYPES,
+    allocate_page_order,
+    get_accessible_workspaces_query,
+    has_unrestricted_access,
+    has_workspace_access,
+)
+
+EDITOR_VERSION = "2.30.7"
+
+# Page lists per workspace, cached in a redis hash keyed by workspace name
+PAGE_TREE_CACHE_KEY = "sprintspace_workspace_pages"
+PAGE_TREE_FIELDS = ["name", "title", "page_order", "order_key", "last_edited_date", "last_edited_by"]
+PAGE_TREE_ORDER = "order_key asc, page_order asc, created_date asc"
+
+# Realtime event sent to the workspace's room when its page list changes
+PAGE_TREE_EVENT = "sprintspace_page_tree_change"
+
+# Blocks sent with the first window of a page and per further range
+BLOCK_WINDOW_SIZE = 100
+MAX_BLOCK_WINDOW_SIZE = 500
+
+# Pages returned per summary request, most recently edited first
+PAGE_SUMMARY_LIMIT = 20
+MAX_PAGE_SUMMARY_LIMIT = 200
+
+# User defaults holding the last opened workspace and page
+LAST_WORKSPACE_KEY = "sprintspace_last_workspace"
+LAST_PAGE_KEY = "sprintspace_last_page"
+
+# A move producing a key longer than ORDER_KEY_MAX_LENGTH renumbers the workspace at once;
+# the daily job renumbers workspaces with keys longer than ORDER_KEY_REBALANCE_LENGTH
+ORDER_KEY_MAX_LENGTH = 32
+ORDER_KEY_REBALANCE_LENGTH = 12
+
 
 class SprintSpacePage(Document):
+    def onload(self):
+        # Show the assembled document in the desk form
+        if not self.content_json:
+            self.content_json = json.dumps(self.get_content())
+
     def validate(self):
+        previous = self.get_doc_before_save()
+        if not self.is_archived:
+            self.archived_date = None
+        elif not previous or not previous.is_archived:
+            self.archived_date = now()
+
         if self.content_json:
-            try:
-                json.loads(self.content_json)
-            except Exception:
-                frappe.throw('Content JSON is not valid JSON.')
+            content = parse_and_validate(decompress_text(self.content_json))
+
+            # Content lives in SprintSpace Page Block rows; the column only carries it in
+            self.flags.content_blocks = ensure_block_ids(content.get("blocks") or [])
+            self.content_json = None
+
+    def before_save(self):
+        changed = False
+        operations = None
+        if self.flags.block_operations is not None:
+            operations = self.flags.block_operations
+            for operation in operations:
+                # Fix inserted ids now so the history replays to the same blocks
+                if operation.get("op") == "insert":
+                    operation["block"] = ensure_block_ids([dict(operation.get("block") or {})])[0]
+            changed = apply_block_operations(self.name, operations)
+        elif self.flags.content_blocks is not None:
+            if not self.is_new():
+                operations = diff_operations(get_block_states(self.name), self.flags.content_blocks)
+            changed = save_page_blocks(self.name, self.flags.content_blocks)
+        self.flags.block_operations = self.flags.content_blocks = None
+
+        if changed or self.is_new():
+            self.content_version = cint(self.content_version) + 1
+            record_page_version(self.name, self.content_version, operations, self.flags.edited_by)
+            # Totals come from the block rows, which carry their own statistics
+            self.update(get_page_summary(self.name))
+
+        if changed or self.is_new() or self.has_value_changed("title"):
+            self.last_edited_date = now()
+            self.last_edited_by = self.flags.edited_by or frappe.session.user
     
     def before_insert(self):
         self.created_date = now()
         self.created_by = frappe.session.user
-        self.last_edited_date = now()
-        self.last_edited_by = frappe.session.user
         
         # Set page order if not specified
         if not self.page_order:
-            max_order = frappe.db.sql("""
-                SELECT COALESCE(MAX(page_order), 0) 
-                FROM `tabSprintSpace Page` 
+            self.page_order = allocate_page_order(self.workspace)
+
+        if not self.order_key:
+            # Locking read: sees pages committed by inserts that held the workspace lock before us
+            last_key = frappe.db.sql("""
+                SELECT order_key
+                FROM `tabSprintSpace Page`
                 WHERE workspace = %s AND is_archived = 0
-            """, self.workspace)[0][0]
-            self.page_order = max_order + 1
+                ORDER BY order_key DESC
+                LIMIT 1
+                FOR UPDATE
+            """, self.workspace)
+            self.order_key = key_after(last_key[0][0] if last_key else None)
     
+    def after_insert(self):
+        clear_workspace_pages_cache(self.workspace)
+        if not self.is_archived:
+            publish_page_tree_change(self.workspace, page=self.get_tree_row())
+
     def on_update(self):
-        self.last_edited_date = now()
-        self.last_edited_by = frappe.session.user
+        # Only changes to listed fields invalidate the cached page tree; the edit
+        # stamps are listed, so every content save does
+        previous = self.get_doc_before_save()
+        if previous and any(
+            self.has_value_changed(fieldname)
+            for fieldname in (*PAGE_TREE_FIELDS, "workspace", "is_archived")
+        ):
+            clear_workspace_pages_cache(self.workspace, previous.workspace)
+            if previous.workspace != self.workspace:
+                publish_page_tree_change(previous.workspace, deleted=self.name)
+            if self.is_archived:
+                publish_page_tree_change(self.workspace, deleted=self.name)
+            else:
+                publish_page_tree_change(self.workspace, page=self.get_tree_row())
+
+    def after_rename(self, old, new, merge=False):
+        clear_workspace_pages_cache(self.workspace)
+        publish_page_tree_change(self.workspace, deleted=old)
+        if not self.is_archived:
+            publish_page_tree_change(self.workspace, page=self.get_tree_row())
+
+    def on_trash(self):
+        delete_page_blocks(self.name)
+        delete_page_versions(self.name)
+        clear_autosave(self.name)
+        clear_workspace_pages_cache(self.workspace)
+        publish_page_tree_change(self.workspace, deleted=self.name)
+
+    def get_tree_row(self):
+        """The page as listed in its workspace's page tree"""
+        return {fieldname: self.get(fieldname) for fieldname in PAGE_TREE_FIELDS}
+
+    def get_content(self):
+        """Return the page as an Editor.js document, including buffered autosaves"""
+        if self.content_json:
+            # Not yet moved to the block store
+            return json.loads(decompress_text(self.content_json))
+
+        autosave = get_autosave(self.name)
+        return {
+            "time": str(autosave["updated"] if autosave else self.modified),
+            "blocks": autosave["blocks"] if autosave else get_page_blocks(self.name),
+            "version": EDITOR_VERSION
+        }
+
+    def get_block_window(self, after=None, limit=BLOCK_WINDOW_SIZE):
+        """Return `{"blocks", "block_count", "has_more"}` for up to `limit` blocks after block `after`
+
+        Read from the block rows by position, so a window costs the same on any
+        page length. Buffered autosaves are sliced in memory and legacy content
+        comes whole, its blocks having no stable ids yet.
+        """
+        limit = min(max(cint(limit), 1), MAX_BLOCK_WINDOW_SIZE)
+        autosave = None if self.content_json else get_autosave(self.name)
+        if not self.content_json and not autosave:
+            blocks, has_more = get_page_block_range(self.name, after, limit)
+            return {"blocks": blocks, "block_count": count_page_blocks(self.name), "has_more": has_more}
+
+        blocks = self.get_content().get("blocks") or []
+        if self.content_json:
+            return {"blocks": blocks, "block_count": len(blocks), "has_more": False}
+
+        ids = [block.get("id") for block in blocks]
+        start = ids.index(after) + 1 if after in ids else 0
+        return {
+            "blocks": blocks[start:start + limit],
+            "block_count": len(blocks),
+            "has_more": start + limit < len(blocks)
+        }
+
+    def get_outline(self):
+        """Return the page's headers as `{"id", "level", "text"}`, for navigation"""
+        if self.content_json or get_autosave(self.name):
+            headers = [block for block in self.get_content().get("blocks") or [] if block.get("type") == "header"]
+        else:
+            headers = get_page_headers(self.name)
+
+        return [
+            {"id": block.get("id"), "level": cint((block.get("data") or {}).get("level")) or 1, "text": extract_block_text(block)}
+            for block in headers
+        ]
+
+
+def on_doctype_update():
+    frappe.db.add_index("SprintSpace Page", ["workspace", "is_archived", "page_order"])
+    frappe.db.add_index("SprintSpace Page", ["workspace", "is_archived", "order_key"])
+    frappe.db.add_index("SprintSpace Page", ["is_archived", "archived_date"])
+    frappe.db.add_index("SprintSpace Page", ["workspace", "is_archived", "last_edited_date"])
+    frappe.db.add_index("SprintSpace Page", ["last_edited_by", "last_edited_date"])
+
+
+def get_permission_query_conditions(user=None):
+    """Limit page lists to the workspaces the user can read"""
+    user = user or frappe.session.user
+    if has_unrestricted_access(user):
+        return ""
+    return f"`tabSprintSpace Page`.workspace IN ({get_accessible_workspaces_query(user)})"
+
+
+def has_permission(doc, ptype=None, user=None):
+    return has_workspace_access(doc.workspace, get_required_role(ptype), user)
+
+
+def get_required_role(ptype):
+    """Lowest workspace role allowed `ptype` on the workspace's pages"""
+    return "Viewer" if ptype in READ_PERMISSION_TYPES else "Editor"
+
+
+def check_workspace_pages_permission(workspace, ptype):
+    """Throw unless the user may `ptype` the pages of a workspace"""
+    if not frappe.has_permission("SprintSpace Page", ptype) or not has_workspace_access(workspace, get_required_role(ptype)):
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+
+def check_page_permission(page_name, ptype):
+    """Throw unless the user may `ptype` a page, judged by its workspace"""
+    check_workspace_pages_permission(frappe.db.get_value("SprintSpace Page", page_name, "workspace"), ptype)
 
 
 @frappe.whitelist()
 def get_workspace_pages(workspace):
     """Get all pages for a workspace"""
-    if not frappe.has_permission("SprintSpace Page", "read"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+    check_workspace_pages_permission(workspace, "read")
     
-    pages = frappe.get_all(
+    return get_page_tree(workspace)["pages"]
+
+
+@frappe.whitelist()
+def get_workspace_page_tree(workspace, version=None):
+    """Get the pages of a workspace along with a version stamp
+
+    Pass the version from a previous call; if the list has not changed since,
+    only the version is returned.
+    """
+    check_workspace_pages_permission(workspace, "read")
+
+    tree = get_page_tree(workspace)
+    if version and version == tree["version"]:
+        return {"version": tree["version"], "unchanged": True}
+
+    return tree
+
+
+@frappe.whitelist()
+def get_page_summaries(workspace, limit=PAGE_SUMMARY_LIMIT, pages=None):
+    """Get the listed pages of a workspace with their precomputed summaries
+
+    Most recently edited first, or the given `pages` only. Summaries hold an
+    excerpt, word, block and checklist counts, content size and content hash.
+    """
+    check_workspace_pages_permission(workspace, "read")
+
+    filters = {"workspace": workspace, "is_archived": 0}
+    if pages:
+        filters["name"] = ("in", frappe.parse_json(pages) if isinstance(pages, str) else pages)
+
+    return frappe.get_all(
         "SprintSpace Page",
-        filters={
-            "workspace": workspace,
-            "is_archived": 0
-        },
-        fields=["name", "title", "page_order", "last_edited_date", "last_edited_by"],
-        order_by="page_order asc, created_date asc"
+        filters=filters,
+        fields=PAGE_TREE_FIELDS + SUMMARY_FIELDS,
+        order_by="last_edited_date desc",
+        limit=min(max(cint(limit), 1), MAX_PAGE_SUMMARY_LIMIT)
     )
+
+
+def get_page_tree(workspace):
+    """Return the cached page list of a workspace, building it on a cache miss"""
+    tree = frappe.cache.hget(PAGE_TREE_CACHE_KEY, workspace)
+    record_cache_access("page_tree", tree is not None)
+    if tree is None:
+        pages = frappe.get_all(
+            "SprintSpace Page",
+            filters={
+                "workspace": workspace,
+                "is_archived": 0
+            },
+            fields=PAGE_TREE_FIELDS,
+            order_by=PAGE_TREE_ORDER
+        )
+        tree = {"version": frappe.generate_hash(length=12), "pages": pages}
+        frappe.cache.hset(PAGE_TREE_CACHE_KEY, workspace, tree)
     
-    return pages
+    return tree
+
+
+def clear_workspace_pages_cache(*workspaces):
+    """Drop the cached page list of the given workspaces"""
+    for workspace in set(filter(None, workspaces)):
+        frappe.cache.hdel(PAGE_TREE_CACHE_KEY, workspace)
+        # Clear again once committed so a concurrent rebuild cannot keep stale rows
+        frappe.db.after_commit.add(partial(frappe.cache.hdel, PAGE_TREE_CACHE_KEY, workspace))
+
+
+def publish_page_tree_change(workspace, page=None, deleted=None):
+    """Tell clients showing a workspace that its page list changed
+
+    `page` holds changed fields of a listed page (always with its name) and
+    `deleted` the name of a page that left the list. With neither, clients
+    reload the list.
+    """
+    if not workspace:
+        return
+
+    frappe.publish_realtime(
+        PAGE_TREE_EVENT,
+        {"workspace": workspace, "page": page, "deleted": deleted},
+        doctype="SprintSpace Workspace",
+        docname=workspace,
+        after_commit=True
+    )
 
 
 @frappe.whitelist()
-def get_page_content(page_name):
-    """Get the content of a specific page"""
-    if not frappe.has_permission("SprintSpace Page", "read"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+def get_page_content(page_name, block_limit=None):
+    """Get the content of a specific page
+
+    With `block_limit`, `content_json` holds only the first blocks and the
+    result tells the page's `block_count` and whether more blocks follow
+    (`has_more`); fetch those with `get_page_block_window`.
+    """
+    check_page_permission(page_name, "read")
     
     page = frappe.get_doc("SprintSpace Page", page_name)
-    return {
+    remember_last_page(page.workspace, page.name)
+    autosave = get_autosave(page.name)
+
+    window = None
+    if block_limit:
+        window = page.get_block_window(limit=block_limit)
+        content = {"time": str(page.modified), "blocks": window["blocks"], "version": EDITOR_VERSION}
+    else:
+        content = page.get_content()
+
+    result = {
         "name": page.name,
         "title": page.title,
         "workspace": page.workspace,
-        "content_json": page.content_json,
+        "content_json": json.dumps(content),
+        # Buffered content builds on the version it was autosaved against
+        "content_version": autosave["base_version"] if autosave else page.content_version,
+        "autosave_revision": autosave["revision"] if autosave else None,
         "last_edited_date": page.last_edited_date,
         "last_edited_by": page.last_edited_by
     }
+    if window:
+        result.update({"block_count": window["block_count"], "has_more": window["has_more"]})
+    return result
+
+
+@frappe.whitelist()
+def get_page_block_window(page_name, after=None, limit=BLOCK_WINDOW_SIZE):
+    """Get the next blocks of a page, following the block with id `after`
+
+    Returns `{"blocks", "block_count", "has_more"}`. If `after` has been
+    removed in the meantime the window starts over at the first block.
+    """
+    check_page_permission(page_name, "read")
+
+    return frappe.get_doc("SprintSpace Page", page_name).get_block_window(after, limit)
+
+
+@frappe.whitelist()
+def get_page_outline(page_name):
+    """Get the headers of a page, to navigate it before all blocks are loaded"""
+    check_page_permission(page_name, "read")
+
+    return frappe.get_doc("SprintSpace Page", page_name).get_outline()
+
+
+def remember_last_page(workspace, page):
+    """Store the page the user opened, so the app reopens it; writes only on change"""
+    for key, value in ((LAST_WORKSPACE_KEY, workspace), (LAST_PAGE_KEY, page)):
+        if frappe.defaults.get_user_default(key) != value:
+            frappe.defaults.set_user_default(key, value)
 
 
 @frappe.whitelist()
 def create_page(workspace, title, content_json=None):
     """Create a new page in a workspace"""
-    if not frappe.has_permission("SprintSpace Page", "create"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+    check_workspace_pages_permission(workspace, "create")
     
     if not content_json:
         content_json = get_default_page_content()
@@ -95,23 +444,202 @@ def create_page(workspace, title, content_json=None):
 
 
 @frappe.whitelist()
-def update_page_content(page_name, content_json):
-    """Update the content of a page"""
-    if not frappe.has_permission("SprintSpace Page", "write"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+def update_page_content(page_name, content_json, base_version=None):
+    """Update the content of a page
+
+    `base_version` is the content version the editor started from. If the page
+    has changed since, the edits are merged block by block with the newer
+    content and the merged document is returned.
+    """
+    check_page_permission(page_name, "write")
+
+    flush_page_autosave(page_name)
+
+    # Locked so concurrent saves are merged one after the other
+    page = frappe.get_doc("SprintSpace Page", page_name, for_update=True)
+    if is_stale(page, base_version):
+        content = parse_and_validate(content_json)
+        ours = ensure_block_ids(content.get("blocks") or [])
+        return save_merged_content(page, base_version, ours)
     
-    page = frappe.get_doc("SprintSpace Page", page_name)
     page.content_json = content_json
     page.save()
     
+    return {"content_version": page.content_version}
+
+
+@frappe.whitelist()
+def apply_page_operations(page_name, operations, base_version=None):
+    """Apply block-level operations (insert/update/delete/move) to a page
+
+    Lets the editor send only the blocks that changed instead of the whole
+    document; only the affected SprintSpace Page Block rows are written.
+    `base_version` is the content version the operations were made against; on
+    a stale base the operations are merged with the newer content as in
+    `update_page_content`.
+    """
+    check_page_permission(page_name, "write")
+
+    if isinstance(operations, str):
+        operations = json.loads(operations)
+
+    flush_page_autosave(page_name)
+
+    page = frappe.get_doc("SprintSpace Page", page_name, for_update=True)
+    if is_stale(page, base_version):
+        base = get_version_blocks(page, base_version)
+        validate_operation_blocks(operations, {block.get("id"): block.get("type") for block in base})
+        return save_merged_content(page, base_version, apply_operations(base, operations), base)
+
+    if page.content_json:
+        # Move legacy content into the block store before addressing its rows
+        page.save()
+
+    validate_operation_blocks(operations, get_block_types(page_name))
+    page.flags.block_operations = operations
+    page.save()
+
+    return {"content_version": page.content_version}
+
+
+def is_stale(page, base_version):
+    return base_version is not None and cint(base_version) != cint(page.content_version)
+
+
+def get_version_blocks(page, version):
+    """Blocks of an earlier version of the page, needed as the base of a merge"""
+    result = None if page.content_json else rebuild_page_version(page.name, cint(version))
+    if result is None:
+        frappe.throw(
+            "This page was changed by someone else. Reload it and try again.",
+            frappe.TimestampMismatchError
+        )
+    return result["blocks"]
+
+
+def save_merged_content(page, base_version, ours, base=None):
+    """Three-way merge edits made against `base_version` into the page and save it"""
+    if base is None:
+        base = get_version_blocks(page, base_version)
+
+    merged, conflicts = merge_blocks(base, get_page_blocks(page.name), ours)
+    page.flags.content_blocks = merged
+    page.save()
+
+    return {
+        "content_version": page.content_version,
+        "merged": True,
+        "content_json": json.dumps({"time": str(page.modified), "blocks": merged, "version": EDITOR_VERSION}),
+        "conflicts": conflicts
+    }
+
+
+@frappe.whitelist()
+def autosave_page(page_name, operations, base_version=None, base_revision=None):
+    """Autosave block operations, buffering them in redis when write-behind is on
+
+    `base_version` and `base_revision` are the content version and autosave
+    revision returned by the previous call (or by `get_page_content`). Returns
+    the ones to send next time, or `{"stale": True}` if the page moved on in the
+    meantime; the editor should then save with `update_page_content`, which
+    merges. Without write-behind this is `apply_page_operations`.
+    """
+    if not is_write_behind_enabled():
+        return apply_page_operations(page_name, operations, base_version)
+
+    check_page_permission(page_name, "write")
+
+    if isinstance(operations, str):
+        operations = json.loads(operations)
+
+    with autosave_lock(page_name):
+        autosave = get_autosave(page_name)
+        if autosave is None:
+            content_version, content_json = frappe.db.get_value(
+                "SprintSpace Page", page_name, ["content_version", "content_json"]
+            )
+            # Legacy content has no block rows to build on yet
+            if content_json or cint(base_version) != cint(content_version) or cint(base_revision):
+                return {"stale": True}
+            autosave = {"base_version": cint(content_version), "revision": 0, "blocks": get_page_blocks(page_name)}
+        elif cint(base_version) != autosave["base_version"] or cint(base_revision) != autosave["revision"]:
+            return {"stale": True}
+
+        validate_operation_blocks(operations, {block.get("id"): block.get("type") for block in autosave["blocks"]})
+        blocks = apply_operations(autosave["blocks"], operations)
+        set_autosave(page_name, autosave["base_version"], autosave["revision"] + 1, blocks)
+
+    return {"content_version": autosave["base_version"], "revision": autosave["revision"] + 1, "buffered": True}
+
+
+def validate_operation_blocks(operations, block_types=None):
+    """Schema-check the blocks written by insert and update operations
+
+    An update may leave out the type to keep the block's current one;
+    `block_types` maps block ids to their types so its data is still checked.
+    """
+    if not isinstance(operations, list) or not all(isinstance(operation, dict) for operation in operations):
+        frappe.throw("Operations must be a list of objects.")
+
+    block_types = dict(block_types or {})
+    for index, operation in enumerate(operations, 1):
+        op = operation.get("op")
+        if op not in ("insert", "update"):
+            continue
+
+        block = operation.get("block")
+        if op == "update" and isinstance(block, dict) and "type" not in block:
+            block = dict(block, type=block_types.get(operation.get("id")))
+        error = get_block_error(block)
+        if error:
+            frappe.throw(f"Operation {index}: block {error}")
+        block_types[block.get("id") if op == "insert" else operation.get("id")] = block["type"]
+
+
+@frappe.whitelist()
+def flush_page(page_name):
+    """Write the page's buffered autosave to the database, e.g. when the editor leaves it"""
+    check_page_permission(page_name, "write")
+
+    flush_page_autosave(page_name)
+    page = frappe.db.get_value("SprintSpace Page", page_name, ["content_version"], as_dict=True)
+    return {"content_version": page.content_version if page else None}
+
+
+def flush_page_autosave(page_name):
+    """Save a page's buffered autosave, if it has one, and commit
+
+    Returns True if there was something to flush. Edits saved directly since the
+    autosave's base version are merged with it.
+    """
+    if get_autosave(page_name) is None:
+        return False
+
+    with autosave_lock(page_name):
+        autosave = get_autosave(page_name)
+        if autosave is None:
+            return False
+
+        if frappe.db.exists("SprintSpace Page", page_name):
+            page = frappe.get_doc("SprintSpace Page", page_name, for_update=True)
+            # Credited to whoever made the edits, not to the request or job flushing them
+            page.flags.edited_by = autosave.get("user")
+            if is_stale(page, autosave["base_version"]):
+                save_merged_content(page, autosave["base_version"], autosave["blocks"])
+            else:
+                page.flags.content_blocks = autosave["blocks"]
+                page.save()
+            frappe.db.commit()
+
+        clear_autosave(page_name)
+
     return True
 
 
 @frappe.whitelist()
 def update_page_title(page_name, title):
     """Update the title of a page"""
-    if not frappe.has_permission("SprintSpace Page", "write"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+    check_page_permission(page_name, "write")
     
     page = frappe.get_doc("SprintSpace Page", page_name)
     page.title = title
@@ -123,8 +651,7 @@ def update_page_title(page_name, title):
 @frappe.whitelist()
 def delete_page(page_name):
     """Delete a page (mark as archived)"""
-    if not frappe.has_permission("SprintSpace Page", "delete"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+    check_page_permission(page_name, "delete")
     
     page = frappe.get_doc("SprintSpace Page", page_name)
     page.is_archived = 1
@@ -133,23 +660,114 @@ def delete_page(page_name):
     return True
 
 
+@frappe.whitelist()
+def move_page(page_name, previous_page=None, next_page=None):
+    """Move a page between two neighbours, rewriting only the moved page
+
+    `previous_page` and `next_page` are the pages that should end up directly
+    above and below it; leave one out to move to the top or bottom.
+    """
+    check_page_permission(page_name, "write")
+
+    workspace = frappe.db.get_value("SprintSpace Page", page_name, "workspace")
+    neighbours = [name for name in (previous_page, next_page) if name]
+
+    def get_neighbour_keys():
+        keys = dict(frappe.get_all(
+            "SprintSpace Page",
+            filters={"name": ("in", neighbours), "workspace": workspace},
+            fields=["name", "order_key"],
+            as_list=True
+        )) if neighbours else {}
+        missing = [name for name in neighbours if name not in keys]
+        if missing:
+            frappe.throw(f"Page {missing[0]} is not in workspace {workspace}.")
+        return keys.get(previous_page), keys.get(next_page)
+
+    before, after = get_neighbour_keys()
+    if (previous_page and not before) or (next_page and not after) or (before and after and before >= after):
+        # Missing, duplicate or out of order keys leave no room; renumber and retry
+        rebalance_page_order(workspace)
+        before, after = get_neighbour_keys()
+
+    order_key = keys_between(before, after, 1)[0]
+    frappe.db.set_value("SprintSpace Page", page_name, "order_key", order_key, update_modified=False)
+
+    if len(order_key) > ORDER_KEY_MAX_LENGTH:
+        rebalance_page_order(workspace)
+    else:
+        publish_page_tree_change(workspace, page={"name": page_name, "order_key": order_key})
+
+    clear_workspace_pages_cache(workspace)
+    return True
+
+
 @frappe.whitelist()
 def reorder_pages(workspace, page_orders):
     """Update the order of pages in a workspace"""
-    if not frappe.has_permission("SprintSpace Page", "write"):
-        frappe.throw("Not permitted", frappe.PermissionError)
+    check_workspace_pages_permission(workspace, "write")
     
     # page_orders should be a list of {"name": "PAGE-00001", "order": 1}
     if isinstance(page_orders, str):
         page_orders = json.loads(page_orders)
     
-    for item in page_orders:
-        frappe.db.set_value("SprintSpace Page", item["name"], "page_order", item["order"])
+    # A full renumber: one UPDATE for all pages instead of one per page
+    page_orders = sorted(page_orders, key=lambda item: cint(item["order"]))
+    keys = keys_between(None, None, len(page_orders))
+    bulk_update_page_order(workspace, [
+        (item["name"], cint(item["order"]), key)
+        for item, key in zip(page_orders, keys, strict=True)
+    ])
     
+    clear_workspace_pages_cache(workspace)
+    publish_page_tree_change(workspace)
     frappe.db.commit()
     return True
 
 
+def rebalance_page_order(workspace):
+    """Give every page of a workspace a fresh, short order key in its current order"""
+    pages = frappe.get_all(
+        "SprintSpace Page",
+        filters={"workspace": workspace},
+        fields=["name", "page_order"],
+        order_by=PAGE_TREE_ORDER
+    )
+    keys = keys_between(None, None, len(pages))
+    bulk_update_page_order(workspace, [
+        (page.name, page.page_order, key)
+        for page, key in zip(pages, keys, strict=True)
+    ])
+    clear_workspace_pages_cache(workspace)
+    publish_page_tree_change(workspace)
+
+
+def bulk_update_page_order(workspace, rows):
+    """Set page_order and order_key for many pages with a single UPDATE
+
+    `rows` is a list of (page name, page_order, order_key) tuples.
+    """
+    if not rows:
+        return
+
+    order_cases = " ".join(["WHEN %s THEN %s"] * len(rows))
+    key_cases = " ".join(["WHEN %s THEN %s"] * len(rows))
+    values = []
+    for name, page_order, _key in rows:
+        values += [name, page_order]
+    for name, _page_order, key in rows:
+        values += [name, key]
+    values.append(workspace)
+    values += [name for name, _page_order, _key in rows]
+
+    frappe.db.sql(f"""
+        UPDATE `tabSprintSpace Page`
+        SET page_order = CASE name {order_cases} ELSE page_order END,
+            order_key = CASE name {key_cases} ELSE order_key END
+        WHERE workspace = %s AND name IN ({", ".join(["%s"] * len(rows))})
+    """, values)
+
+
 def get_default_page_content():
     """Return default content for a new page"""
     return {
@@ -3,7 +3,35 @@
 
 import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
+import base64
 import json
+import threading
+from unittest.mock import patch
+
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    PAGE_TREE_EVENT,
+    apply_page_operations,
+    autosave_page,
+    create_page,
+    flush_page,
+    flush_page_autosave,
+    get_page_block_window,
+    get_page_content,
+    get_page_outline,
+    get_page_summaries,
+    get_page_tree,
+    get_workspace_page_tree,
+    move_page,
+    reorder_pages,
+    update_page_content,
+    update_page_title,
+)
+from sprintspace.autosave import set_autosave
+from sprintspace.metrics import get_metrics, get_prometheus_metrics, is_tracked_method, record
+from sprintspace.search import search_pages
+from sprintspace.summary import SUMMARY_FIELDS
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import get_page_blocks
 
 
 class TestSprintSpacePage(FrappeTestCase):
@@ -18,6 +46,9 @@ class TestSprintSpacePage(FrappeTestCase):
     
     def tearDown(self):
         # Clean up
+        pages = frappe.get_all("SprintSpace Page", filters={"workspace": self.workspace.name}, pluck="name")
+        if pages:
+            frappe.db.delete("SprintSpace Page Block", {"page": ("in", pages)})
         frappe.db.delete("SprintSpace Page", {"workspace": self.workspace.name})
         self.workspace.delete()
     
@@ -53,3 +84,417 @@ class TestSprintSpacePage(FrappeTestCase):
         
         self.assertEqual(page1.page_order, 1)
         self.assertEqual(page2.page_order, 2)
+
+    def test_apply_page_operations(self):
+        """Test that block operations are applied by block id"""
+        page_name = create_page(self.workspace.name, "Ops Page", {
+            "blocks": [
+                {"id": "a", "type": "paragraph", "data": {"text": "First"}},
+                {"id": "b", "type": "paragraph", "data": {"text": "Second"}}
+            ]
+        })
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+
+        result = apply_page_operations(page_name, [
+            {"op": "update", "id": "a", "block": {"data": {"text": "First, edited"}}},
+            {"op": "insert", "after": "a", "block": {"id": "c", "type": "header", "data": {"text": "New", "level": 2}}},
+            {"op": "move", "id": "b", "after": None},
+            {"op": "delete", "id": "c"}
+        ], base_version=version)
+
+        self.assertEqual(result["content_version"], version + 1)
+        blocks = get_page_blocks(page_name)
+        self.assertEqual([block["id"] for block in blocks], ["b", "a"])
+        self.assertEqual(blocks[1]["data"]["text"], "First, edited")
+
+    def test_apply_page_operations_rejects_stale_version(self):
+        """Test that operations against a version missing from the history are rejected"""
+        page_name = create_page(self.workspace.name, "Stale Page")
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+
+        with self.assertRaises(frappe.TimestampMismatchError):
+            apply_page_operations(page_name, [{"op": "delete", "id": "missing"}], base_version=version - 1)
+
+    def test_stale_edits_are_merged(self):
+        """Test that edits against an older version are merged with newer changes"""
+        page_name = create_page(self.workspace.name, "Merge Page", {
+            "blocks": [
+                {"id": "a", "type": "paragraph", "data": {"text": "A"}},
+                {"id": "b", "type": "paragraph", "data": {"text": "B"}},
+                {"id": "c", "type": "paragraph", "data": {"text": "C"}}
+            ]
+        })
+        base = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+
+        # Someone else edits "a" and removes "c"
+        apply_page_operations(page_name, [
+            {"op": "update", "id": "a", "block": {"data": {"text": "A, theirs"}}},
+            {"op": "delete", "id": "c"}
+        ], base_version=base)
+
+        # We edit "b" and add a block, still on the old version
+        result = update_page_content(page_name, json.dumps({"blocks": [
+            {"id": "a", "type": "paragraph", "data": {"text": "A"}},
+            {"id": "b", "type": "paragraph", "data": {"text": "B, ours"}},
+            {"id": "d", "type": "paragraph", "data": {"text": "D"}},
+            {"id": "c", "type": "paragraph", "data": {"text": "C"}}
+        ]}), base_version=base)
+
+        self.assertTrue(result["merged"])
+        self.assertEqual(result["conflicts"], [])
+        blocks = get_page_blocks(page_name)
+        self.assertEqual(
+            [block["data"]["text"] for block in blocks],
+            ["A, theirs", "B, ours", "D"]
+        )
+
+    def test_content_is_kept_in_block_store(self):
+        """Test that page content is stored as blocks and assembled on read"""
+        page_name = create_page(self.workspace.name, "Block Page", {
+            "blocks": [
+                {"id": "h", "type": "header", "data": {"text": "Title", "level": 1}},
+                {"type": "paragraph", "data": {"text": "No id yet"}}
+            ]
+        })
+
+        self.assertFalse(frappe.db.get_value("SprintSpace Page", page_name, "content_json"))
+        self.assertEqual(frappe.db.count("SprintSpace Page Block", {"page": page_name}), 2)
+
+        content = json.loads(get_page_content(page_name)["content_json"])
+        self.assertEqual(content["blocks"][0]["id"], "h")
+        self.assertTrue(content["blocks"][1]["id"])
+        self.assertEqual(content["blocks"][1]["data"]["text"], "No id yet")
+
+    def test_content_loads_in_windows(self):
+        """Test that a page's blocks can be read window by window, with a header outline"""
+        page_name = create_page(self.workspace.name, "Long Page", {
+            "blocks": [
+                {"id": f"b{i}", "type": "header", "data": {"text": f"<b>Part {i}</b>", "level": 2}} if i % 10 == 0
+                else {"id": f"b{i}", "type": "paragraph", "data": {"text": f"Text {i}"}}
+                for i in range(25)
+            ]
+        })
+
+        first = get_page_content(page_name, block_limit=10)
+        self.assertEqual(first["block_count"], 25)
+        self.assertTrue(first["has_more"])
+        self.assertEqual([block["id"] for block in json.loads(first["content_json"])["blocks"]], [f"b{i}" for i in range(10)])
+
+        window = get_page_block_window(page_name, after="b9", limit=10)
+        self.assertEqual([block["id"] for block in window["blocks"]], [f"b{i}" for i in range(10, 20)])
+        window = get_page_block_window(page_name, after="b19", limit=10)
+        self.assertEqual([block["id"] for block in window["blocks"]], [f"b{i}" for i in range(20, 25)])
+        self.assertFalse(window["has_more"])
+
+        # A removed cursor block starts the window over
+        window = get_page_block_window(page_name, after="missing", limit=10)
+        self.assertEqual(window["blocks"][0]["id"], "b0")
+
+        self.assertEqual(get_page_outline(page_name), [
+            {"id": f"b{i}", "level": 2, "text": f"Part {i}"} for i in (0, 10, 20)
+        ])
+
+    def test_page_summary_follows_edits(self):
+        """Test that page summaries are computed on save and updated by block edits"""
+        page_name = create_page(self.workspace.name, "Summary Page", {
+            "blocks": [
+                {"id": "h", "type": "header", "data": {"text": "Release plan", "level": 1}},
+                {"id": "p", "type": "paragraph", "data": {"text": "Ship the <b>new</b> editor"}},
+                {"id": "c", "type": "checklist", "data": {"items": [
+                    {"text": "Write docs", "checked": True},
+                    {"text": "Tag release", "checked": False}
+                ]}}
+            ]
+        })
+
+        summary = frappe.db.get_value("SprintSpace Page", page_name, SUMMARY_FIELDS, as_dict=True)
+        self.assertEqual(summary.excerpt, "Release plan Ship the new editor Write docs Tag release")
+        self.assertEqual(summary.word_count, 10)
+        self.assertEqual(summary.block_count, 3)
+        self.assertEqual((summary.checklist_done, summary.checklist_total), (1, 2))
+        self.assertTrue(summary.content_size)
+
+        other_page = create_page(self.workspace.name, "Newer Page")
+        frappe.db.set_value("SprintSpace Page", page_name, "last_edited_date", "2000-01-01", update_modified=False)
+
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+        apply_page_operations(page_name, json.dumps([
+            {"op": "update", "id": "c", "block": {"type": "checklist", "data": {"items": [
+                {"text": "Write docs", "checked": True},
+                {"text": "Tag release", "checked": True}
+            ]}}},
+            {"op": "delete", "id": "p"}
+        ]), version)
+
+        # Editing content moves the page to the top of the recent list
+        recent = get_page_summaries(self.workspace.name)
+        self.assertEqual([page.name for page in recent[:2]], [page_name, other_page])
+
+        updated = recent[0]
+        self.assertEqual(updated.block_count, 2)
+        self.assertEqual(updated.word_count, 6)
+        self.assertEqual((updated.checklist_done, updated.checklist_total), (2, 2))
+        self.assertNotEqual(updated.content_hash, summary.content_hash)
+
+    def test_page_tree_cache_invalidation(self):
+        """Test that the cached page tree changes only when the list changes"""
+        first = get_workspace_page_tree(self.workspace.name)
+        self.assertTrue(get_workspace_page_tree(self.workspace.name, first["version"]).get("unchanged"))
+
+        page_name = create_page(self.workspace.name, "Cached Page")
+        second = get_workspace_page_tree(self.workspace.name, first["version"])
+        self.assertNotEqual(second["version"], first["version"])
+        self.assertIn(page_name, [page.name for page in second["pages"]])
+
+        # Content edits do not touch the listed fields
+        update_page_content(page_name, json.dumps({"blocks": []}))
+        self.assertTrue(get_workspace_page_tree(self.workspace.name, second["version"]).get("unchanged"))
+
+        update_page_title(page_name, "Renamed Page")
+        third = get_workspace_page_tree(self.workspace.name, second["version"])
+        self.assertEqual([page.title for page in third["pages"]], ["Renamed Page"])
+
+    def test_move_page_rewrites_only_moved_page(self):
+        """Test that moving a page only changes its own order key"""
+        pages = [create_page(self.workspace.name, f"Page {i}") for i in range(3)]
+        keys = dict(frappe.get_all(
+            "SprintSpace Page", filters={"workspace": self.workspace.name},
+            fields=["name", "order_key"], as_list=True
+        ))
+
+        move_page(pages[2], next_page=pages[0])
+        move_page(pages[0], previous_page=pages[1], next_page=None)
+
+        tree = get_workspace_page_tree(self.workspace.name)
+        self.assertEqual([page.name for page in tree["pages"]], [pages[2], pages[1], pages[0]])
+        self.assertEqual(frappe.db.get_value("SprintSpace Page", pages[1], "order_key"), keys[pages[1]])
+
+    def test_page_tree_shows_last_edit(self):
+        """Test that a content save refreshes the edit stamps of the cached page tree"""
+        page_name = create_page(self.workspace.name, "Edited Page")
+        frappe.db.set_value("SprintSpace Page", page_name, "last_edited_date", "2000-01-01 00:00:00")
+        get_workspace_page_tree(self.workspace.name)
+
+        update_page_content(page_name, json.dumps({"blocks": [{"type": "paragraph", "data": {"text": "Edit"}}]}))
+
+        row = next(page for page in get_page_tree(self.workspace.name)["pages"] if page.name == page_name)
+        self.assertEqual(
+            get_datetime(row["last_edited_date"]),
+            get_datetime(frappe.db.get_value("SprintSpace Page", page_name, "last_edited_date"))
+        )
+        self.assertGreater(get_datetime(row["last_edited_date"]), get_datetime("2000-01-01"))
+
+    def test_reorder_pages_renumbers_in_one_pass(self):
+        """Test that a full reorder sets both page_order and order keys"""
+        pages = [create_page(self.workspace.name, f"Page {i}") for i in range(3)]
+
+        reorder_pages(self.workspace.name, json.dumps([
+            {"name": pages[0], "order": 3},
+            {"name": pages[1], "order": 1},
+            {"name": pages[2], "order": 2}
+        ]))
+
+        tree = get_workspace_page_tree(self.workspace.name)
+        self.assertEqual([page.name for page in tree["pages"]], [pages[1], pages[2], pages[0]])
+        self.assertEqual([page.page_order for page in tree["pages"]], [1, 2, 3])
+
+    def test_page_tree_changes_are_published(self):
+        """Test that inserting, renaming and archiving a page tell open page lists"""
+        with patch("frappe.publish_realtime") as publish:
+            page_name = create_page(self.workspace.name, "Live Page")
+            update_page_title(page_name, "Live Page Renamed")
+            new_name = frappe.rename_doc("SprintSpace Page", page_name, f"{page_name}-renamed", force=True)
+            page = frappe.get_doc("SprintSpace Page", new_name)
+            page.is_archived = 1
+            page.save()
+
+        calls = [call for call in publish.call_args_list if call.args[0] == PAGE_TREE_EVENT]
+        messages = [call.args[1] for call in calls]
+        self.assertEqual(
+            [((message["page"] or {}).get("name"), (message["page"] or {}).get("title"), message["deleted"])
+             for message in messages],
+            [
+                (page_name, "Live Page", None),
+                (page_name, "Live Page Renamed", None),
+                (None, None, page_name),
+                (new_name, "Live Page Renamed", None),
+                (None, None, new_name)
+            ]
+        )
+        self.assertTrue(all(message["workspace"] == self.workspace.name for message in messages))
+        self.assertTrue(all(call.kwargs["docname"] == self.workspace.name and call.kwargs["after_commit"] for call in calls))
+
+    def test_parallel_inserts_get_unique_page_order(self):
+        """Test that pages created in parallel never share a page_order"""
+        # Other connections need to see the workspace, and our cleanup must stick
+        frappe.db.commit()
+        self.addCleanup(frappe.db.commit)
+
+        site = frappe.local.site
+        user = frappe.session.user
+        errors = []
+
+        def create(index):
+            frappe.init(site=site)
+            frappe.connect()
+            try:
+                frappe.set_user(user)
+                frappe.get_doc({
+                    "doctype": "SprintSpace Page",
+                    "workspace": self.workspace.name,
+                    "title": f"Parallel Page {index}"
+                }).insert()
+                frappe.db.commit()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                frappe.destroy()
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        orders = frappe.get_all("SprintSpace Page", filters={"workspace": self.workspace.name}, pluck="page_order")
+        self.assertEqual(sorted(orders), list(range(1, 11)))
+        keys = frappe.get_all("SprintSpace Page", filters={"workspace": self.workspace.name}, pluck="order_key")
+        self.assertEqual(len(set(keys)), 10)
+
+    def test_search_pages(self):
+        """Test that pages are found by block text and ranked with a snippet"""
+        create_page(self.workspace.name, "Release Notes", {
+            "blocks": [
+                {"type": "paragraph", "data": {"text": "Deployment checklist for the <b>quarterly</b> release"}},
+                {"type": "checklist", "data": {"items": [{"text": "Tag the quarterly build", "checked": False}]}}
+            ]
+        })
+        create_page(self.workspace.name, "Unrelated", {
+            "blocks": [{"type": "paragraph", "data": {"text": "Nothing to see here"}}]
+        })
+        # FULLTEXT indexes only see committed rows
+        frappe.db.commit()
+        self.addCleanup(frappe.db.commit)
+
+        results = search_pages(self.workspace.name, "quarter")
+        self.assertEqual([result["title"] for result in results], ["Release Notes"])
+        self.assertIn("quarterly", results[0]["snippet"])
+        self.assertNotIn("<b>", results[0]["snippet"])
+
+    def test_block_schema_is_validated(self):
+        """Test that content with malformed blocks is rejected"""
+        page_name = create_page(self.workspace.name, "Schema Page")
+
+        for content in (
+            {"blocks": {"not": "a list"}},
+            {"blocks": [{"data": {"text": "No type"}}]},
+            {"blocks": [{"type": "header", "data": {"text": "Too deep", "level": 9}}]},
+            {"blocks": [{"type": "checklist", "data": {"items": ["not an object"]}}]}
+        ):
+            with self.assertRaises(frappe.ValidationError):
+                update_page_content(page_name, json.dumps(content))
+
+        # Looks compressed but is not
+        for content in ("zlib:garbage", "zlib:" + base64.b64encode(b"not zlib").decode()):
+            with self.assertRaises(frappe.ValidationError):
+                update_page_content(page_name, content)
+
+        update_page_content(page_name, json.dumps({"blocks": [
+            {"id": "h", "type": "header", "data": {"text": "Title", "level": 2}}
+        ]}))
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+        for operations in (
+            [{"op": "insert", "block": {"type": "paragraph", "data": []}}],
+            [{"op": "update", "id": "h", "block": {"data": {"text": "Too deep", "level": 9}}}]
+        ):
+            with self.assertRaises(frappe.ValidationError):
+                apply_page_operations(page_name, json.dumps(operations))
+            # Merged with newer content on a stale base as well
+            with self.assertRaises(frappe.ValidationError):
+                apply_page_operations(page_name, json.dumps(operations), base_version=version - 1)
+
+        with self.assertRaises(frappe.ValidationError):
+            update_page_content(page_name, json.dumps({"blocks": [
+                {"type": "header", "data": {"text": "Too deep", "level": 9}}
+            ]}), base_version=version - 1)
+        self.assertEqual(get_page_blocks(page_name)[0]["data"]["level"], 2)
+
+    @patch.dict(frappe.conf, {"sprintspace_write_behind": 1})
+    def test_autosaves_are_buffered_until_flushed(self):
+        """Test that autosaves are read back from the buffer and written once on flush"""
+        page_name = create_page(self.workspace.name, "Autosave Page")
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+        revision = None
+
+        for text in ("First", "Second", "Third"):
+            result = autosave_page(page_name, json.dumps([
+                {"op": "insert", "block": {"type": "paragraph", "data": {"text": text}}}
+            ]), version, revision)
+            self.assertTrue(result["buffered"])
+            revision = result["revision"]
+
+        # Nothing written yet, but readers see the buffered content
+        self.assertEqual(frappe.db.get_value("SprintSpace Page", page_name, "content_version"), version)
+        content = get_page_content(page_name)
+        self.assertEqual(content["autosave_revision"], 3)
+        self.assertEqual(len(json.loads(content["content_json"])["blocks"]), 4)
+
+        # An autosave from an outdated revision must save in full instead
+        stale = autosave_page(page_name, json.dumps([{"op": "delete", "id": "missing"}]), version, 1)
+        self.assertTrue(stale["stale"])
+
+        # Flushing commits
+        self.addCleanup(frappe.db.commit)
+        self.assertEqual(flush_page(page_name)["content_version"], version + 1)
+        self.assertEqual(len(get_page_blocks(page_name)), 4)
+        self.assertIsNone(get_page_content(page_name)["autosave_revision"])
+
+    @patch.dict(frappe.conf, {"sprintspace_write_behind": 1})
+    def test_flushed_autosave_keeps_its_editor(self):
+        """Test that a flushed autosave is saved for the user who made it"""
+        page_name = create_page(self.workspace.name, "Editor Page")
+        version = frappe.db.get_value("SprintSpace Page", page_name, "content_version")
+
+        with patch.dict(frappe.session, {"user": "Guest"}):
+            set_autosave(page_name, version, 1, [{"id": "a", "type": "paragraph", "data": {"text": "Edit"}}])
+
+        # Flushed as Administrator, like the scheduled job does
+        self.addCleanup(frappe.db.commit)
+        self.assertTrue(flush_page_autosave(page_name))
+        self.assertEqual(frappe.db.get_value("SprintSpace Page", page_name, "last_edited_by"), "Guest")
+        self.assertEqual(
+            frappe.db.get_value("SprintSpace Page Version", {"page": page_name, "version": version + 1}, "owner"),
+            "Guest"
+        )
+
+    def test_metrics_are_aggregated(self):
+        """Test that recorded calls show up in the metrics report"""
+        method = f"sprintspace.test_metrics_{frappe.generate_hash(length=6)}"
+        for time_ms in (4, 40, 400):
+            record(method, {
+                "calls": 1, "time_ms": time_ms, "queries": 3, "query_ms": 1.5, "bytes_in": 10, "bytes_out": 200
+            }, {"page_tree": [1, 1]})
+
+        report = {row["method"]: row for row in get_metrics()["methods"]}
+        self.assertEqual(report[method]["sampled_calls"], 3)
+        self.assertEqual(report[method]["mean_queries"], 3)
+        self.assertEqual(report[method]["p50_ms"], 50)
+        self.assertEqual(report[method]["p99_ms"], 500)
+        self.assertEqual(report[method]["caches"], {"page_tree": {"hits": 3, "misses": 3}})
+
+    def test_metrics_only_track_whitelisted_methods(self):
+        """Test that only whitelisted page, workspace and project methods become metric labels"""
+        module = "sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page"
+        self.assertTrue(is_tracked_method(f"{module}.apply_page_operations"))
+        self.assertFalse(is_tracked_method(f"{module}.is_stale"))
+        self.assertFalse(is_tracked_method(f"{module}.missing"))
+        self.assertFalse(is_tracked_method("sprintspace.metrics.get_metrics"))
+
+        method = f'sprintspace.test_"metrics"|le|calls\n{frappe.generate_hash(length=6)}'
+        record(method, {
+            "calls": 1, "time_ms": 4, "queries": 1, "query_ms": 1, "bytes_in": 0, "bytes_out": 0
+        })
+        self.assertEqual({row["method"]: row for row in get_metrics()["methods"]}[method]["sampled_calls"], 1)
+        text = get_prometheus_metrics().get_data(as_text=True)
+        self.assertIn('method="sprintspace.test_\\"metrics\\"|le|calls\\n', text)
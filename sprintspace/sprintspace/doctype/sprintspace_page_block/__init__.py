@@ -0,0 +1 @@
+# SprintSpace Page Block DocType
@@ -0,0 +1,251 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+from sprintspace.blocks import apply_operations, get_block_hash
+from sprintspace.compression import dumps, loads
+from sprintspace.ordering import assign_keys, keys_between
+from sprintspace.search import add_fulltext_index, extract_block_text
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import (
+    get_page_rows_query_conditions,
+    has_page_row_permission,
+)
+from sprintspace.summary import BLOCK_STAT_FIELDS, get_block_stats
+
+# Writing a position key longer than this renumbers the page's blocks; the
+# position column is a varchar(140)
+POSITION_MAX_LENGTH = 32
+REBALANCE_BATCH_SIZE = 1000
+
+
+class SprintSpacePageBlock(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_unique("SprintSpace Page Block", ["page", "block_id"])
+    frappe.db.add_index("SprintSpace Page Block", ["page", "position"])
+    frappe.db.add_index("SprintSpace Page Block", ["page", "block_type", "position"])
+    add_fulltext_index()
+
+
+def get_permission_query_conditions(user=None):
+    return get_page_rows_query_conditions("SprintSpace Page Block", user)
+
+
+def has_permission(doc, ptype=None, user=None):
+    return has_page_row_permission(doc.page, ptype, user)
+
+
+def get_page_blocks(page):
+    """Return the blocks of a page in document order"""
+    rows = frappe.db.sql("""
+        SELECT block_id, block_type, block_data
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %s
+        ORDER BY position
+    """, page, as_dict=True)
+
+    return [
+        {"id": row.block_id, "type": row.block_type, "data": loads(row.block_data, {})}
+        for row in rows
+    ]
+
+
+def get_page_block_range(page, after=None, limit=100):
+    """Return up to `limit` blocks following the block with id `after`, and whether more follow
+
+    Starts at the first block when `after` is not given or no longer on the page.
+    """
+    position = after and frappe.db.get_value("SprintSpace Page Block", {"page": page, "block_id": after}, "position")
+    rows = frappe.db.sql("""
+        SELECT block_id, block_type, block_data
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %(page)s AND position > %(position)s
+        ORDER BY position
+        LIMIT %(limit)s
+    """, {"page": page, "position": position or "", "limit": limit + 1}, as_dict=True)
+
+    blocks = [
+        {"id": row.block_id, "type": row.block_type, "data": loads(row.block_data, {})}
+        for row in rows[:limit]
+    ]
+    return blocks, len(rows) > limit
+
+
+def count_page_blocks(page):
+    return frappe.db.count("SprintSpace Page Block", {"page": page})
+
+
+def get_page_headers(page):
+    """Return the header blocks of a page in document order"""
+    rows = frappe.db.sql("""
+        SELECT block_id, block_data
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %s AND block_type = 'header'
+        ORDER BY position
+    """, page, as_dict=True)
+
+    return [
+        {"id": row.block_id, "type": "header", "data": loads(row.block_data, {})}
+        for row in rows
+    ]
+
+
+def save_page_blocks(page, blocks):
+    """Store the full block list of a page, writing only the rows that changed
+
+    Blocks are matched to rows by id and compared by content hash. Returns True
+    if anything was written.
+    """
+    rows = _get_block_rows(page)
+    positions = assign_keys([
+        rows[block["id"]].position if block["id"] in rows else None
+        for block in blocks
+    ])
+    changed = _write_block_changes(page, rows, blocks, positions)
+    _rebalance_if_needed(page, positions)
+    return changed
+
+
+def apply_block_operations(page, operations):
+    """Apply block operations (see `sprintspace.blocks.apply_operations`) row by row
+
+    Only ids, types and position keys of the stored blocks are read, and only the
+    inserted, updated, moved and deleted rows are written. Returns True if
+    anything was written.
+    """
+    rows = _get_block_rows(page)
+    blocks = apply_operations([{"id": block_id} for block_id in rows], operations)
+
+    moved = {operation.get("id") for operation in operations if operation.get("op") == "move"}
+    positions = assign_keys([
+        rows[block["id"]].position if block["id"] in rows and block["id"] not in moved else None
+        for block in blocks
+    ])
+    changed = _write_block_changes(page, rows, blocks, positions)
+    _rebalance_if_needed(page, positions)
+    return changed
+
+
+def get_block_types(page):
+    """Return the type of each of a page's blocks by block id"""
+    return {block_id: row.block_type for block_id, row in _get_block_rows(page).items()}
+
+
+def get_block_states(page):
+    """Return the ids and content hashes of a page's blocks in document order"""
+    return [
+        {"id": row.block_id, "content_hash": row.content_hash}
+        for row in _get_block_rows(page).values()
+    ]
+
+
+def delete_page_blocks(page):
+    """Remove every stored block of a page"""
+    frappe.db.delete("SprintSpace Page Block", {"page": page})
+
+
+def _rebalance_if_needed(page, positions):
+    if any(len(position) > POSITION_MAX_LENGTH for position in positions):
+        rebalance_block_positions(page)
+
+
+def rebalance_block_positions(page):
+    """Give every block of a page a fresh, short position key in its current order"""
+    names = frappe.db.sql("""
+        SELECT name FROM `tabSprintSpace Page Block` WHERE page = %s ORDER BY position
+    """, page, pluck=True)
+    rows = list(zip(names, keys_between(None, None, len(names)), strict=True))
+
+    for start in range(0, len(rows), REBALANCE_BATCH_SIZE):
+        batch = rows[start:start + REBALANCE_BATCH_SIZE]
+        values = [value for row in batch for value in row] + [page] + [name for name, _key in batch]
+        frappe.db.sql(f"""
+            UPDATE `tabSprintSpace Page Block`
+            SET position = CASE name {" ".join(["WHEN %s THEN %s"] * len(batch))} ELSE position END
+            WHERE page = %s AND name IN ({", ".join(["%s"] * len(batch))})
+        """, values)
+
+
+def _get_block_rows(page):
+    rows = frappe.db.sql("""
+        SELECT name, block_id, block_type, position, content_hash
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %s
+        ORDER BY position
+    """, page, as_dict=True)
+    return {row.block_id: row for row in rows}
+
+
+def _write_block_changes(page, rows, blocks, positions):
+    """Insert, update and delete block rows so they match `blocks`
+
+    Blocks that carry neither `type` nor `data` only have their position checked.
+    """
+    rows = dict(rows)
+    inserts = []
+    changed = False
+
+    for block, position in zip(blocks, positions, strict=True):
+        row = rows.pop(block["id"], None)
+        if row is None:
+            inserts.append((block, position))
+            continue
+
+        values = {}
+        if position != row.position:
+            values["position"] = position
+
+        if "type" in block or "data" in block:
+            block_type = block.get("type") or row.block_type
+            data = (block["data"] or {}) if "data" in block else loads(
+                frappe.db.get_value("SprintSpace Page Block", row.name, "block_data"), {}
+            )
+            content_hash = get_block_hash({"type": block_type, "data": data})
+            if content_hash != row.content_hash:
+                text = extract_block_text({"type": block_type, "data": data})
+                values.update({
+                    "block_type": block_type,
+                    "block_data": dumps(data),
+                    "content_hash": content_hash,
+                    "search_text": text,
+                    **get_block_stats({"type": block_type, "data": data}, text)
+                })
+
+        if values:
+            frappe.db.set_value("SprintSpace Page Block", row.name, values)
+            changed = True
+
+    if rows:
+        frappe.db.delete("SprintSpace Page Block", {"name": ("in", [row.name for row in rows.values()])})
+        changed = True
+
+    if inserts:
+        timestamp = now()
+        user = frappe.session.user
+        frappe.db.bulk_insert(
+            "SprintSpace Page Block",
+            fields=[
+                "name", "creation", "modified", "owner", "modified_by",
+                "page", "block_id", "position", "block_type", "block_data", "content_hash", "search_text",
+                *BLOCK_STAT_FIELDS
+            ],
+            values=[_get_insert_values(page, block, position, timestamp, user) for block, position in inserts]
+        )
+        changed = True
+
+    return changed
+
+
+def _get_insert_values(page, block, position, timestamp, user):
+    text = extract_block_text(block)
+    stats = get_block_stats(block, text)
+    return (
+        frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+        page, block["id"], position, block.get("type"), dumps(block.get("data") or {}),
+        get_block_hash(block), text, *(stats[field] for field in BLOCK_STAT_FIELDS)
+    )
@@ -0,0 +1,134 @@
+# Copyright (c) 2024, Cursor-Auto and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import (
+    POSITION_MAX_LENGTH,
+    apply_block_operations,
+    get_page_blocks,
+    save_page_blocks,
+)
+
+
+class TestSprintSpacePageBlock(FrappeTestCase):
+    def setUp(self):
+        self.workspace = frappe.get_doc({
+            "doctype": "SprintSpace Workspace",
+            "title": "Test Workspace Blocks",
+            "description": "Test workspace for block storage"
+        })
+        self.workspace.insert()
+
+        self.page = frappe.get_doc({
+            "doctype": "SprintSpace Page",
+            "workspace": self.workspace.name,
+            "title": "Block Store Page"
+        })
+        self.page.insert()
+
+    def tearDown(self):
+        frappe.db.delete("SprintSpace Page Block", {"page": self.page.name})
+        frappe.db.delete("SprintSpace Page", {"name": self.page.name})
+        self.workspace.delete()
+
+    def get_rows(self):
+        return {
+            row.block_id: row
+            for row in frappe.get_all(
+                "SprintSpace Page Block",
+                filters={"page": self.page.name},
+                fields=["block_id", "position", "modified", "content_hash"]
+            )
+        }
+
+    def test_unchanged_blocks_are_not_rewritten(self):
+        """Test that saving the same blocks again writes nothing"""
+        blocks = [
+            {"id": "one", "type": "paragraph", "data": {"text": "One"}},
+            {"id": "two", "type": "paragraph", "data": {"text": "Two"}}
+        ]
+        self.assertTrue(save_page_blocks(self.page.name, blocks))
+        self.assertFalse(save_page_blocks(self.page.name, blocks))
+
+    def test_only_changed_rows_are_written(self):
+        """Test that an edit or move touches only the affected rows"""
+        save_page_blocks(self.page.name, [
+            {"id": block_id, "type": "paragraph", "data": {"text": block_id}}
+            for block_id in ("a", "b", "c", "d")
+        ])
+        before = self.get_rows()
+
+        apply_block_operations(self.page.name, [
+            {"op": "update", "id": "b", "block": {"data": {"text": "B"}}},
+            {"op": "move", "id": "d", "after": None}
+        ])
+        after = self.get_rows()
+
+        self.assertEqual([block["id"] for block in get_page_blocks(self.page.name)], ["d", "a", "b", "c"])
+        self.assertNotEqual(before["b"].content_hash, after["b"].content_hash)
+        self.assertNotEqual(before["d"].position, after["d"].position)
+        for block_id in ("a", "c"):
+            self.assertEqual(before[block_id].position, after[block_id].position)
+            self.assertEqual(before[block_id].modified, after[block_id].modified)
+
+    def test_large_blocks_are_stored_compressed(self):
+        """Test that block data is compressed when enabled and read back transparently"""
+        text = "<b>Repeated</b> paragraph text. " * 40
+        with patch.dict(frappe.conf, {"sprintspace_content_compression": "zlib"}):
+            save_page_blocks(self.page.name, [
+                {"id": "big", "type": "paragraph", "data": {"text": text}},
+                {"id": "small", "type": "paragraph", "data": {"text": "Small"}}
+            ])
+
+        stored = dict(frappe.get_all(
+            "SprintSpace Page Block",
+            filters={"page": self.page.name},
+            fields=["block_id", "block_data"],
+            as_list=True
+        ))
+        self.assertTrue(stored["big"].startswith("zlib:"))
+        self.assertFalse(stored["small"].startswith("zlib:"))
+        self.assertEqual(get_page_blocks(self.page.name)[0]["data"]["text"], text)
+
+    def test_long_positions_are_rebalanced(self):
+        """Test that inserting many blocks at one spot keeps position keys short"""
+        save_page_blocks(self.page.name, [
+            {"id": block_id, "type": "paragraph", "data": {"text": block_id}}
+            for block_id in ("first", "last")
+        ])
+
+        after = "first"
+        for i in range(300):
+            apply_block_operations(self.page.name, [
+                {"op": "insert", "after": after, "block": {"id": f"b{i}", "type": "paragraph", "data": {"text": str(i)}}}
+            ])
+            after = f"b{i}"
+
+        ids = [block["id"] for block in get_page_blocks(self.page.name)]
+        self.assertEqual(ids, ["first"] + [f"b{i}" for i in range(300)] + ["last"])
+        self.assertLessEqual(max(len(row.position) for row in self.get_rows().values()), POSITION_MAX_LENGTH)
+
+    def test_rows_are_listed_only_for_workspace_members(self):
+        """Test that users outside a private workspace list none of its blocks or versions"""
+        save_page_blocks(self.page.name, [{"id": "a", "type": "paragraph", "data": {"text": "Secret"}}])
+        user = "test1@example.com"
+        if not frappe.db.exists("Role", "Projects User"):
+            frappe.get_doc({"doctype": "Role", "role_name": "Projects User"}).insert()
+        frappe.get_doc("User", user).add_roles("Projects User")
+        self.addCleanup(frappe.set_user, "Administrator")
+
+        frappe.set_user(user)
+        for doctype in ("SprintSpace Page Block", "SprintSpace Page Version"):
+            self.assertEqual(frappe.get_list(doctype, filters={"page": self.page.name}), [])
+        block = frappe.get_doc("SprintSpace Page Block", {"page": self.page.name})
+        self.assertFalse(frappe.has_permission("SprintSpace Page Block", "read", block, user=user))
+
+        frappe.set_user("Administrator")
+        self.workspace.append("members", {"user": user, "role": "Viewer"})
+        self.workspace.save()
+        frappe.set_user(user)
+        self.assertEqual(len(frappe.get_list("SprintSpace Page Block", filters={"page": self.page.name})), 1)
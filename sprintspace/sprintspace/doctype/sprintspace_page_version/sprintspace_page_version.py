@@ -0,0 +1,123 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, now
+
+from sprintspace.blocks import apply_operations
+from sprintspace.compression import dumps, loads
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import get_page_blocks
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import (
+    get_page_rows_query_conditions,
+    has_page_row_permission,
+)
+
+# Every SNAPSHOT_INTERVAL-th version stores the full block list, so rebuilding a
+# version never applies more than SNAPSHOT_INTERVAL - 1 deltas
+SNAPSHOT_INTERVAL = 20
+
+
+class SprintSpacePageVersion(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_unique("SprintSpace Page Version", ["page", "version"])
+
+
+def get_permission_query_conditions(user=None):
+    return get_page_rows_query_conditions("SprintSpace Page Version", user)
+
+
+def has_permission(doc, ptype=None, user=None):
+    return has_page_row_permission(doc.page, ptype, user)
+
+
+def record_page_version(page, version, operations=None, user=None):
+    """Store version `version` of a page, written by `operations`
+
+    Stored as a delta when `operations` is given and the previous version is in the
+    history, otherwise as a snapshot of the page's stored blocks. `user` is the
+    author of the version, by default the session user.
+    """
+    is_snapshot = (
+        operations is None
+        or version % SNAPSHOT_INTERVAL == 1
+        or not frappe.db.exists("SprintSpace Page Version", {"page": page, "version": version - 1})
+    )
+    data = get_page_blocks(page) if is_snapshot else operations
+
+    timestamp = now()
+    user = user or frappe.session.user
+    frappe.db.bulk_insert(
+        "SprintSpace Page Version",
+        fields=["name", "creation", "modified", "owner", "modified_by", "page", "version", "is_snapshot", "data"],
+        values=[(frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+                 page, version, int(is_snapshot), dumps(data))]
+    )
+
+
+def delete_page_versions(page):
+    """Remove the history of a page"""
+    frappe.db.delete("SprintSpace Page Version", {"page": page})
+
+
+@frappe.whitelist()
+def get_page_versions(page_name, start=0, page_length=20):
+    """List the saved versions of a page, newest first"""
+    frappe.get_doc("SprintSpace Page", page_name).check_permission("read")
+
+    return frappe.get_all(
+        "SprintSpace Page Version",
+        filters={"page": page_name},
+        fields=["version", "is_snapshot", "owner", "creation"],
+        order_by="version desc",
+        start=cint(start),
+        page_length=min(cint(page_length) or 20, 100)
+    )
+
+
+@frappe.whitelist()
+def get_page_version(page_name, version):
+    """Rebuild a page as it was at `version`"""
+    frappe.get_doc("SprintSpace Page", page_name).check_permission("read")
+
+    result = rebuild_page_version(page_name, cint(version))
+    if result is None:
+        frappe.throw(f"Version {version} of this page is not in its history.", frappe.DoesNotExistError)
+
+    return {
+        "version": result["version"],
+        "content": {"time": str(result["creation"]), "blocks": result["blocks"]},
+        "owner": result["owner"],
+        "creation": result["creation"]
+    }
+
+
+def rebuild_page_version(page, version):
+    """Return the blocks of a page at `version`, or None if its history can't tell
+
+    Reads the closest snapshot at or before the version and applies the deltas
+    after it, so at most SNAPSHOT_INTERVAL rows are read.
+    """
+    rows = frappe.db.sql("""
+        SELECT version, is_snapshot, data, owner, creation
+        FROM `tabSprintSpace Page Version`
+        WHERE page = %(page)s AND version <= %(version)s AND version >= (
+            SELECT MAX(version)
+            FROM `tabSprintSpace Page Version`
+            WHERE page = %(page)s AND version <= %(version)s AND is_snapshot = 1
+        )
+        ORDER BY version
+    """, {"page": page, "version": version}, as_dict=True)
+
+    # The version itself and every delta back to the snapshot must be there
+    if not rows or [row.version for row in rows] != list(range(rows[0].version, version + 1)):
+        return None
+
+    blocks = loads(rows[0].data, [])
+    for row in rows[1:]:
+        blocks = apply_operations(blocks, loads(row.data, []))
+
+    return {"version": version, "blocks": blocks, "owner": rows[-1].owner, "creation": rows[-1].creation}
@@ -0,0 +1,72 @@
+# Copyright (c) 2024, Cursor-Auto and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    apply_page_operations,
+    create_page,
+    update_page_content,
+)
+from sprintspace.sprintspace.doctype.sprintspace_page_version.sprintspace_page_version import (
+    SNAPSHOT_INTERVAL,
+    get_page_version,
+    get_page_versions,
+)
+
+
+class TestSprintSpacePageVersion(FrappeTestCase):
+    def setUp(self):
+        self.workspace = frappe.get_doc({
+            "doctype": "SprintSpace Workspace",
+            "title": "Test Workspace History",
+            "description": "Test workspace for page history"
+        })
+        self.workspace.insert()
+        self.page_name = create_page(self.workspace.name, "History Page", {
+            "blocks": [{"id": "a", "type": "paragraph", "data": {"text": "v1"}}]
+        })
+
+    def tearDown(self):
+        frappe.delete_doc("SprintSpace Page", self.page_name, force=True)
+        self.workspace.delete()
+
+    def test_versions_are_rebuilt_from_deltas(self):
+        """Test that every version can be rebuilt across snapshot boundaries"""
+        expected = {1: ["v1"]}
+        texts = ["v1"]
+        for version in range(2, SNAPSHOT_INTERVAL + 5):
+            if version % 3:
+                apply_page_operations(self.page_name, [{
+                    "op": "insert",
+                    "after": "a",
+                    "block": {"type": "paragraph", "data": {"text": f"v{version}"}}
+                }])
+                texts = [texts[0], f"v{version}", *texts[1:]]
+            else:
+                texts = [f"v{version}"]
+                update_page_content(self.page_name, frappe.as_json({
+                    "blocks": [{"id": "a", "type": "paragraph", "data": {"text": f"v{version}"}}]
+                }))
+            expected[version] = texts
+
+        snapshots = frappe.get_all(
+            "SprintSpace Page Version",
+            filters={"page": self.page_name, "is_snapshot": 1},
+            pluck="version",
+            order_by="version"
+        )
+        self.assertEqual(snapshots, [1, SNAPSHOT_INTERVAL + 1])
+
+        for version, texts in expected.items():
+            blocks = get_page_version(self.page_name, version)["content"]["blocks"]
+            self.assertEqual([block["data"]["text"] for block in blocks], texts)
+
+    def test_list_versions(self):
+        """Test that versions are listed newest first"""
+        apply_page_operations(self.page_name, [{"op": "update", "id": "a", "block": {"data": {"text": "v2"}}}])
+
+        versions = get_page_versions(self.page_name)
+        self.assertEqual([row.version for row in versions], [2, 1])
+        self.assertEqual([row.is_snapshot for row in versions], [0, 1])
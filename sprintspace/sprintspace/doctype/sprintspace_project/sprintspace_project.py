@@ -1,19 +1,55 @@
 import frappe
-import json
 from frappe.model.document import Document
-from frappe.utils import now
+from frappe.utils import add_to_date, cint, get_datetime, now, now_datetime, today
+from functools import partial
+
+from sprintspace.compression import compress_text, decompress_text
+from sprintspace.metrics import record_cache_access
+from sprintspace.validation import parse_and_validate
+from sprintspace.sprintspace.doctype.sprintspace_task_tombstone.sprintspace_task_tombstone import (
+    get_task_tombstones,
+    get_tombstone_horizon,
+    record_task_tombstone,
+)
+
+# Cards returned per kanban column and per "load more" request
+KANBAN_PAGE_LENGTH = 20
+MAX_KANBAN_PAGE_LENGTH = 200
+
+# Changed tasks returned per sync request
+KANBAN_SYNC_LIMIT = 500
+
+# Sync cursors never pass the last KANBAN_SYNC_OVERLAP seconds: a task saved by a
+# transaction that commits late has an older `modified` than tasks already seen
+KANBAN_SYNC_OVERLAP = 10
+
+# Tasks accepted per batch status update
+MAX_STATUS_UPDATES = 500
+
+PROJECT_STATS_CACHE_KEY = "sprintspace_project_stats"
+
+# Realtime event sent to the project's room when a card changes
+TASK_CHANGE_EVENT = "sprintspace_task_change"
+KANBAN_CARD_FIELDS = ["name", "subject", "status", "modified", "owner", "exp_end_date"]
 
 
 class SprintspaceProject(Document):
+    def onload(self):
+        self.content_json = decompress_text(self.content_json)
+
     def validate(self):
         if self.content_json:
-            try:
-                json.loads(self.content_json)
-            except Exception:
-                frappe.throw('Content JSON is not valid JSON.')
+            self.content_json = decompress_text(self.content_json)
+            parse_and_validate(self.content_json)
+
+    def before_save(self):
+        # Stored compressed when the site has content compression switched on
+        self.content_json = compress_text(self.content_json)
 
     def on_update(self):
         self.last_synced = now()
+        # Hand the plain content back to the form after saving
+        self.content_json = decompress_text(self.content_json)
 
 
 @frappe.whitelist()
@@ -32,6 +68,275 @@ def get_tasks_for_project(project_name: str, project_field: str="project", statu
     return groups
 
 
+@frappe.whitelist()
+def get_kanban_board(project_name: str, project_field: str="project", status_field: str="status",
+                     page_length: int=KANBAN_PAGE_LENGTH):
+    """Return per-status task counts and the first page of cards of every column.
+
+    Counts come from a single GROUP BY; further cards are fetched per column with
+    `get_kanban_column`, so opening a board does not depend on project size.
+    """
+    if not frappe.has_permission("Task", "read"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    validate_task_fields(project_field, status_field)
+
+    # Taken before reading so changes made while the board loads are synced later
+    sync_cursor = {"modified": get_sync_horizon(), "name": ""}
+    counts = get_kanban_counts(project_name, project_field, status_field)
+
+    columns = {}
+    for status in counts:
+        columns[status] = get_column_page(project_name, status, project_field, status_field, page_length)
+
+    return {"counts": counts, "columns": columns, "sync_cursor": sync_cursor}
+
+
+@frappe.whitelist()
+def get_kanban_changes(project_name: str, after_modified: str, after_name: str="",
+                       project_field: str="project", status_field: str="status"):
+    """Return the tasks changed and removed since a board's sync cursor.
+
+    Changed tasks are returned oldest first after the (modified, name) cursor, together
+    with the names of tasks deleted or moved to another project (`deleted`) and the
+    cursor to send next time. `has_more` is set when the changes did not fit in one
+    response. Cursors older than the tombstone retention window get `reset` and the
+    client reloads the board.
+
+    The returned cursor stays KANBAN_SYNC_OVERLAP seconds behind the present, so
+    recent changes are sent again by the next few syncs; applying them is idempotent.
+    """
+    if not frappe.has_permission("Task", "read"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    validate_task_fields(project_field, status_field)
+
+    if get_datetime(after_modified) < get_datetime(get_tombstone_horizon()):
+        return {"reset": True}
+
+    tasks = frappe.db.sql(f"""
+        SELECT name, subject, `{status_field}` AS status, modified, owner, exp_end_date
+        FROM `tabTask`
+        WHERE `{project_field}` = %(project)s
+            AND (modified > %(modified)s OR (modified = %(modified)s AND name > %(name)s))
+        ORDER BY modified, name
+        LIMIT %(limit)s
+    """, {
+        "project": project_name,
+        "modified": after_modified,
+        "name": after_name or "",
+        "limit": KANBAN_SYNC_LIMIT + 1
+    }, as_dict=True)
+
+    has_more = len(tasks) > KANBAN_SYNC_LIMIT
+    tasks = tasks[:KANBAN_SYNC_LIMIT]
+
+    # A task that came back after leaving the board is an update, not a removal
+    changed = {task.name for task in tasks}
+    deleted = [name for name in get_task_tombstones(project_name, after_modified) if name not in changed]
+
+    cursor = {"modified": after_modified, "name": after_name or ""}
+    if tasks:
+        cursor = {"modified": tasks[-1].modified, "name": tasks[-1].name}
+        horizon = get_sync_horizon()
+        if get_datetime(cursor["modified"]) > horizon:
+            # Scan the overlap again next time instead of moving past it
+            if get_datetime(after_modified) < horizon:
+                cursor = {"modified": horizon, "name": ""}
+            else:
+                cursor = {"modified": after_modified, "name": after_name or ""}
+            has_more = False
+
+    return {
+        "tasks": tasks,
+        "deleted": deleted,
+        "cursor": cursor,
+        "has_more": has_more,
+        "counts": get_kanban_counts(project_name, project_field, status_field) if tasks or deleted else None
+    }
+
+
+def get_sync_horizon():
+    return add_to_date(now_datetime(), seconds=-KANBAN_SYNC_OVERLAP)
+
+
+def get_kanban_counts(project_name, project_field, status_field):
+    """Number of tasks per status on a project's board."""
+    rows = frappe.get_all(
+        "Task",
+        filters={project_field: project_name},
+        fields=[f"{status_field} as status", "count(name) as count"],
+        group_by=status_field
+    )
+    return {row.status: row.count for row in rows if row.status}
+
+
+@frappe.whitelist()
+def get_kanban_column(project_name: str, status: str, after_modified: str | None=None, after_name: str | None=None,
+                      project_field: str="project", status_field: str="status",
+                      page_length: int=KANBAN_PAGE_LENGTH):
+    """Return the next page of cards of one kanban column, after the given cursor."""
+    if not frappe.has_permission("Task", "read"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    validate_task_fields(project_field, status_field)
+
+    cursor = {"modified": after_modified, "name": after_name} if after_modified and after_name else None
+    return get_column_page(project_name, status, project_field, status_field, page_length, cursor)
+
+
+def get_column_page(project_name, status, project_field, status_field, page_length, cursor=None):
+    """Keyset-paginated cards of one column, newest first.
+
+    Returns `{"tasks": [...], "cursor": {...}}`; the cursor is None on the last page.
+    """
+    page_length = min(max(cint(page_length), 1), MAX_KANBAN_PAGE_LENGTH)
+    values = {"project": project_name, "status": status, "limit": page_length + 1}
+    conditions = [f"`{project_field}` = %(project)s", f"`{status_field}` = %(status)s"]
+    if cursor:
+        conditions.append("(modified < %(modified)s OR (modified = %(modified)s AND name < %(name)s))")
+        values.update(cursor)
+
+    tasks = frappe.db.sql(f"""
+        SELECT name, subject, `{status_field}` AS status, modified, owner, exp_end_date
+        FROM `tabTask`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY modified DESC, name DESC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+    next_cursor = None
+    if len(tasks) > page_length:
+        tasks = tasks[:page_length]
+        next_cursor = {"modified": tasks[-1].modified, "name": tasks[-1].name}
+
+    return {"tasks": tasks, "cursor": next_cursor}
+
+
+def validate_task_fields(*fieldnames):
+    """Only allow real Task fields where field names are put into queries."""
+    meta = frappe.get_meta("Task")
+    for fieldname in fieldnames:
+        if not meta.has_field(fieldname):
+            frappe.throw(f"Task has no field {fieldname}.")
+
+
+@frappe.whitelist()
+def get_project_stats(project_name: str, project_field: str="project", status_field: str="status"):
+    """Return task totals, per-status and overdue counts of a project.
+
+    Counted in SQL and cached per project until a task of the project changes.
+    Task hooks only know the standard fields, so other field mappings are not cached.
+    """
+    if not frappe.has_permission("Task", "read"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    validate_task_fields(project_field, status_field)
+
+    if (project_field, status_field) != ("project", "status"):
+        return calculate_project_stats(project_name, project_field, status_field)
+
+    cached = frappe.cache.hget(PROJECT_STATS_CACHE_KEY, project_name)
+    # Overdue counts depend on the date, so yesterday's entry is stale
+    hit = bool(cached and cached["date"] == today())
+    record_cache_access("project_stats", hit)
+    if hit:
+        return cached["stats"]
+
+    stats = calculate_project_stats(project_name)
+    frappe.cache.hset(PROJECT_STATS_CACHE_KEY, project_name, {"date": today(), "stats": stats})
+    return stats
+
+
+def calculate_project_stats(project_name, project_field="project", status_field="status"):
+    rows = frappe.db.sql(f"""
+        SELECT
+            IFNULL(`{status_field}`, 'Open') AS status,
+            COUNT(*) AS count,
+            SUM(exp_end_date < CURDATE() AND IFNULL(`{status_field}`, 'Open') NOT IN ('Completed', 'Cancelled')) AS overdue
+        FROM `tabTask`
+        WHERE `{project_field}` = %s
+        GROUP BY IFNULL(`{status_field}`, 'Open')
+    """, project_name, as_dict=True)
+
+    stats = {"total": 0, "completed": 0, "in_progress": 0, "pending": 0, "overdue": 0, "statuses": {}}
+    for row in rows:
+        stats["statuses"][row.status] = row.count
+        stats["total"] += row.count
+        stats["overdue"] += cint(row.overdue)
+
+        if row.status == "Completed":
+            stats["completed"] += row.count
+        elif row.status == "Working":
+            stats["in_progress"] += row.count
+        elif row.status != "Cancelled":
+            stats["pending"] += row.count
+
+    stats["completion_percentage"] = int(stats["completed"] * 100 / stats["total"] + 0.5) if stats["total"] else 0
+    return stats
+
+
+def clear_project_stats_cache(*projects):
+    """Drop the cached statistics of the given projects."""
+    for project in set(filter(None, projects)):
+        frappe.cache.hdel(PROJECT_STATS_CACHE_KEY, project)
+        # Clear again once committed so a concurrent rebuild cannot keep stale counts
+        frappe.db.after_commit.add(partial(frappe.cache.hdel, PROJECT_STATS_CACHE_KEY, project))
+
+
+def publish_task_change(project, task=None, deleted=None, previous_status=None):
+    """Tell open boards of a project that a card was added, changed or removed.
+
+    `previous_status` is the column the card was counted in before, if any.
+    """
+    if not project:
+        return
+
+    frappe.publish_realtime(
+        TASK_CHANGE_EVENT,
+        {"project": project, "task": task, "deleted": deleted, "previous_status": previous_status},
+        doctype="Project",
+        docname=project,
+        after_commit=True
+    )
+
+
+def publish_doc_task_change(doc, project, **change):
+    """Publish a change of `doc`, or hold it in `doc.flags.held_task_changes` if that is set."""
+    if doc.flags.held_task_changes is not None:
+        doc.flags.held_task_changes.append((project, change))
+    else:
+        publish_task_change(project, **change)
+
+
+def get_kanban_card(doc):
+    return {fieldname: doc.get(fieldname) for fieldname in KANBAN_CARD_FIELDS}
+
+
+def on_task_update(doc, method=None):
+    """Leave a tombstone on the old board when a task moves to another project."""
+    before = doc.get_doc_before_save()
+    moved = before and before.get("project") != doc.get("project")
+    if moved:
+        record_task_tombstone(doc.name, before.get("project"))
+        publish_doc_task_change(doc, before.get("project"), deleted=doc.name, previous_status=before.get("status"))
+
+    if not before or moved:
+        publish_doc_task_change(doc, doc.get("project"), task=get_kanban_card(doc))
+    elif any(before.get(fieldname) != doc.get(fieldname) for fieldname in KANBAN_CARD_FIELDS if fieldname != "modified"):
+        publish_doc_task_change(doc, doc.get("project"), task=get_kanban_card(doc), previous_status=before.get("status"))
+
+    clear_project_stats_cache(doc.get("project"), before and before.get("project"))
+
+
+def on_task_trash(doc, method=None):
+    record_task_tombstone(doc.name, doc.get("project"))
+    publish_task_change(doc.get("project"), deleted=doc.name, previous_status=doc.get("status"))
+    clear_project_stats_cache(doc.get("project"))
+
+
+def on_task_rename(doc, method=None, old=None, new=None, merge=False):
+    record_task_tombstone(old, doc.get("project"))
+    publish_task_change(doc.get("project"), deleted=old, previous_status=doc.get("status"))
+    publish_task_change(doc.get("project"), task=get_kanban_card(doc))
+
+
 @frappe.whitelist()
 def update_task_status(task_name: str, new_status: str, status_field: str="status"):
     """Update a single task's status (drag-drop)."""
@@ -49,6 +354,57 @@ def update_task_status(task_name: str, new_status: str, status_field: str="statu
     return {"ok": True}
 
 
+@frappe.whitelist()
+def update_task_statuses(updates, status_field: str="status"):
+    """Update the status of many tasks in one request and one commit.
+
+    `updates` is a list of `{"task": name, "status": new_status}`. Each task is saved
+    under its own savepoint, so a failing task is rolled back without losing the
+    rest. Returns one `{"task", "ok", "error"}` result per update, in order.
+    """
+    if not frappe.has_permission("Task", "write"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    validate_task_fields(status_field)
+
+    updates = frappe.parse_json(updates) or []
+    if len(updates) > MAX_STATUS_UPDATES:
+        frappe.throw(f"At most {MAX_STATUS_UPDATES} tasks can be updated at once.")
+
+    # One query tells which tasks exist and are visible to the user
+    names = list({update.get("task") for update in updates if update.get("task")})
+    permitted = set(frappe.get_list("Task", filters={"name": ("in", names)}, pluck="name")) if names else set()
+
+    results = []
+    # Board events are held while a task saves and only sent for tasks whose savepoint held
+    changes = []
+    for update in updates:
+        task_name = update.get("task")
+        if task_name not in permitted:
+            results.append({"task": task_name, "ok": False, "error": "Not permitted"})
+            continue
+
+        frappe.db.savepoint("task_status_update")
+        try:
+            doc = frappe.get_doc("Task", task_name)
+            doc.check_permission("write")
+            doc.flags.held_task_changes = []
+            if doc.get(status_field) != update.get("status"):
+                doc.set(status_field, update.get("status"))
+                doc.save()
+        except Exception as e:
+            frappe.db.rollback(save_point="task_status_update")
+            frappe.clear_messages()
+            results.append({"task": task_name, "ok": False, "error": str(e)})
+            continue
+        changes += doc.flags.held_task_changes
+        results.append({"task": task_name, "ok": True})
+
+    for project, change in changes:
+        publish_task_change(project, **change)
+    frappe.db.commit()
+    return results
+
+
 @frappe.whitelist()
 def create_sample_tasks(project_name: str):
     """Create sample tasks for testing the kanban functionality."""
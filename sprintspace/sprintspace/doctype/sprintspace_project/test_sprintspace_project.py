@@ -1,7 +1,18 @@
 import frappe
 import unittest
 import json
-from sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project import SprintspaceProject
+from unittest.mock import MagicMock, patch
+from frappe.utils import add_to_date, get_datetime, now_datetime
+from sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project import (
+    KANBAN_SYNC_OVERLAP,
+    TASK_CHANGE_EVENT,
+    SprintspaceProject,
+    get_kanban_board,
+    get_kanban_changes,
+    get_kanban_column,
+    get_project_stats,
+    update_task_statuses,
+)
 
 
 class TestSprintspaceProject(unittest.TestCase):
@@ -52,6 +63,243 @@ class TestSprintspaceProject(unittest.TestCase):
         # Clean up
         self.test_project.delete()
 
+    def test_kanban_columns_are_paginated(self):
+        """Test that kanban columns load in pages while counts cover every task."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Kanban Paging Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        for i in range(5):
+            task = frappe.get_doc({"doctype": "Task", "subject": f"Task {i}", "project": project.name, "status": "Open"})
+            task.insert()
+            self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+
+        board = get_kanban_board(project.name, page_length=2)
+        self.assertEqual(board["counts"]["Open"], 5)
+        self.assertEqual(len(board["columns"]["Open"]["tasks"]), 2)
+
+        seen = [task.name for task in board["columns"]["Open"]["tasks"]]
+        cursor = board["columns"]["Open"]["cursor"]
+        while cursor:
+            page = get_kanban_column(project.name, "Open", cursor["modified"], cursor["name"], page_length=2)
+            seen += [task.name for task in page["tasks"]]
+            cursor = page["cursor"]
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_kanban_changes_since_cursor(self):
+        """Test that a board sync returns only changed and removed tasks."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Kanban Sync Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        tasks = []
+        for i in range(3):
+            task = frappe.get_doc({"doctype": "Task", "subject": f"Task {i}", "project": project.name, "status": "Open"})
+            task.insert()
+            tasks.append(task)
+        for task in tasks[1:]:
+            self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+        # Created before the board was opened, outside the sync overlap
+        for task in tasks:
+            frappe.db.set_value("Task", task.name, "modified", add_to_date(now_datetime(), minutes=-5), update_modified=False)
+
+        cursor = get_kanban_board(project.name)["sync_cursor"]
+        changes = get_kanban_changes(project.name, cursor["modified"], cursor["name"])
+        self.assertEqual(changes["tasks"], [])
+        self.assertEqual(changes["deleted"], [])
+
+        tasks[1].status = "Working"
+        tasks[1].save()
+        frappe.delete_doc("Task", tasks[0].name, force=True)
+
+        changes = get_kanban_changes(project.name, cursor["modified"], cursor["name"])
+        self.assertEqual([task.name for task in changes["tasks"]], [tasks[1].name])
+        self.assertEqual(changes["deleted"], [tasks[0].name])
+        self.assertEqual(changes["counts"], {"Open": 1, "Working": 1})
+
+    def test_kanban_sync_finds_late_commits(self):
+        """Test that the sync cursor stays behind tasks whose transactions may still commit."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Kanban Late Commit Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        start = add_to_date(now_datetime(), minutes=-5)
+
+        task = frappe.get_doc({"doctype": "Task", "subject": "Seen", "project": project.name, "status": "Open"}).insert()
+        self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+        changes = get_kanban_changes(project.name, str(start))
+        self.assertEqual([row.name for row in changes["tasks"]], [task.name])
+        self.assertLessEqual(
+            get_datetime(changes["cursor"]["modified"]),
+            add_to_date(now_datetime(), seconds=-KANBAN_SYNC_OVERLAP)
+        )
+
+        # Saved a moment before the task above, but committed after it was synced
+        late = frappe.get_doc({"doctype": "Task", "subject": "Late", "project": project.name, "status": "Open"}).insert()
+        self.addCleanup(frappe.delete_doc, "Task", late.name, force=True)
+        frappe.db.set_value("Task", late.name, "modified", add_to_date(task.modified, seconds=-1), update_modified=False)
+
+        cursor = changes["cursor"]
+        changes = get_kanban_changes(project.name, str(cursor["modified"]), cursor["name"])
+        self.assertIn(late.name, [row.name for row in changes["tasks"]])
+
+    def test_task_changes_are_published(self):
+        """Test that added, changed and deleted tasks are pushed to the project's boards."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Kanban Realtime Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+
+        with patch("frappe.publish_realtime") as publish:
+            task = frappe.get_doc({"doctype": "Task", "subject": "Live", "project": project.name, "status": "Open"}).insert()
+            task.status = "Working"
+            task.save()
+            frappe.delete_doc("Task", task.name, force=True)
+
+        calls = [call for call in publish.call_args_list if call.args[0] == TASK_CHANGE_EVENT]
+        messages = [call.args[1] for call in calls]
+        self.assertEqual(
+            [((message["task"] or {}).get("status"), message["previous_status"], message["deleted"]) for message in messages],
+            [("Open", None, None), ("Working", "Open", None), (None, "Working", task.name)]
+        )
+        self.assertTrue(all(message["project"] == project.name for message in messages))
+        self.assertTrue(all(call.kwargs["docname"] == project.name and call.kwargs["after_commit"] for call in calls))
+
+    def test_batch_status_update(self):
+        """Test that many task statuses are updated in one call with per-task results."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Batch Status Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        names = []
+        for i in range(3):
+            task = frappe.get_doc({"doctype": "Task", "subject": f"Task {i}", "project": project.name, "status": "Open"})
+            task.insert()
+            self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+            names.append(task.name)
+
+        results = update_task_statuses(
+            [{"task": name, "status": "Working"} for name in names] + [{"task": "TASK-MISSING", "status": "Working"}]
+        )
+
+        self.assertEqual([result["ok"] for result in results], [True, True, True, False])
+        for name in names:
+            self.assertEqual(frappe.db.get_value("Task", name, "status"), "Working")
+
+    def test_batch_status_update_publishes_saved_tasks_only(self):
+        """Test that a task rolled back to its savepoint sends no board event."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Batch Events Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        names = []
+        for i in range(3):
+            task = frappe.get_doc({"doctype": "Task", "subject": f"Task {i}", "project": project.name, "status": "Open"})
+            task.insert()
+            self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+            names.append(task.name)
+
+        # The second task fails in its update hook, after its board event was made
+        saves = iter([None, frappe.ValidationError("Failed"), None])
+
+        def clear_cache(*projects):
+            error = next(saves)
+            if error:
+                raise error
+
+        module = "sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project"
+        with patch(f"{module}.clear_project_stats_cache", side_effect=clear_cache), \
+                patch("frappe.publish_realtime") as publish:
+            results = update_task_statuses([{"task": name, "status": "Working"} for name in names])
+
+        self.assertEqual([result["ok"] for result in results], [True, False, True])
+        self.assertEqual(frappe.db.get_value("Task", names[1], "status"), "Open")
+        calls = [call for call in publish.call_args_list if call.args[0] == TASK_CHANGE_EVENT]
+        self.assertEqual([call.args[1]["task"]["name"] for call in calls], [names[0], names[2]])
+        self.assertTrue(all(call.kwargs["after_commit"] for call in calls))
+
+    def test_project_stats_follow_task_changes(self):
+        """Test that cached project statistics are refreshed when a task changes."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Project Stats Test"}).insert()
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+        task = frappe.get_doc({
+            "doctype": "Task",
+            "subject": "Overdue task",
+            "project": project.name,
+            "status": "Open",
+            "exp_end_date": frappe.utils.add_days(frappe.utils.today(), -3)
+        }).insert()
+        self.addCleanup(frappe.delete_doc, "Task", task.name, force=True)
+
+        stats = get_project_stats(project.name)
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["overdue"], 1)
+
+        task.status = "Completed"
+        task.save()
+
+        stats = get_project_stats(project.name)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["overdue"], 0)
+        self.assertEqual(stats["completion_percentage"], 100)
+
+        # Other field mappings are counted on those fields
+        stats = get_project_stats(project.name, status_field="priority")
+        self.assertEqual(stats["statuses"], {task.priority: 1})
+        with self.assertRaises(frappe.ValidationError):
+            get_project_stats(project.name, status_field="no_such_field")
+
+    def test_bulk_task_import(self):
+        """Test that CSV rows become tasks in one pass and invalid rows are reported."""
+        if not frappe.db.table_exists("Task") or not frappe.db.table_exists("Project"):
+            self.skipTest("Task and Project doctypes are not installed")
+        from sprintspace.task_import import import_tasks
+
+        project = frappe.get_doc({"doctype": "Project", "project_name": "Task Import Test"}).insert()
+        self.addCleanup(frappe.db.delete, "Task", {"project": project.name})
+        self.addCleanup(frappe.delete_doc, "Project", project.name, force=True)
+
+        result = import_tasks(project.name, "\n".join([
+            "Subject,Status,Due Date",
+            "First task,Open,2030-01-31",
+            "Second task,Working,",
+            ",Open,",
+            "Bad status,Someday,",
+            "Bad date,Open,not a date",
+        ]))
+
+        self.assertEqual(result["status"], "Completed")
+        self.assertEqual(result["created"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [3, 4, 5])
+
+        tasks = frappe.get_all(
+            "Task", filters={"project": project.name}, fields=["subject", "status", "exp_end_date"], order_by="name"
+        )
+        self.assertEqual([(task.subject, task.status) for task in tasks], [("First task", "Open"), ("Second task", "Working")])
+        self.assertEqual(str(tasks[0].exp_end_date), "2030-01-31")
+
+    def test_task_naming_without_series_field(self):
+        """Test that imports follow the Task autoname when Task has no naming_series field."""
+        from sprintspace.task_import import DEFAULT_NAMING_SERIES, get_task_naming_series
+
+        meta = MagicMock(autoname="TSK-.#####")
+        meta.get_field.return_value = None
+        with patch("frappe.get_meta", return_value=meta):
+            self.assertEqual(get_task_naming_series(), ("TSK-.#####", False))
+            meta.autoname = "hash"
+            self.assertEqual(get_task_naming_series(), (DEFAULT_NAMING_SERIES, False))
+
     def tearDown(self):
         """Clean up any test data."""
         try:
@@ -0,0 +1,50 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, now
+
+# Clients whose sync cursor is older than this reload the whole board
+TOMBSTONE_RETENTION_DAYS = 7
+
+
+class SprintSpaceTaskTombstone(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("SprintSpace Task Tombstone", ["project", "creation"])
+
+
+def record_task_tombstone(task, project):
+    """Remember that `task` left the board of `project` (deleted or moved away)"""
+    if not project:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        "SprintSpace Task Tombstone",
+        fields=["name", "creation", "modified", "owner", "modified_by", "task", "project"],
+        values=[(frappe.generate_hash(length=10), timestamp, timestamp, user, user, task, project)]
+    )
+
+
+def get_task_tombstones(project, since):
+    """Return the names of tasks that left `project` at or after `since`"""
+    return frappe.db.sql_list("""
+        SELECT DISTINCT task
+        FROM `tabSprintSpace Task Tombstone`
+        WHERE project = %s AND creation >= %s
+    """, (project, since))
+
+
+def get_tombstone_horizon():
+    """Oldest cursor that can still be synced incrementally"""
+    return add_days(now(), -TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_task_tombstones():
+    """Drop tombstones older than the retention window"""
+    frappe.db.delete("SprintSpace Task Tombstone", {"creation": ("<", get_tombstone_horizon())})
@@ -0,0 +1,31 @@
+# Copyright (c) 2024, Cursor-Auto and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now
+
+from sprintspace.sprintspace.doctype.sprintspace_task_tombstone.sprintspace_task_tombstone import (
+    get_task_tombstones,
+    prune_task_tombstones,
+    record_task_tombstone,
+)
+
+
+class TestSprintSpaceTaskTombstone(FrappeTestCase):
+    def tearDown(self):
+        frappe.db.delete("SprintSpace Task Tombstone", {"project": "Tombstone Test Project"})
+
+    def test_tombstones_since_cursor(self):
+        """Only tombstones recorded after the cursor are returned"""
+        before = add_days(now(), -1)
+        record_task_tombstone("TASK-TOMB-1", "Tombstone Test Project")
+
+        self.assertEqual(get_task_tombstones("Tombstone Test Project", before), ["TASK-TOMB-1"])
+        self.assertEqual(get_task_tombstones("Tombstone Test Project", add_days(now(), 1)), [])
+
+    def test_prune_keeps_recent_tombstones(self):
+        record_task_tombstone("TASK-TOMB-2", "Tombstone Test Project")
+        prune_task_tombstones()
+
+        self.assertTrue(frappe.db.exists("SprintSpace Task Tombstone", {"task": "TASK-TOMB-2"}))
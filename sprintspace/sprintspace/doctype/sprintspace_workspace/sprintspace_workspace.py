@@ -3,13 +3,29 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import now
+from frappe.utils import cint, now
 
+# Member roles, each allowed everything the ones before it are. Viewers read the
+# workspace's pages, Editors also edit them and Admins also manage the workspace.
+WORKSPACE_ROLES = ("Viewer", "Editor", "Admin")
+READ_PERMISSION_TYPES = (None, "read", "print", "export", "email", "report")
 
 class SprintSpaceWorkspace(Document):
     def validate(self):
         if not self.owner_user:
             self.owner_user = frappe.session.user
+
+        # The counter is only ever advanced in SQL; never write back a stale copy
+        if not self.is_new():
+            self.page_order_counter = frappe.db.get_value(
+                "SprintSpace Workspace", self.name, "page_order_counter", for_update=True
+            )
+
+        seen = set()
+        for member in self.members:
+            if member.user in seen:
+                frappe.throw(f"{member.user} is listed as a member more than once.")
+            seen.add(member.user)
     
     def before_insert(self):
         self.created_date = now()
@@ -19,18 +35,116 @@ class SprintSpaceWorkspace(Document):
         self.modified_date = now()
 
 
+def on_doctype_update():
+    frappe.db.add_index("SprintSpace Workspace", ["owner_user"])
+    frappe.db.add_index("SprintSpace Workspace", ["is_public"])
+
+
+def has_unrestricted_access(user):
+    return user == "Administrator" or "System Manager" in frappe.get_roles(user)
+
+
+def get_accessible_workspaces_query(user):
+    """SQL selecting the names of the workspaces a user can read"""
+    user = frappe.db.escape(user)
+    return f"""
+        SELECT name FROM `tabSprintSpace Workspace` WHERE owner_user = {user} OR is_public = 1
+        UNION
+        SELECT parent FROM `tabSprintSpace Workspace Member`
+        WHERE user = {user} AND parenttype = 'SprintSpace Workspace'
+    """
+
+
+def get_permission_query_conditions(user=None):
+    """Limit workspace lists to those the user owns, is a member of, or are public"""
+    user = user or frappe.session.user
+    if has_unrestricted_access(user):
+        return ""
+    return f"`tabSprintSpace Workspace`.name IN ({get_accessible_workspaces_query(user)})"
+
+
+def get_page_rows_query_conditions(table, user=None):
+    """Limit lists of rows belonging to a page (via their `page` column) to the
+    pages of the workspaces the user can read"""
+    user = user or frappe.session.user
+    if has_unrestricted_access(user):
+        return ""
+    return f"""`tab{table}`.page IN (
+        SELECT name FROM `tabSprintSpace Page`
+        WHERE workspace IN ({get_accessible_workspaces_query(user)})
+    )"""
+
+
+def get_workspace_role(workspace, user=None):
+    """Role of a user in a workspace: "Owner", a member role, "Viewer" for
+    public workspaces, or None without access"""
+    user = user or frappe.session.user
+    if has_unrestricted_access(user):
+        return "Owner"
+
+    row = frappe.db.sql("""
+        SELECT workspace.owner_user, workspace.is_public, member.role
+        FROM `tabSprintSpace Workspace` workspace
+        LEFT JOIN `tabSprintSpace Workspace Member` member
+            ON member.parent = workspace.name
+            AND member.parenttype = 'SprintSpace Workspace'
+            AND member.user = %(user)s
+        WHERE workspace.name = %(workspace)s
+        LIMIT 1
+    """, {"workspace": workspace, "user": user}, as_dict=True)
+    if not row:
+        return None
+
+    row = row[0]
+    if row.owner_user == user:
+        return "Owner"
+    return row.role or ("Viewer" if row.is_public else None)
+
+
+def has_workspace_access(workspace, role, user=None):
+    """Whether the user has at least `role` in the workspace"""
+    user_role = get_workspace_role(workspace, user)
+    if user_role is None:
+        return False
+    return user_role == "Owner" or WORKSPACE_ROLES.index(user_role) >= WORKSPACE_ROLES.index(role)
+
+
+def has_permission(doc, ptype=None, user=None):
+    if doc.is_new():
+        return True
+    return has_workspace_access(doc.name, "Viewer" if ptype in READ_PERMISSION_TYPES else "Admin", user)
+
+
+def has_page_row_permission(page, ptype=None, user=None):
+    """Access to a row belonging to a page, such as a block or a version
+
+    Such rows are only written through the page endpoints, so anything beyond
+    reading them takes a workspace Admin.
+    """
+    workspace = frappe.db.get_value("SprintSpace Page", page, "workspace")
+    return has_workspace_access(workspace, "Viewer" if ptype in READ_PERMISSION_TYPES else "Admin", user)
+
+
+def allocate_page_order(workspace):
+    """Reserve the next page_order for a new page in a workspace
+
+    The UPDATE holds the workspace row lock until the transaction ends, so
+    parallel inserts into one workspace are serialised and never share a number.
+    """
+    frappe.db.sql("""
+        UPDATE `tabSprintSpace Workspace`
+        SET page_order_counter = IFNULL(page_order_counter, 0) + 1
+        WHERE name = %s
+    """, workspace)
+    return cint(frappe.db.get_value("SprintSpace Workspace", workspace, "page_order_counter"))
+
+
 @frappe.whitelist()
 def get_user_workspaces():
     """Get all workspaces accessible to the current user"""
-    user = frappe.session.user
-    
-    # Get workspaces owned by user or public workspaces
-    workspaces = frappe.get_all(
+    # Owned, public and member workspaces, through the permission query conditions
+    workspaces = frappe.get_list(
         "SprintSpace Workspace",
-        or_filters=[
-            ["owner_user", "=", user],
-            ["is_public", "=", 1]
-        ],
         fields=["name", "title", "description", "created_date", "modified_date"],
         order_by="modified_date desc"
     )
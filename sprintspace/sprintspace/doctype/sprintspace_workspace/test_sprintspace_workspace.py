@@ -1,9 +1,22 @@
 # Copyright (c) 2024, Cursor-Auto and Contributors
 # See license.txt
 
+import io
+import json
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from sprintspace.bootstrap import get_bootstrap
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import create_page, get_page_content
+from sprintspace.sprintspace.doctype.sprintspace_page_block.sprintspace_page_block import get_page_blocks
+from sprintspace.sprintspace.doctype.sprintspace_workspace.sprintspace_workspace import (
+    create_workspace,
+    get_permission_query_conditions,
+    has_workspace_access,
+)
+from sprintspace.transfer import export_workspace, import_workspace
+
 
 class TestSprintSpaceWorkspace(FrappeTestCase):
     def test_workspace_creation(self):
@@ -21,3 +34,102 @@ class TestSprintSpaceWorkspace(FrappeTestCase):
         
         # Clean up
         workspace.delete()
+
+    def test_bootstrap_reopens_last_page(self):
+        """Test that the bootstrap payload holds the last opened workspace and page"""
+        workspace = create_workspace("Bootstrap Workspace")
+        create_page(workspace, "First Page")
+        second_page = create_page(workspace, "Second Page")
+        get_page_content(second_page)
+
+        data = get_bootstrap()
+        self.assertIn(workspace, [row.name for row in data["workspaces"]])
+        self.assertEqual(data["workspace"], workspace)
+        self.assertEqual(len(data["page_tree"]["pages"]), 3)
+        self.assertEqual(data["page"]["name"], second_page)
+
+        # A removed page falls back to the first page of the workspace
+        frappe.delete_doc("SprintSpace Page", second_page)
+        data = get_bootstrap()
+        self.assertEqual(data["page"]["name"], data["page_tree"]["pages"][0]["name"])
+
+    def test_member_access(self):
+        """Test that members get their role's access and others none"""
+        workspace = frappe.get_doc({
+            "doctype": "SprintSpace Workspace",
+            "title": "Members Workspace",
+            "owner_user": "Administrator",
+            "members": [{"user": "test1@example.com", "role": "Viewer"}]
+        }).insert()
+        self.addCleanup(workspace.delete)
+
+        self.assertTrue(has_workspace_access(workspace.name, "Viewer", "test1@example.com"))
+        self.assertFalse(has_workspace_access(workspace.name, "Editor", "test1@example.com"))
+        self.assertFalse(has_workspace_access(workspace.name, "Viewer", "test2@example.com"))
+
+        def visible_to(user):
+            return frappe.db.sql_list(f"""
+                SELECT name FROM `tabSprintSpace Workspace`
+                WHERE {get_permission_query_conditions(user)}
+            """)
+
+        self.assertIn(workspace.name, visible_to("test1@example.com"))
+        self.assertNotIn(workspace.name, visible_to("test2@example.com"))
+
+    def test_export_and_import(self):
+        """Test that an exported workspace imports with the same pages and blocks"""
+        workspace = create_workspace("Export Workspace")
+        create_page(workspace, "Notes", {"blocks": [
+            {"type": "header", "data": {"text": "Plan", "level": 2}},
+            {"type": "paragraph", "data": {"text": "Ship it"}}
+        ]})
+
+        out = io.StringIO()
+        self.assertEqual(export_workspace(workspace, out), 2)
+
+        out.seek(0)
+        imported = import_workspace(out, "Imported Workspace")
+
+        def get_pages(name):
+            return {
+                page.title: [(block["type"], block["data"]) for block in get_page_blocks(page.name)]
+                for page in frappe.get_all("SprintSpace Page", filters={"workspace": name}, fields=["name", "title"])
+            }
+
+        self.assertEqual(get_pages(imported), get_pages(workspace))
+
+        with self.assertRaises(frappe.ValidationError):
+            out.seek(0)
+            import_workspace(out)
+
+    def test_import_orders_and_validates_pages(self):
+        """Test that imported pages are keyed in file order and invalid blocks fail the import"""
+        header = json.dumps({"type": "workspace", "format": 1, "title": "Unused"})
+        pages = [
+            json.dumps({"type": "page", "title": title, "order_key": "0", "blocks": []})
+            for title in ("First", "Second", "Third")
+        ]
+
+        imported = import_workspace([header, *pages], "Ordered Import")
+        rows = frappe.get_all(
+            "SprintSpace Page", filters={"workspace": imported}, fields=["title", "order_key"], order_by="order_key"
+        )
+        self.assertEqual([row.title for row in rows], ["First", "Second", "Third"])
+        self.assertFalse(any(row.order_key.endswith("0") for row in rows))
+
+        invalid = json.dumps({"type": "page", "title": "Bad", "blocks": [{"type": "paragraph", "data": []}]})
+        with self.assertRaises(frappe.ValidationError):
+            import_workspace([header, *pages, invalid], "Invalid Import")
+        self.assertFalse(frappe.db.exists("SprintSpace Workspace", {"title": "Invalid Import"}))
+
+    def test_create_page_after_import(self):
+        """Test that imported pages take names from the series that new pages use"""
+        header = json.dumps({"type": "workspace", "format": 1, "title": "Unused"})
+        pages = [json.dumps({"type": "page", "title": title, "blocks": []}) for title in ("First", "Second")]
+
+        imported = import_workspace([header, *pages], "Series Import")
+        imported_names = set(frappe.get_all("SprintSpace Page", filters={"workspace": imported}, pluck="name"))
+
+        page = create_page(imported, "Third")
+        self.assertNotIn(page, imported_names)
+        self.assertEqual(frappe.db.count("SprintSpace Page", {"workspace": imported}), 3)
@@ -0,0 +1,14 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class SprintSpaceWorkspaceMember(Document):
+    pass
+
+
+def on_doctype_update():
+    # Permission conditions look up a user's workspaces by user
+    frappe.db.add_index("SprintSpace Workspace Member", ["user", "parent"])
@@ -0,0 +1,159 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Page summaries for list views and dashboards.
+
+Every block row carries its own word count, checklist counts and content size,
+computed when the row is written, so a save only measures the blocks that
+changed. The page row holds the totals together with an excerpt and a hash of
+its whole content (SUMMARY_FIELDS); they are refreshed from the narrow block
+columns whenever the content changes, and `backfill_summaries` fills them in
+for content stored before.
+"""
+
+import hashlib
+import json
+
+import frappe
+
+from sprintspace.blocks import get_block_hash
+from sprintspace.compression import decompress_text, loads
+from sprintspace.search import extract_block_text
+
+EXCERPT_LENGTH = 200
+# Leading blocks with text that make up the excerpt
+EXCERPT_BLOCKS = 5
+BACKFILL_BATCH_SIZE = 500
+
+BLOCK_STAT_FIELDS = ["word_count", "checklist_done", "checklist_total", "content_size"]
+SUMMARY_FIELDS = ["excerpt", "block_count", "content_hash", *BLOCK_STAT_FIELDS]
+
+
+def get_block_stats(block, text=None):
+    """Word count, checklist items done and in total, and JSON size of one block"""
+    data = block.get("data") or {}
+    if text is None:
+        text = extract_block_text(block)
+
+    items = []
+    if block.get("type") == "checklist":
+        items = [item for item in data.get("items") or [] if isinstance(item, dict)]
+
+    return {
+        "word_count": len(text.split()),
+        "checklist_done": sum(1 for item in items if item.get("checked")),
+        "checklist_total": len(items),
+        "content_size": len(json.dumps(data, separators=(",", ":")).encode())
+    }
+
+
+def summarize_blocks(blocks):
+    """Summary of a page whose blocks are at hand, e.g. on import"""
+    texts = [extract_block_text(block) for block in blocks]
+    summary = {
+        "excerpt": make_excerpt(texts),
+        "block_count": len(blocks),
+        "content_hash": get_content_hash(get_block_hash(block) for block in blocks)
+    }
+    for field in BLOCK_STAT_FIELDS:
+        summary[field] = 0
+    for block, text in zip(blocks, texts, strict=True):
+        for field, value in get_block_stats(block, text).items():
+            summary[field] += value
+    return summary
+
+
+def get_page_summary(page):
+    """Summary of a page from its stored block rows, without reading block data"""
+    rows = frappe.db.sql(f"""
+        SELECT content_hash, {", ".join(BLOCK_STAT_FIELDS)}
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %s
+        ORDER BY position
+    """, page, as_dict=True)
+    texts = frappe.db.sql("""
+        SELECT search_text
+        FROM `tabSprintSpace Page Block`
+        WHERE page = %s AND IFNULL(search_text, '') != ''
+        ORDER BY position
+        LIMIT %s
+    """, (page, EXCERPT_BLOCKS), pluck=True)
+
+    summary = {
+        "excerpt": make_excerpt(texts),
+        "block_count": len(rows),
+        "content_hash": get_content_hash(row.content_hash for row in rows)
+    }
+    for field in BLOCK_STAT_FIELDS:
+        summary[field] = sum(row[field] or 0 for row in rows)
+    return summary
+
+
+def update_page_summary(page):
+    frappe.db.set_value("SprintSpace Page", page, get_page_summary(page), update_modified=False)
+
+
+def make_excerpt(texts):
+    text = " ".join([text for text in texts if text][:EXCERPT_BLOCKS])
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+def get_content_hash(block_hashes):
+    """Hash of a page's content, from the hashes of its blocks in order"""
+    return hashlib.sha1("".join(block_hashes).encode()).hexdigest()
+
+
+def backfill_summaries(workspace=None):
+    """Compute block statistics and page summaries of already stored content
+
+    Returns the number of pages summarized.
+    """
+    conditions = ""
+    values = {"batch_size": BACKFILL_BATCH_SIZE, "after": ""}
+    if workspace:
+        conditions = "AND page IN (SELECT name FROM `tabSprintSpace Page` WHERE workspace = %(workspace)s)"
+        values["workspace"] = workspace
+
+    while True:
+        rows = frappe.db.sql(f"""
+            SELECT name, block_type, block_data
+            FROM `tabSprintSpace Page Block`
+            WHERE name > %(after)s {conditions}
+            ORDER BY name
+            LIMIT %(batch_size)s
+        """, values, as_dict=True)
+        if not rows:
+            break
+
+        for row in rows:
+            block = {"type": row.block_type, "data": loads(row.block_data, {})}
+            frappe.db.set_value(
+                "SprintSpace Page Block", row.name, get_block_stats(block), update_modified=False
+            )
+
+        values["after"] = rows[-1].name
+        frappe.db.commit()
+
+    filters = {"workspace": workspace} if workspace else {}
+    count = 0
+    for page in frappe.get_all("SprintSpace Page", filters=filters, fields=["name", "content_json"], order_by="name"):
+        if page.content_json:
+            # Not yet moved to the block store; unparseable content is left for its next valid save
+            try:
+                content = json.loads(decompress_text(page.content_json))
+                blocks = content.get("blocks") or []
+                summary = summarize_blocks(blocks)
+            except (ValueError, AttributeError, TypeError, frappe.ValidationError):
+                frappe.log_error(title=f"Could not summarize page {page.name}")
+                continue
+            frappe.db.set_value("SprintSpace Page", page.name, summary, update_modified=False)
+        else:
+            update_page_summary(page.name)
+        count += 1
+        if count % BACKFILL_BATCH_SIZE == 0:
+            frappe.db.commit()
+    frappe.db.commit()
+
+    return count
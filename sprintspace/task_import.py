@@ -0,0 +1,256 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Bulk creation of project tasks from CSV or JSON rows.
+
+Every row has a `subject` and optionally a `status` and a due date (`due_date`
+or `exp_end_date`). Rows are validated and written in chunks of CHUNK_SIZE: the
+valid rows of a chunk go into one bulk insert and one commit, invalid ones are
+reported with their row number. Imports larger than one chunk run in a
+background job; their progress is kept in redis and pushed to the importing
+user as it advances.
+
+Bulk inserts skip the Task controller, so its per-task hooks do not run. Open
+boards are told to reload once the import is done.
+"""
+
+import csv
+import io
+
+import frappe
+from frappe.utils import cint, getdate, now
+
+from sprintspace.naming import reserve_series_names
+from sprintspace.sprintspace.doctype.sprintspace_project.sprintspace_project import (
+    TASK_CHANGE_EVENT,
+    clear_project_stats_cache,
+)
+
+CHUNK_SIZE = 1000
+# Row errors kept for the import report
+MAX_ERRORS = 100
+DEFAULT_NAMING_SERIES = "TASK-.YYYY.-"
+
+TASK_IMPORT_CACHE_KEY = "sprintspace_task_import"
+TASK_IMPORT_STATUS_EXPIRY = 24 * 60 * 60
+# Realtime event sent to the importing user as chunks are written
+TASK_IMPORT_PROGRESS_EVENT = "sprintspace_task_import_progress"
+
+
+def parse_task_rows(rows):
+    """Rows as a list of dicts, from a list, a JSON array or CSV text with a header line"""
+    if isinstance(rows, str):
+        text = rows.lstrip("\ufeff").strip()
+        if text.startswith("["):
+            rows = frappe.parse_json(text)
+        else:
+            rows = list(csv.DictReader(io.StringIO(text)))
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        frappe.throw("Tasks must be a list of rows with a subject, status and due date.")
+
+    # "Due Date" and "due_date" are the same column
+    return [
+        {(key or "").strip().lower().replace(" ", "_"): value for key, value in row.items()}
+        for row in rows
+    ]
+
+
+def validate_rows(rows, start=0):
+    """Split a chunk into valid task values and `{"row", "error"}` entries
+
+    Row numbers count from 1 and continue from `start`.
+    """
+    meta = frappe.get_meta("Task")
+    subject_length = meta.get_field("subject").length or 140
+    statuses = (meta.get_field("status").options or "").split("\n")
+    default_status = meta.get_field("status").default or "Open"
+
+    valid, errors = [], []
+    for number, row in enumerate(rows, start + 1):
+        subject = str(row.get("subject") or "").strip()
+        status = str(row.get("status") or "").strip() or default_status
+        due_date = row.get("due_date") or row.get("exp_end_date") or None
+
+        if not subject:
+            errors.append({"row": number, "error": "Subject is missing."})
+            continue
+        if len(subject) > subject_length:
+            errors.append({"row": number, "error": f"Subject is longer than {subject_length} characters."})
+            continue
+        if status not in statuses:
+            errors.append({"row": number, "error": f"Unknown status {status}."})
+            continue
+        if due_date:
+            try:
+                due_date = getdate(str(due_date).strip())
+            except Exception:
+                errors.append({"row": number, "error": f"Invalid due date {due_date}."})
+                continue
+
+        valid.append({"subject": subject, "status": status, "exp_end_date": due_date})
+
+    return valid, errors
+
+
+def insert_tasks(project, tasks):
+    """Write validated tasks with one bulk insert; returns their names
+
+    Names come from the Task naming series and every task becomes a root of the
+    task tree, placed after the existing ones as the nested set requires.
+    """
+    if not tasks:
+        return []
+
+    naming_series, has_series_field = get_task_naming_series()
+    names = reserve_series_names(naming_series, len(tasks))
+    # Locks only the row with the highest rgt, not the whole index range
+    last_rgt = frappe.db.sql("SELECT rgt FROM `tabTask` ORDER BY rgt DESC LIMIT 1 FOR UPDATE")
+    last_rgt = cint(last_rgt[0][0]) if last_rgt else 0
+
+    timestamp = now()
+    user = frappe.session.user
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "subject", "status", "project", "exp_end_date", "lft", "rgt"
+    ]
+    values = [
+        [name, timestamp, timestamp, user, user, task["subject"], task["status"],
+         project, task["exp_end_date"], last_rgt + 2 * index + 1, last_rgt + 2 * index + 2]
+        for index, (name, task) in enumerate(zip(names, tasks, strict=True))
+    ]
+    if has_series_field:
+        fields.append("naming_series")
+        for row in values:
+            row.append(naming_series)
+
+    frappe.db.bulk_insert("Task", fields=fields, values=[tuple(row) for row in values])
+    return names
+
+
+def get_task_naming_series():
+    """The series new tasks are named from, and whether Task has a naming_series field
+
+    Without the field the series is the Task autoname, when that is a plain
+    series such as "TASK-.YYYY.-.#####".
+    """
+    meta = frappe.get_meta("Task")
+    field = meta.get_field("naming_series")
+    if field:
+        options = (field.options or "").split("\n")
+        return field.default or options[0] or DEFAULT_NAMING_SERIES, True
+
+    autoname = meta.autoname or ""
+    if "." in autoname and ":" not in autoname:
+        return autoname, False
+    return DEFAULT_NAMING_SERIES, False
+
+
+@frappe.whitelist(methods=["POST"])
+def import_tasks(project_name: str, rows):
+    """Create tasks in a project from CSV text or a JSON list of rows
+
+    Imports of up to CHUNK_SIZE rows run right away and return the result, larger
+    ones are queued and return `{"import_id", "queued": True, "total"}`; follow
+    them with `get_task_import_status`.
+    """
+    if not frappe.has_permission("Task", "create"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+    frappe.get_doc("Project", project_name).check_permission("read")
+
+    rows = parse_task_rows(rows)
+    import_id = frappe.generate_hash(length=12)
+    set_status(import_id, {
+        "project": project_name, "user": frappe.session.user, "status": "Queued",
+        "total": len(rows), "processed": 0, "created": 0, "failed": 0, "errors": []
+    })
+
+    if len(rows) <= CHUNK_SIZE:
+        return run_task_import(import_id, project_name, rows)
+
+    frappe.enqueue(
+        "sprintspace.task_import.run_task_import",
+        queue="long",
+        timeout=3600,
+        import_id=import_id,
+        project_name=project_name,
+        rows=rows
+    )
+    return {"import_id": import_id, "queued": True, "total": len(rows)}
+
+
+def run_task_import(import_id, project_name, rows, on_progress=None):
+    """Validate and insert rows chunk by chunk, committing and reporting after each"""
+    progress = get_status(import_id) or {
+        "project": project_name, "user": frappe.session.user, "total": len(rows),
+        "processed": 0, "created": 0, "failed": 0, "errors": []
+    }
+    progress["status"] = "Running"
+
+    try:
+        for start in range(0, len(rows), CHUNK_SIZE):
+            tasks, errors = validate_rows(rows[start:start + CHUNK_SIZE], start)
+            insert_tasks(project_name, tasks)
+            frappe.db.commit()
+
+            progress["processed"] = min(start + CHUNK_SIZE, len(rows))
+            progress["created"] += len(tasks)
+            progress["failed"] += len(errors)
+            progress["errors"] = (progress["errors"] + errors)[:MAX_ERRORS]
+            publish_progress(import_id, progress, on_progress)
+    except Exception:
+        frappe.db.rollback()
+        progress["status"] = "Failed"
+        publish_progress(import_id, progress, on_progress)
+        raise
+
+    progress["status"] = "Completed"
+    update_project(project_name)
+    publish_progress(import_id, progress, on_progress)
+    return dict(progress, import_id=import_id)
+
+
+def update_project(project_name):
+    """Bring the project and open boards up to date once all tasks are in"""
+    project = frappe.get_doc("Project", project_name)
+    # ERPNext's Project recomputes completion and costing from its tasks
+    if hasattr(project, "update_project"):
+        project.update_project()
+    clear_project_stats_cache(project_name)
+    frappe.publish_realtime(
+        TASK_CHANGE_EVENT,
+        {"project": project_name, "reload": True},
+        doctype="Project",
+        docname=project_name,
+        after_commit=True
+    )
+    frappe.db.commit()
+
+
+def publish_progress(import_id, progress, on_progress=None):
+    set_status(import_id, progress)
+    if progress.get("user"):
+        frappe.publish_realtime(
+            TASK_IMPORT_PROGRESS_EVENT,
+            dict(progress, import_id=import_id),
+            user=progress["user"]
+        )
+    if on_progress:
+        on_progress(progress)
+
+
+def get_status(import_id):
+    return frappe.cache.get_value(f"{TASK_IMPORT_CACHE_KEY}:{import_id}")
+
+
+def set_status(import_id, progress):
+    frappe.cache.set_value(f"{TASK_IMPORT_CACHE_KEY}:{import_id}", progress, expires_in_sec=TASK_IMPORT_STATUS_EXPIRY)
+
+
+@frappe.whitelist()
+def get_task_import_status(import_id: str):
+    """Progress of an import: status, total, processed, created, failed and row errors"""
+    progress = get_status(import_id)
+    if progress and progress.get("user") != frappe.session.user:
+        frappe.throw("Not permitted", frappe.PermissionError)
+    return progress
@@ -0,0 +1,35 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from sprintspace.autosave import get_autosaved_pages
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    ORDER_KEY_REBALANCE_LENGTH,
+    flush_page_autosave,
+    rebalance_page_order,
+)
+
+
+def rebalance_page_order_keys():
+    """Renumber the pages of workspaces whose order keys have grown long"""
+    workspaces = frappe.db.sql_list("""
+        SELECT DISTINCT workspace
+        FROM `tabSprintSpace Page`
+        WHERE CHAR_LENGTH(order_key) > %s
+    """, ORDER_KEY_REBALANCE_LENGTH)
+
+    for workspace in workspaces:
+        rebalance_page_order(workspace)
+        frappe.db.commit()
+
+
+def flush_page_autosaves():
+    """Write every buffered page autosave to the database"""
+    for page in get_autosaved_pages():
+        try:
+            flush_page_autosave(page)
+        except Exception:
+            # Keep the buffer; the next run tries again
+            frappe.db.rollback()
+            frappe.log_error(title=f"Could not flush autosave of page {page}")
@@ -0,0 +1,296 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Export and import of whole workspaces as NDJSON.
+
+The first line describes the workspace, every further line is one page with its
+blocks, in the order of the workspace's page tree:
+
+    {"type": "workspace", "format": 1, "title": ..., "members": [...], ...}
+    {"type": "page", "name": ..., "title": ..., "order_key": ..., "blocks": [...]}
+
+Both directions work in batches of pages, so memory use depends on the size of
+a batch and not of the workspace. Imported pages, blocks and history snapshots
+are written with bulk inserts, one transaction per batch. Imported pages get
+new order keys in file order, and a page with an invalid block fails the whole
+import, removing what was imported so far.
+"""
+
+import io
+import json
+import tempfile
+
+import frappe
+from frappe.utils import cint, now
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+from sprintspace.autosave import get_autosaved_pages
+from sprintspace.blocks import ensure_block_ids, get_block_hash
+from sprintspace.compression import decompress_text, dumps, loads
+from sprintspace.naming import reserve_autonames
+from sprintspace.ordering import assign_keys, keys_between
+from sprintspace.search import extract_block_text
+from sprintspace.sprintspace.doctype.sprintspace_page.sprintspace_page import (
+    check_workspace_pages_permission,
+    clear_workspace_pages_cache,
+    flush_page_autosave,
+)
+from sprintspace.summary import BLOCK_STAT_FIELDS, SUMMARY_FIELDS, get_block_stats, summarize_blocks
+from sprintspace.validation import get_block_error
+
+EXPORT_FORMAT = 1
+BATCH_SIZE = 200
+
+PAGE_EXPORT_FIELDS = [
+    "name", "title", "page_order", "order_key", "is_archived",
+    "created_date", "created_by", "last_edited_date", "last_edited_by"
+]
+PAGE_IMPORT_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "workspace", "content_version", "title",
+    "page_order", "order_key", "is_archived", "created_date", "created_by", "last_edited_date", "last_edited_by",
+    *SUMMARY_FIELDS
+]
+
+
+def export_workspace(workspace, out):
+    """Write a workspace to the text stream `out`; returns the number of pages"""
+    # Buffered autosaves belong in the export
+    for page in get_autosaved_pages():
+        if frappe.db.get_value("SprintSpace Page", page, "workspace") == workspace:
+            flush_page_autosave(page)
+
+    doc = frappe.get_doc("SprintSpace Workspace", workspace)
+    _write_line(out, {
+        "type": "workspace",
+        "format": EXPORT_FORMAT,
+        "title": doc.title,
+        "description": doc.description,
+        "is_public": doc.is_public,
+        "members": [{"user": member.user, "role": member.role} for member in doc.members],
+        "exported_at": now()
+    })
+
+    count = 0
+    for pages in _iter_page_batches(workspace):
+        blocks = _get_batch_blocks([page.name for page in pages if not page.content_json])
+        for page in pages:
+            content_json = page.pop("content_json")
+            if content_json:
+                # Not yet moved to the block store
+                page_blocks = ensure_block_ids(json.loads(decompress_text(content_json)).get("blocks") or [])
+            else:
+                page_blocks = blocks.get(page.name, [])
+            _write_line(out, {"type": "page", **page, "blocks": page_blocks})
+        count += len(pages)
+
+    return count
+
+
+def _iter_page_batches(workspace):
+    """Pages in page tree order, continuing each batch after the last key and name"""
+    values = {"workspace": workspace, "key": "", "name": "", "batch_size": BATCH_SIZE}
+    while True:
+        pages = frappe.db.sql(f"""
+            SELECT {", ".join(PAGE_EXPORT_FIELDS)}, content_json
+            FROM `tabSprintSpace Page`
+            WHERE workspace = %(workspace)s
+                AND (IFNULL(order_key, '') > %(key)s OR (IFNULL(order_key, '') = %(key)s AND name > %(name)s))
+            ORDER BY IFNULL(order_key, ''), name
+            LIMIT %(batch_size)s
+        """, values, as_dict=True)
+        if not pages:
+            break
+        yield pages
+        values.update(key=pages[-1].order_key or "", name=pages[-1].name)
+
+
+def _get_batch_blocks(pages):
+    blocks = {}
+    if not pages:
+        return blocks
+
+    for row in frappe.db.sql("""
+        SELECT page, block_id, block_type, block_data
+        FROM `tabSprintSpace Page Block`
+        WHERE page IN %(pages)s
+        ORDER BY page, position
+    """, {"pages": tuple(pages)}, as_dict=True):
+        blocks.setdefault(row.page, []).append(
+            {"id": row.block_id, "type": row.block_type, "data": loads(row.block_data, {})}
+        )
+    return blocks
+
+
+def _write_line(out, value):
+    out.write(json.dumps(value, default=str, separators=(",", ":")) + "\n")
+
+
+def import_workspace(lines, title=None):
+    """Create a workspace from exported NDJSON lines; returns its name
+
+    `title` replaces the exported title, which must otherwise be free on this site.
+    Pages get new names, the importing user becomes the workspace owner, and
+    members are kept if their user exists here.
+    """
+    lines = (line for line in lines if line.strip())
+    header = json.loads(next(lines, "{}"))
+    if header.get("type") != "workspace" or cint(header.get("format")) != EXPORT_FORMAT:
+        frappe.throw("This is not a SprintSpace workspace export.")
+
+    title = title or header.get("title")
+    if frappe.db.exists("SprintSpace Workspace", {"title": title}):
+        frappe.throw(f"A workspace named {title} already exists. Import it under another title.")
+
+    workspace = frappe.get_doc({
+        "doctype": "SprintSpace Workspace",
+        "title": title,
+        "description": header.get("description"),
+        "is_public": cint(header.get("is_public")),
+        "owner_user": frappe.session.user,
+        "members": [
+            member for member in header.get("members") or []
+            if frappe.db.exists("User", member.get("user"))
+        ]
+    }).insert()
+    frappe.db.commit()
+
+    batch = []
+    max_page_order = 0
+    last_key = None
+    try:
+        for line in lines:
+            page = json.loads(line)
+            if page.get("type") != "page":
+                continue
+            max_page_order = max(max_page_order, cint(page.get("page_order")))
+            batch.append(page)
+            if len(batch) >= BATCH_SIZE:
+                last_key = _insert_pages(workspace.name, batch, last_key)
+                batch = []
+        _insert_pages(workspace.name, batch, last_key)
+    except Exception:
+        frappe.db.rollback()
+        _delete_workspace_import(workspace.name)
+        raise
+
+    frappe.db.set_value("SprintSpace Workspace", workspace.name, "page_order_counter", max_page_order, update_modified=False)
+    clear_workspace_pages_cache(workspace.name)
+    frappe.db.commit()
+    return workspace.name
+
+
+def _insert_pages(workspace, pages, last_key=None):
+    """Bulk-insert a batch of exported pages with their blocks and a first history snapshot
+
+    Pages are keyed in file order after `last_key`; returns the last key given out.
+    """
+    if not pages:
+        return last_key
+
+    for page in pages:
+        blocks = page.get("blocks") or []
+        if not isinstance(blocks, list):
+            frappe.throw(f"Page {page.get('title')}: blocks must be a list.")
+        for index, block in enumerate(blocks, 1):
+            error = get_block_error(block)
+            if error:
+                frappe.throw(f"Page {page.get('title')}: block {index} {error}")
+
+    timestamp = now()
+    user = frappe.session.user
+    names = reserve_autonames("SprintSpace Page", len(pages))
+    order_keys = keys_between(last_key, None, len(pages))
+    page_rows, block_rows, version_rows = [], [], []
+
+    for name, order_key, page in zip(names, order_keys, pages, strict=True):
+        blocks = ensure_block_ids(page.get("blocks") or [])
+        summary = summarize_blocks(blocks)
+        page_rows.append((
+            name, timestamp, timestamp, user, user, workspace, 1, page.get("title"),
+            cint(page.get("page_order")), order_key, cint(page.get("is_archived")),
+            page.get("created_date") or timestamp, page.get("created_by") or user,
+            page.get("last_edited_date") or timestamp, page.get("last_edited_by") or user,
+            *(summary[field] for field in SUMMARY_FIELDS)
+        ))
+
+        for block, position in zip(blocks, assign_keys([None] * len(blocks)), strict=True):
+            data = block.get("data") or {}
+            text = extract_block_text(block)
+            stats = get_block_stats(block, text)
+            block_rows.append((
+                frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+                name, block["id"], position, block.get("type"), dumps(data),
+                get_block_hash(block), text, *(stats[field] for field in BLOCK_STAT_FIELDS)
+            ))
+
+        version_rows.append((
+            frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+            name, 1, 1, dumps([{"id": block["id"], "type": block.get("type"), "data": block.get("data") or {}} for block in blocks])
+        ))
+
+    frappe.db.bulk_insert("SprintSpace Page", fields=PAGE_IMPORT_FIELDS, values=page_rows)
+    frappe.db.bulk_insert(
+        "SprintSpace Page Block",
+        fields=[
+            "name", "creation", "modified", "owner", "modified_by",
+            "page", "block_id", "position", "block_type", "block_data", "content_hash", "search_text",
+            *BLOCK_STAT_FIELDS
+        ],
+        values=block_rows
+    )
+    frappe.db.bulk_insert(
+        "SprintSpace Page Version",
+        fields=["name", "creation", "modified", "owner", "modified_by", "page", "version", "is_snapshot", "data"],
+        values=version_rows
+    )
+    frappe.db.commit()
+    return order_keys[-1]
+
+
+def _delete_workspace_import(workspace):
+    """Remove a workspace whose import failed, with the pages imported before the failure"""
+    for doctype in ("SprintSpace Page Block", "SprintSpace Page Version"):
+        frappe.db.sql(f"""
+            DELETE FROM `tab{doctype}`
+            WHERE page IN (SELECT name FROM `tabSprintSpace Page` WHERE workspace = %s)
+        """, workspace)
+    frappe.db.delete("SprintSpace Page", {"workspace": workspace})
+    frappe.delete_doc("SprintSpace Workspace", workspace, ignore_permissions=True, force=True)
+    frappe.db.commit()
+
+
+@frappe.whitelist()
+def download_workspace_export(workspace):
+    """Download a workspace as NDJSON
+
+    The export is spooled to a temporary file and streamed from there.
+    """
+    check_workspace_pages_permission(workspace, "export")
+
+    out = tempfile.TemporaryFile()
+    text = io.TextIOWrapper(out, encoding="utf-8")
+    export_workspace(workspace, text)
+    text.flush()
+    text.detach()
+    out.seek(0)
+
+    return Response(
+        wrap_file(frappe.local.request.environ, out),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{workspace}.ndjson"'},
+        direct_passthrough=True
+    )
+
+
+@frappe.whitelist(methods=["POST"])
+def upload_workspace_import(title=None):
+    """Import a workspace from an uploaded NDJSON export (form field `file`)"""
+    if not frappe.has_permission("SprintSpace Workspace", "create"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+    upload = frappe.request.files.get("file")
+    if not upload:
+        frappe.throw("Attach the workspace export as `file`.")
+
+    return import_workspace((line.decode("utf-8") for line in upload.stream), title)
@@ -0,0 +1,78 @@
+# Copyright (c) 2024, Cursor-Auto and contributors
+# For license information, please see license.txt
+
+"""Parsing and schema checks for Editor.js content.
+
+Content is parsed with orjson when it is installed, and with json otherwise.
+"""
+
+import json
+
+import frappe
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HEADER_LEVELS = range(1, 7)
+LIST_STYLES = ("ordered", "unordered", "checklist")
+
+
+def parse_content(text):
+    """Parse a content JSON string"""
+    try:
+        return orjson.loads(text) if orjson else json.loads(text)
+    except ValueError:
+        frappe.throw("Content JSON is not valid JSON.")
+
+
+def validate_content(content):
+    """Check that a parsed document follows the Editor.js block schema"""
+    if not isinstance(content, dict):
+        frappe.throw("Content must be an object with a list of blocks.")
+
+    blocks = content.get("blocks")
+    if blocks is None:
+        return
+    if not isinstance(blocks, list):
+        frappe.throw("Content blocks must be a list.")
+
+    for index, block in enumerate(blocks, 1):
+        error = get_block_error(block)
+        if error:
+            frappe.throw(f"Block {index}: {error}")
+
+
+def get_block_error(block):
+    """Return what is wrong with a block, or None if it is valid"""
+    if not isinstance(block, dict):
+        return "must be an object"
+    if not isinstance(block.get("type"), str) or not block["type"]:
+        return "has no type"
+    if block.get("id") is not None and not isinstance(block["id"], str):
+        return "id must be a string"
+
+    data = block.get("data", {})
+    if not isinstance(data, dict):
+        return "data must be an object"
+
+    block_type = block["type"]
+    if block_type in ("header", "paragraph") and not isinstance(data.get("text", ""), str):
+        return f"{block_type} text must be a string"
+    if block_type == "header" and data.get("level", 2) not in HEADER_LEVELS:
+        return "header level must be between 1 and 6"
+    if block_type in ("list", "checklist") and not isinstance(data.get("items", []), list):
+        return f"{block_type} items must be a list"
+    if block_type == "list" and data.get("style", "unordered") not in LIST_STYLES:
+        return "list style must be ordered, unordered or checklist"
+    if block_type == "checklist" and not all(isinstance(item, dict) for item in data.get("items", [])):
+        return "checklist items must be objects"
+    return None
+
+
+def parse_and_validate(text):
+    """Parse content JSON and check its schema; returns the parsed document"""
+    content = parse_content(text)
+    validate_content(content)
+    return content
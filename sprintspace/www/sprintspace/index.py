@@ -1,5 +1,7 @@
 import frappe
 
+from sprintspace.bootstrap import get_bootstrap
+
 def get_context(context):
     # Ensure user is logged in
     if frappe.session.user == "Guest":
@@ -19,6 +21,10 @@ def get_context(context):
         "/assets/sprintspace/js/workspace.js"
     ]
     
+    # Workspaces, page tree and open page, so the app renders without waiting on API calls;
+    # "<" is escaped so content can't close the script tag it is embedded in
+    context.bootstrap = frappe.as_json(get_bootstrap(), indent=None).replace("<", "\\u003c")
+
     context.include_css = [
         "/assets/sprintspace/css/editor.css"
     ]